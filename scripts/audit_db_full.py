@@ -1,9 +1,10 @@
-import duckdb
 import pandas as pd
 
+from src.core.database import get_db_connection
+
 
 def audit_db():
-    con = duckdb.connect("data/nba.duckdb")
+    con = get_db_connection()
 
     # Get all tables
     tables_df = con.sql(
@@ -1,6 +1,6 @@
-import duckdb
+from src.core.database import get_db_connection
 
-con = duckdb.connect("data/nba.duckdb")
+con = get_db_connection()
 try:
     # Extract year from gameDateTimeEst
     # Using try_cast to be safe, although schema should be consistent
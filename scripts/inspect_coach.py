@@ -1,12 +1,14 @@
 import requests
 from bs4 import BeautifulSoup
 
+from src.core.config import BBREF_BASE_URL, settings
+from src.core.utils import get_request_headers
+
 
 def inspect_coach(url):
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
-    response = requests.get(url, headers=headers)
+    response = requests.get(
+        url, headers=get_request_headers(), timeout=settings.scraper.request_timeout
+    )
     if response.status_code != 200:
         print(f"Failed to fetch {url}: {response.status_code}")
         return
@@ -41,4 +43,4 @@ def inspect_coach(url):
 
 
 if __name__ == "__main__":
-    inspect_coach("https://www.basketball-reference.com/boxscores/202310240DEN.html")
+    inspect_coach(f"{BBREF_BASE_URL}/boxscores/202310240DEN.html")
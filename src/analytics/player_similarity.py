@@ -0,0 +1,322 @@
+import argparse
+import hashlib
+import json
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from src.core.config import CACHE_DIR
+from src.core.database import get_db_connection
+from src.etl.derive.compute_advanced_metrics import ensure_columns
+from src.etl.derive.refresh_state import boxscore_fingerprints
+
+INDEX_DIR = CACHE_DIR / "player_similarity"
+
+# Player-seasons below this many minutes are too noisy to compare
+MIN_MINUTES = 200
+
+# Per-36 rates plus shooting profile and role; every feature is z-scored within
+# its season before the vector is normalised, so eras with different pace and
+# shot mix compare on relative terms.
+FEATURES = [
+    "mpg",
+    "pts36",
+    "reb36",
+    "ast36",
+    "stl36",
+    "blk36",
+    "tov36",
+    "fga36",
+    "fg3a_rate",
+    "fta_rate",
+    "ts_pct",
+    "efg_pct",
+    "usg_pct",
+]
+
+# Approximate index defaults: clusters scanned per query out of IVF_LISTS
+IVF_LISTS = 64
+IVF_PROBES = 8
+
+
+def feature_sql():
+    return """
+    WITH season_totals AS (
+        SELECT
+            g.season_id,
+            b.player_id,
+            COUNT(*) FILTER (WHERE b.minutes > 0) AS games,
+            SUM(b.minutes) AS mp,
+            SUM(b.points) AS pts,
+            SUM(b.rebounds_total) AS reb,
+            SUM(b.assists) AS ast,
+            SUM(b.steals) AS stl,
+            SUM(b.blocks) AS blk,
+            SUM(b.turnovers) AS tov,
+            SUM(b.fgm) AS fgm,
+            SUM(b.fga) AS fga,
+            SUM(b.fg3m) AS fg3m,
+            SUM(b.fg3a) AS fg3a,
+            SUM(b.fta) AS fta
+        FROM unified_player_boxscores_all b
+        JOIN unified_games_all g ON b.game_key = g.game_key
+        GROUP BY g.season_id, b.player_id
+        HAVING SUM(b.minutes) >= ?
+    ),
+    usage AS (
+        -- Players traded mid-season have one advanced row per team
+        SELECT
+            season_id,
+            player_id,
+            SUM(usg_pct * minutes) / NULLIF(SUM(minutes), 0) AS usg_pct
+        FROM unified_player_season_advanced
+        WHERE usg_pct IS NOT NULL AND minutes IS NOT NULL
+        GROUP BY season_id, player_id
+    )
+    SELECT
+        t.player_id,
+        s.season_year,
+        t.mp / NULLIF(t.games, 0) AS mpg,
+        36 * t.pts / t.mp AS pts36,
+        36 * t.reb / t.mp AS reb36,
+        36 * t.ast / t.mp AS ast36,
+        36 * t.stl / t.mp AS stl36,
+        36 * t.blk / t.mp AS blk36,
+        36 * t.tov / t.mp AS tov36,
+        36 * t.fga / t.mp AS fga36,
+        t.fg3a / NULLIF(t.fga, 0) AS fg3a_rate,
+        t.fta / NULLIF(t.fga, 0) AS fta_rate,
+        t.pts / NULLIF(2 * (t.fga + 0.44 * t.fta), 0) AS ts_pct,
+        (t.fgm + 0.5 * t.fg3m) / NULLIF(t.fga, 0) AS efg_pct,
+        u.usg_pct
+    FROM season_totals t
+    JOIN unified_seasons s ON t.season_id = s.season_id
+    LEFT JOIN usage u ON u.season_id = t.season_id AND u.player_id = t.player_id
+    ORDER BY s.season_year, t.player_id
+    """
+
+
+def era_normalise(values, seasons):
+    """
+    Z-scores every feature within its season, fills missing values with the
+    season mean (0 after scaling) and L2-normalises each row so a dot product
+    is cosine similarity.
+    """
+    out = np.zeros_like(values, dtype=np.float64)
+    for season in np.unique(seasons):
+        rows = seasons == season
+        block = values[rows]
+        mean = np.nanmean(block, axis=0)
+        std = np.nanstd(block, axis=0)
+        std[~np.isfinite(std) | (std == 0)] = 1.0
+        mean[~np.isfinite(mean)] = 0.0
+        out[rows] = np.nan_to_num((block - mean) / std)
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (out / norms).astype(np.float32)
+
+
+def kmeans(vectors, n_lists, iterations=15, seed=0):
+    """Spherical k-means; returns (centroids, assignment per row)."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        for c in range(n_lists):
+            members = vectors[assign == c]
+            if len(members):
+                centroid = members.sum(axis=0)
+                centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+    return centroids, np.argmax(vectors @ centroids.T, axis=1)
+
+
+def source_fingerprint(con):
+    fingerprints = boxscore_fingerprints(con)
+    advanced = con.execute(
+        "SELECT COUNT(*), BIT_XOR(HASH(season_id, player_id, team_id, usg_pct)) "
+        "FROM unified_player_season_advanced"
+    ).fetchone()
+    payload = json.dumps([sorted(fingerprints.items()), list(advanced)], default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def build_index(full=False, ann=None):
+    """
+    Rebuilds the index if its sources changed. `ann` builds (True) or drops
+    (False) the IVF index; None keeps whatever the current index has.
+    """
+    con = get_db_connection()
+    ensure_columns(con)
+    fingerprint = source_fingerprint(con)
+    meta_path = INDEX_DIR / "meta.json"
+    meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+    if ann is None:
+        ann = bool(meta.get("ann"))
+    if not full and meta.get("fingerprint") == fingerprint and meta.get("ann") == ann:
+        print("Player similarity index is up to date.")
+        con.close()
+        return
+
+    start = time.perf_counter()
+    data = con.execute(feature_sql(), [MIN_MINUTES]).fetchnumpy()
+    con.close()
+
+    keys = np.column_stack([data["player_id"], data["season_year"]]).astype(np.int64)
+    values = np.column_stack([np.asarray(data[f], dtype=np.float64) for f in FEATURES])
+    vectors = era_normalise(values, keys[:, 1])
+
+    INDEX_DIR.mkdir(parents=True, exist_ok=True)
+    np.save(INDEX_DIR / "vectors.npy", vectors)
+    np.save(INDEX_DIR / "keys.npy", keys)
+
+    if ann:
+        n_lists = min(IVF_LISTS, len(vectors))
+        centroids, assign = kmeans(vectors, n_lists)
+        order = np.argsort(assign, kind="stable")
+        offsets = np.searchsorted(assign[order], np.arange(n_lists + 1))
+        np.save(INDEX_DIR / "ivf_centroids.npy", centroids)
+        np.save(INDEX_DIR / "ivf_order.npy", order)
+        np.save(INDEX_DIR / "ivf_offsets.npy", offsets)
+    else:
+        for name in ("ivf_centroids.npy", "ivf_order.npy", "ivf_offsets.npy"):
+            (INDEX_DIR / name).unlink(missing_ok=True)
+
+    meta_path.write_text(
+        json.dumps(
+            {
+                "fingerprint": fingerprint,
+                "features": FEATURES,
+                "min_minutes": MIN_MINUTES,
+                "rows": int(len(vectors)),
+                "ann": ann,
+            },
+            indent=2,
+        )
+    )
+    _load_index.cache_clear()
+    print(
+        f"Indexed {len(vectors)} player-seasons x {len(FEATURES)} features "
+        f"({vectors.nbytes / 1e6:.1f} MB) in {time.perf_counter() - start:.2f}s"
+    )
+
+
+class SimilarityIndex:
+    """Memory-mapped player-season vectors with exact and IVF k-NN search."""
+
+    def __init__(self, directory):
+        self.vectors = np.load(directory / "vectors.npy", mmap_mode="r")
+        self.keys = np.load(directory / "keys.npy")
+        self.rows = {(int(p), int(s)): i for i, (p, s) in enumerate(self.keys)}
+        # Rows are in season order, so the last row seen is the latest season
+        self.latest = {int(p): i for i, (p, _) in enumerate(self.keys)}
+        ivf = directory / "ivf_centroids.npy"
+        self.ivf = None
+        if ivf.exists():
+            self.ivf = (
+                np.load(ivf),
+                np.load(directory / "ivf_order.npy"),
+                np.load(directory / "ivf_offsets.npy"),
+            )
+
+    def row(self, player_id, season_year=None):
+        if season_year is None:
+            return self.latest.get(int(player_id))
+        return self.rows.get((int(player_id), int(season_year)))
+
+    def search(self, rows, k=10, approximate=False, probes=IVF_PROBES):
+        """
+        Batched k-NN for the given index rows. Returns (rows, scores) arrays of
+        shape (len(rows), k), excluding other seasons of the same player.
+        """
+        queries = np.asarray(self.vectors[rows])
+        if approximate and self.ivf is not None:
+            return self._search_ivf(rows, queries, k, probes)
+
+        scores = queries @ np.asarray(self.vectors).T
+        self._mask_same_player(rows, np.arange(scores.shape[1]), scores)
+        return self._top_k(scores, np.arange(scores.shape[1]), k)
+
+    def _search_ivf(self, rows, queries, k, probes):
+        centroids, order, offsets = self.ivf
+        nearest = np.argsort(-(queries @ centroids.T), axis=1)[:, :probes]
+        out_rows, out_scores = [], []
+        for q, lists in enumerate(nearest):
+            candidates = np.concatenate(
+                [order[offsets[c] : offsets[c + 1]] for c in lists]
+            )
+            scores = (np.asarray(self.vectors[candidates]) @ queries[q])[None, :]
+            self._mask_same_player(rows[q : q + 1], candidates, scores)
+            r, s = self._top_k(scores, candidates, k)
+            out_rows.append(r[0])
+            out_scores.append(s[0])
+        return np.array(out_rows), np.array(out_scores)
+
+    def _mask_same_player(self, rows, candidates, scores):
+        players = self.keys[candidates, 0]
+        for q, row in enumerate(rows):
+            scores[q, players == self.keys[row, 0]] = -np.inf
+
+    @staticmethod
+    def _top_k(scores, candidates, k):
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return candidates[top], np.take_along_axis(top_scores, order, axis=1)
+
+
+def index_fingerprint():
+    """Source fingerprint and search mode of the index on disk, or None."""
+    meta_path = INDEX_DIR / "meta.json"
+    if not meta_path.exists():
+        return None
+    meta = json.loads(meta_path.read_text())
+    return f"{meta.get('fingerprint')}:{'ivf' if meta.get('ann') else 'exact'}"
+
+
+@lru_cache(maxsize=1)
+def _load_index(fingerprint):
+    if fingerprint is None or not (INDEX_DIR / "vectors.npy").exists():
+        raise FileNotFoundError(
+            f"No similarity index in {INDEX_DIR}; build it with player_similarity.py"
+        )
+    return SimilarityIndex(INDEX_DIR)
+
+
+def load_index():
+    """The index on disk, reloaded whenever a rebuild changes its fingerprint."""
+    return _load_index(index_fingerprint())
+
+
+def similar_players(player_id, season_year=None, k=10, approximate=True):
+    """
+    Returns [(player_id, season_year, similarity), ...] for one player-season.
+    Searches the IVF index when one was built (--ann) unless `approximate` is
+    False; otherwise every vector is scanned.
+    """
+    index = load_index()
+    row = index.row(player_id, season_year)
+    if row is None:
+        return []
+    rows, scores = index.search(np.array([row]), k=k, approximate=approximate)
+    return [
+        (int(index.keys[r, 0]), int(index.keys[r, 1]), float(s))
+        for r, s in zip(rows[0], scores[0], strict=True)
+        if np.isfinite(s)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the player similarity index")
+    parser.add_argument("--full", action="store_true", help="Rebuild even if unchanged")
+    parser.add_argument(
+        "--ann",
+        action=argparse.BooleanOptionalAction,
+        help="Build (or with --no-ann drop) the approximate IVF index that queries "
+        "then use (default: keep the current index's)",
+    )
+    args = parser.parse_args()
+
+    build_index(full=args.full, ann=args.ann)
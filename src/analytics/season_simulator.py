@@ -0,0 +1,408 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.core.bulk_writer import BulkWriter
+from src.core.config import RAW_DATA_DIR
+from src.core.database import get_db_connection
+from src.core.frozen_seasons import ensure_history_views
+from src.etl.derive.team_ratings import HOME_ADVANTAGE, win_probability
+from src.scraping.fetch_planner import schedule_files
+
+# Current NBA conference alignment, by NBA team id
+EAST = {
+    1610612737,  # ATL
+    1610612738,  # BOS
+    1610612739,  # CLE
+    1610612741,  # CHI
+    1610612748,  # MIA
+    1610612749,  # MIL
+    1610612751,  # BKN
+    1610612752,  # NYK
+    1610612753,  # ORL
+    1610612754,  # IND
+    1610612755,  # PHI
+    1610612761,  # TOR
+    1610612764,  # WAS
+    1610612765,  # DET
+    1610612766,  # CHA
+}
+WEST = {
+    1610612740,  # NOP
+    1610612742,  # DAL
+    1610612743,  # DEN
+    1610612744,  # GSW
+    1610612745,  # HOU
+    1610612746,  # LAC
+    1610612747,  # LAL
+    1610612750,  # MIN
+    1610612756,  # PHX
+    1610612757,  # POR
+    1610612758,  # SAC
+    1610612759,  # SAS
+    1610612760,  # OKC
+    1610612762,  # UTA
+    1610612763,  # MEM
+}
+
+# Per-simulation spread of each team's true strength around its rating, in Elo
+# points. Without it every simulation treats the ratings as exact and the odds
+# come out overconfident.
+RATING_SD = 35.0
+CHUNK_SIZE = 2_500
+MAX_WINS = 100
+
+PROJECTION_COLUMNS = [
+    "season_year",
+    "team_id",
+    "model",
+    "simulations",
+    "rating",
+    "current_wins",
+    "current_losses",
+    "games_remaining",
+    "mean_wins",
+    "wins_p10",
+    "wins_p90",
+    "conf_rank_mean",
+    "top6_pct",
+    "play_in_pct",
+    "playoff_pct",
+    "best_record_pct",
+]
+
+
+def schedule_csv(season_year):
+    """LeagueSchedule24_25.csv holds the 2024-25 season (season_year 2024)."""
+    return RAW_DATA_DIR / (
+        f"LeagueSchedule{season_year % 100:02d}_{(season_year + 1) % 100:02d}.csv"
+    )
+
+
+def ensure_projection_table(con):
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS season_projections (
+        season_year      INTEGER NOT NULL,
+        team_id          BIGINT NOT NULL,
+        model            VARCHAR NOT NULL,
+        simulations      INTEGER,
+        rating           DOUBLE,
+        current_wins     INTEGER,
+        current_losses   INTEGER,
+        games_remaining  INTEGER,
+        mean_wins        DOUBLE,
+        wins_p10         INTEGER,
+        wins_p90         INTEGER,
+        conf_rank_mean   DOUBLE,
+        top6_pct         DOUBLE,
+        play_in_pct      DOUBLE,
+        playoff_pct      DOUBLE,
+        best_record_pct  DOUBLE,
+        simulated_at     TIMESTAMP DEFAULT now(),
+        PRIMARY KEY (season_year, team_id, model)
+    )
+    """)
+
+
+def load_inputs(con, season_year, model):
+    """Team ids, ratings, current records and the remaining schedule as team indices."""
+    path = schedule_csv(season_year)
+    if not path.exists():
+        raise FileNotFoundError(f"No schedule file for {season_year}: {path}")
+
+    ensure_history_views(con)
+    con.execute(
+        f"""
+        CREATE OR REPLACE TEMP TABLE sim_schedule AS
+        SELECT
+            LPAD(CAST(gameId AS VARCHAR), 10, '0') AS game_id,
+            CAST(gameDateTimeEst AS DATE) AS game_date,
+            CAST(hometeamId AS BIGINT) AS home_team_id,
+            CAST(awayteamId AS BIGINT) AS away_team_id
+        FROM read_csv_auto('{path}')
+        -- Regular season NBA game ids start with 002
+        WHERE LPAD(CAST(gameId AS VARCHAR), 10, '0') LIKE '002%'
+        """
+    )
+    remaining = con.execute(
+        """
+        SELECT s.home_team_id, s.away_team_id
+        FROM sim_schedule s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM unified_games_all g
+            WHERE g.game_id = s.game_id
+               OR (g.game_date = s.game_date
+                   AND g.home_team_id = s.home_team_id
+                   AND g.away_team_id = s.away_team_id)
+        )
+        ORDER BY s.game_date, s.game_id
+        """
+    ).fetchnumpy()
+
+    record = con.execute(
+        """
+        SELECT team_id, SUM(win) AS wins, SUM(1 - win) AS losses
+        FROM (
+            SELECT g.home_team_id AS team_id,
+                   CAST(g.home_points > g.away_points AS INTEGER) AS win
+            FROM unified_games_all g
+            JOIN sim_schedule s ON g.game_id = s.game_id
+                OR (g.game_date = s.game_date
+                    AND g.home_team_id = s.home_team_id
+                    AND g.away_team_id = s.away_team_id)
+            WHERE g.home_points IS NOT NULL
+            UNION ALL
+            SELECT g.away_team_id,
+                   CAST(g.away_points > g.home_points AS INTEGER)
+            FROM unified_games_all g
+            JOIN sim_schedule s ON g.game_id = s.game_id
+                OR (g.game_date = s.game_date
+                    AND g.home_team_id = s.home_team_id
+                    AND g.away_team_id = s.away_team_id)
+            WHERE g.home_points IS NOT NULL
+        )
+        GROUP BY team_id
+        """
+    ).fetchall()
+    record = {team_id: (int(w), int(lost)) for team_id, w, lost in record}
+
+    ratings = dict(
+        con.execute(
+            "SELECT team_id, rating FROM team_rating_state WHERE model = ?", [model]
+        ).fetchall()
+    )
+    if not ratings:
+        raise RuntimeError(
+            f"No '{model}' ratings found; run src/etl/derive/team_ratings.py first."
+        )
+
+    team_ids = np.array(sorted(EAST | WEST), dtype=np.int64)
+    scheduled = np.concatenate(
+        [remaining["home_team_id"], remaining["away_team_id"]]
+    ).astype(np.int64)
+    unknown = np.unique(scheduled[~np.isin(scheduled, team_ids)])
+    if len(unknown):
+        # searchsorted would silently map them onto a neighbouring team
+        raise ValueError(
+            f"{path.name} has teams outside EAST/WEST: {', '.join(map(str, unknown))}"
+        )
+    inputs = {
+        "team_ids": team_ids,
+        "ratings": np.array([ratings.get(t, 1500.0) for t in team_ids]),
+        "wins": np.array([record.get(t, (0, 0))[0] for t in team_ids]),
+        "losses": np.array([record.get(t, (0, 0))[1] for t in team_ids]),
+        "home": np.searchsorted(team_ids, remaining["home_team_id"].astype(np.int64)),
+        "away": np.searchsorted(team_ids, remaining["away_team_id"].astype(np.int64)),
+    }
+    return inputs
+
+
+def conference_ranks(wins, columns, rng):
+    """Ranks (0 = best) within one conference; ties are broken at random."""
+    score = wins[:, columns] + rng.random((wins.shape[0], len(columns)))
+    order = np.argsort(-score, axis=1)
+    ranks = np.empty_like(order)
+    rows = np.arange(order.shape[0])[:, None]
+    ranks[rows, order] = np.arange(len(columns))
+    return ranks, order
+
+
+def play_in(order, columns, strength, rng):
+    """
+    Simulates the 7-10 play-in for one conference. Returns a boolean
+    (simulations, len(columns)) mask of teams that reach the playoffs.
+    """
+    n = order.shape[0]
+    rows = np.arange(n)
+    seeds = [columns[order[:, k]] for k in range(6, 10)]  # team index per sim
+    s7, s8, s9, s10 = seeds
+
+    def game(home, away):
+        p = win_probability(
+            strength[rows, home] + HOME_ADVANTAGE - strength[rows, away]
+        )
+        return rng.random(n) < p
+
+    home_78 = game(s7, s8)
+    winner_78 = np.where(home_78, s7, s8)
+    loser_78 = np.where(home_78, s8, s7)
+    winner_910 = np.where(game(s9, s10), s9, s10)
+    winner_last = np.where(game(loser_78, winner_910), loser_78, winner_910)
+
+    made = np.zeros((n, strength.shape[1]), dtype=bool)
+    made[rows, winner_78] = True
+    made[rows, winner_last] = True
+    return made[:, columns]
+
+
+def simulate_chunk(args):
+    """Runs `n` season simulations; returns summed per-team outcome counts."""
+    ratings, wins0, home, away, conferences, n, seed = args
+    rng = np.random.default_rng(seed)
+    n_teams = len(ratings)
+
+    strength = ratings + rng.normal(0.0, RATING_SD, (n, n_teams))
+    p_home = win_probability(strength[:, home] + HOME_ADVANTAGE - strength[:, away])
+    home_won = (rng.random(p_home.shape) < p_home).astype(np.float32)
+
+    # Scatter game results onto teams with one matrix product per side
+    home_onehot = np.zeros((len(home), n_teams), dtype=np.float32)
+    home_onehot[np.arange(len(home)), home] = 1
+    away_onehot = np.zeros((len(away), n_teams), dtype=np.float32)
+    away_onehot[np.arange(len(away)), away] = 1
+    wins = wins0 + home_won @ home_onehot + (1 - home_won) @ away_onehot
+
+    totals = {
+        "wins_sum": wins.sum(axis=0),
+        "wins_hist": np.stack(
+            [
+                np.bincount(
+                    np.clip(wins[:, t], 0, MAX_WINS).astype(np.int64),
+                    minlength=MAX_WINS + 1,
+                )
+                for t in range(n_teams)
+            ]
+        ),
+        "rank_sum": np.zeros(n_teams),
+        "top6": np.zeros(n_teams),
+        "play_in": np.zeros(n_teams),
+        "playoffs": np.zeros(n_teams),
+        "best_record": np.zeros(n_teams),
+    }
+    best = wins + rng.random(wins.shape)
+    totals["best_record"] += np.bincount(best.argmax(axis=1), minlength=n_teams)
+
+    for columns in conferences:
+        ranks, order = conference_ranks(wins, columns, rng)
+        made_play_in = play_in(order, columns, strength, rng)
+        totals["rank_sum"][columns] += (ranks + 1).sum(axis=0)
+        totals["top6"][columns] += (ranks < 6).sum(axis=0)
+        totals["play_in"][columns] += ((ranks >= 6) & (ranks < 10)).sum(axis=0)
+        totals["playoffs"][columns] += ((ranks < 6) | made_play_in).sum(axis=0)
+    return totals
+
+
+def simulate_season(season_year=None, simulations=10_000, workers=1, model="elo_mov"):
+    con = get_db_connection()
+    if season_year is None:
+        # The latest season may have no schedule file yet (init_dimensions adds
+        # the current calendar season)
+        season_year = max(schedule_files(), default=None)
+        if season_year is None:
+            con.close()
+            raise FileNotFoundError(f"No LeagueSchedule CSVs in {RAW_DATA_DIR}")
+
+    inputs = load_inputs(con, season_year, model)
+    team_ids = inputs["team_ids"]
+    conferences = [
+        np.flatnonzero(np.isin(team_ids, list(EAST))),
+        np.flatnonzero(np.isin(team_ids, list(WEST))),
+    ]
+    remaining = len(inputs["home"])
+    print(
+        f"Simulating {season_year}: {remaining} games remaining, "
+        f"{simulations} simulations, {workers} workers..."
+    )
+
+    seeds = np.random.SeedSequence().spawn(-(-simulations // CHUNK_SIZE))
+    chunks = [
+        (
+            inputs["ratings"],
+            inputs["wins"],
+            inputs["home"],
+            inputs["away"],
+            conferences,
+            min(CHUNK_SIZE, simulations - i * CHUNK_SIZE),
+            seed,
+        )
+        for i, seed in enumerate(seeds)
+    ]
+
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(simulate_chunk, chunks))
+    else:
+        parts = [simulate_chunk(chunk) for chunk in chunks]
+    elapsed = time.perf_counter() - start
+
+    totals = {key: sum(part[key] for part in parts) for key in parts[0]}
+    cdf = np.cumsum(totals["wins_hist"], axis=1) / simulations
+
+    projections = pd.DataFrame(
+        {
+            "season_year": season_year,
+            "team_id": team_ids,
+            "model": model,
+            "simulations": simulations,
+            "rating": inputs["ratings"],
+            "current_wins": inputs["wins"],
+            "current_losses": inputs["losses"],
+            "games_remaining": np.bincount(inputs["home"], minlength=len(team_ids))
+            + np.bincount(inputs["away"], minlength=len(team_ids)),
+            "mean_wins": totals["wins_sum"] / simulations,
+            "wins_p10": (cdf < 0.1).sum(axis=1),
+            "wins_p90": (cdf < 0.9).sum(axis=1),
+            "conf_rank_mean": totals["rank_sum"] / simulations,
+            "top6_pct": totals["top6"] / simulations,
+            "play_in_pct": totals["play_in"] / simulations,
+            "playoff_pct": totals["playoffs"] / simulations,
+            "best_record_pct": totals["best_record"] / simulations,
+        }
+    )
+
+    ensure_projection_table(con)
+    con.begin()
+    con.execute(
+        "DELETE FROM season_projections WHERE season_year = ? AND model = ?",
+        [season_year, model],
+    )
+    with BulkWriter(
+        con,
+        "season_projections",
+        PROJECTION_COLUMNS,
+        key_columns=["season_year", "team_id", "model"],
+    ) as writer:
+        writer.extend(projections[PROJECTION_COLUMNS].itertuples(index=False))
+    con.commit()
+    con.close()
+
+    print(
+        f"Finished {simulations} simulations in {elapsed:.2f}s "
+        f"({simulations / elapsed:,.0f} seasons/s)\n"
+    )
+    print(
+        projections.sort_values("mean_wins", ascending=False)[
+            ["team_id", "current_wins", "mean_wins", "top6_pct", "playoff_pct"]
+        ].to_string(index=False)
+    )
+    return projections
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Monte Carlo projection of the remaining regular season"
+    )
+    parser.add_argument(
+        "--season", type=int, help="Season start year (default: latest with a schedule)"
+    )
+    parser.add_argument("--sims", type=int, default=10_000, help="Simulations to run")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=f"Worker processes (this machine has {os.cpu_count()} CPUs)",
+    )
+    parser.add_argument("--model", default="elo_mov", help="Rating model to use")
+    args = parser.parse_args()
+
+    simulate_season(
+        season_year=args.season,
+        simulations=args.sims,
+        workers=args.workers,
+        model=args.model,
+    )
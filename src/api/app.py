@@ -0,0 +1,231 @@
+import argparse
+import hashlib
+
+import pyarrow as pa
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import Response
+from starlette.routing import Route
+
+from src.analytics.player_similarity import index_fingerprint
+from src.core.database import get_db_connection
+from src.core.table_versions import get_table_versions
+from src.frontend import queries
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+JSON_MEDIA_TYPE = "application/json"
+
+# Clients revalidate every time; unchanged data costs a 304 with no body
+CACHE_CONTROL = "no-cache"
+VARY = "Accept, Accept-Encoding"
+
+MAX_LIMIT = 1000
+
+
+def response_format(request):
+    fmt = request.query_params.get("format")
+    if fmt is None:
+        accept = request.headers.get("accept", "")
+        fmt = "arrow" if ARROW_MEDIA_TYPE in accept else "json"
+    if fmt not in ("json", "arrow"):
+        raise HTTPException(400, f"Unknown format {fmt!r}; use json or arrow")
+    return fmt
+
+
+def compute_etag(request, fmt, tables, fingerprint=None):
+    """
+    Strong ETag over the request and the versions of the tables it reads, so it
+    changes exactly when a write could change the response body. `fingerprint`
+    versions any source outside the database (e.g. the similarity index).
+    """
+    con = get_db_connection()
+    try:
+        versions = get_table_versions(con, tables)
+    finally:
+        con.close()
+    params = sorted((k, v) for k, v in request.query_params.multi_items())
+    gzip = "gzip" in request.headers.get("accept-encoding", "")
+    source = fingerprint() if fingerprint else None
+    key = repr((request.url.path, params, fmt, gzip, sorted(versions.items()), source))
+    return '"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+
+
+def etag_matches(request, etag):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so a W/ prefix still matches
+    candidates = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return etag in candidates
+
+
+def encode(df, fmt):
+    if fmt == "arrow":
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes(), ARROW_MEDIA_TYPE
+    return df.to_json(orient="records", date_format="iso"), JSON_MEDIA_TYPE
+
+
+def endpoint(tables, load, not_found=None, fingerprint=None):
+    """
+    Wraps `load(request) -> DataFrame` with format negotiation and conditional
+    requests. `tables` lists everything the query reads, and `fingerprint()`
+    versions anything else it reads. With `not_found` set, an empty result is a
+    404 instead of an empty list.
+    """
+
+    async def handler(request):
+        fmt = response_format(request)
+        etag = await run_in_threadpool(compute_etag, request, fmt, tables, fingerprint)
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": VARY}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        df = await run_in_threadpool(load, request)
+        if not_found and df.empty:
+            raise HTTPException(404, not_found)
+        body, media_type = await run_in_threadpool(encode, df, fmt)
+        return Response(body, media_type=media_type, headers=headers)
+
+    return handler
+
+
+def int_param(request, name, default=None, maximum=None):
+    raw = request.query_params.get(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise HTTPException(400, f"{name} must be an integer") from None
+    return min(value, maximum) if maximum else value
+
+
+def path_int(request, name):
+    try:
+        return int(request.path_params[name])
+    except ValueError:
+        raise HTTPException(400, f"{name} must be an integer") from None
+
+
+def player_search(request):
+    q = request.query_params.get("q", "").strip()
+    if not q:
+        raise HTTPException(400, "q is required")
+    return queries.get_player_search(q)
+
+
+def player_profile(request):
+    return queries.get_player_profile(path_int(request, "player_id"))[0]
+
+
+def player_seasons(request):
+    return queries.get_player_profile(path_int(request, "player_id"))[1]
+
+
+def player_similar(request):
+    return queries.get_similar_players(
+        path_int(request, "player_id"),
+        int_param(request, "season"),
+        k=int_param(request, "k", 10, maximum=100),
+        approximate=not int_param(request, "exact", 0),
+    )
+
+
+def player_percentiles(request):
+    return queries.get_player_percentiles(
+        path_int(request, "player_id"), int_param(request, "season")
+    )
+
+
+def games(request):
+    return queries.get_games(
+        path_int(request, "season_year"),
+        team_id=int_param(request, "team_id"),
+        limit=int_param(request, "limit", 100, maximum=MAX_LIMIT),
+    )
+
+
+def boxscore(request):
+    return queries.get_boxscore(request.path_params["game_id"])
+
+
+def standings(request):
+    return queries.get_standings(path_int(request, "season_year"))
+
+
+def leaders(request):
+    return queries.get_leaders(
+        path_int(request, "season_year"),
+        request.path_params["stat"],
+        n=int_param(request, "n", 10, maximum=MAX_LIMIT),
+    )
+
+
+PLAYER_TABLES = ["unified_players"]
+BOX_TABLES = [
+    "unified_player_boxscores",
+    "unified_games",
+    "unified_seasons",
+    "unified_team_history",
+    "unified_team_seasons",
+]
+LEADER_TABLES = ["unified_season_leaderboards", "unified_seasons", "unified_players"]
+
+# Matches come from the on-disk similarity index (versioned by its source
+# fingerprint, not by table writes); only the names are read from the database
+SIMILAR_TABLES = ["unified_players"]
+
+routes = [
+    Route("/seasons", endpoint(["unified_seasons"], lambda r: queries.get_seasons())),
+    Route("/players", endpoint(PLAYER_TABLES, player_search)),
+    Route(
+        "/players/{player_id}",
+        endpoint(PLAYER_TABLES, player_profile, not_found="Player not found"),
+    ),
+    Route(
+        "/players/{player_id}/seasons",
+        endpoint([*PLAYER_TABLES, *BOX_TABLES], player_seasons),
+    ),
+    Route(
+        "/players/{player_id}/similar",
+        endpoint(SIMILAR_TABLES, player_similar, fingerprint=index_fingerprint),
+    ),
+    Route(
+        "/players/{player_id}/percentiles", endpoint(LEADER_TABLES, player_percentiles)
+    ),
+    Route("/games/{season_year}", endpoint(BOX_TABLES, games)),
+    Route(
+        "/boxscores/{game_id}",
+        endpoint(
+            [*BOX_TABLES, *PLAYER_TABLES, "unified_game_xref"],
+            boxscore,
+            not_found="Game not found",
+        ),
+    ),
+    Route("/standings/{season_year}", endpoint(BOX_TABLES, standings)),
+    Route("/leaders/{season_year}/{stat}", endpoint(LEADER_TABLES, leaders)),
+]
+
+app = Starlette(
+    routes=routes, middleware=[Middleware(GZipMiddleware, minimum_size=1024)]
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the read-only HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    uvicorn.run(app, host=args.host, port=args.port)
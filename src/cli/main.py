@@ -1,10 +1,27 @@
 import subprocess
 import sys
+import time
 
 import click
 
 from src.core.config import DB_PATH
 from src.core.database import get_db_connection
+from src.core.db_status import (
+    exact_counts,
+    frozen_totals,
+    last_runs,
+    table_sizes,
+    table_stats,
+)
+
+# Incremental engines over the unified tables, in dependency order
+DERIVE_SCRIPTS = [
+    "src/etl/derive/compute_advanced_metrics.py",
+    "src/etl/derive/team_ratings.py",
+    "src/etl/derive/player_game_log.py",
+    "src/etl/derive/leaderboards.py",
+    "src/analytics/player_similarity.py",
+]
 
 
 @click.group()
@@ -45,11 +62,23 @@ def scrape(date):
 
 
 @cli.command()
-def migrate():
+@click.option(
+    "--bulk-load",
+    is_flag=True,
+    help="Load unconstrained, validate set-based, then add keys.",
+)
+@click.option(
+    "--full", is_flag=True, help="Also reload frozen seasons (deletes their files)."
+)
+def migrate(bulk_load, full):
     """Run database migrations to unified schema."""
     click.echo("Running migrations...")
+    args = ["--bulk-load"] if bulk_load else []
+    if full:
+        args.append("--full")
     subprocess.run(
-        [sys.executable, "src/etl/transform/migrate_unified_schema.py"], check=True
+        [sys.executable, "src/etl/transform/migrate_unified_schema.py", *args],
+        check=True,
     )
     subprocess.run(
         [sys.executable, "src/etl/transform/migrate_depth_data.py"], check=True
@@ -58,20 +87,195 @@ def migrate():
 
 
 @cli.command()
-def status():
-    """Show database status and row counts."""
-    con = get_db_connection()
-    tables = con.execute("SHOW TABLES").fetchall()
-    click.echo(f"Database: {DB_PATH}")
-    click.echo(f"Tables found: {len(tables)}")
-    for (table,) in tables:
-        try:
-            count = con.execute(f'SELECT count(*) FROM "{table}"').fetchone()[0]
-            click.echo(f"  - {table}: {count} rows")
-        except Exception as e:
-            click.echo(f"  - {table}: Error ({e})")
+@click.option(
+    "--full", is_flag=True, help="Recompute every season, not just changed ones."
+)
+def derive(full):
+    """Refresh metrics derived from the unified tables."""
+    click.echo("Refreshing derived metrics...")
+    args = ["--full"] if full else []
+    for script in DERIVE_SCRIPTS:
+        subprocess.run([sys.executable, script, *args], check=True)
+    click.echo("Derived metrics refreshed.")
+
+
+@cli.command()
+@click.option(
+    "--since", help="First date to fetch, YYYY-MM-DD (default: after the last update)."
+)
+@click.option("--until", help="Last date to fetch, YYYY-MM-DD (default: yesterday).")
+@click.option("--dry-run", is_flag=True, help="List the games without saving them.")
+def update(since, until, dry_run):
+    """Fetch games completed since the last update and refresh derived metrics."""
+    args = ["--since", since] if since else []
+    args += ["--until", until] if until else []
+    if dry_run:
+        args.append("--dry-run")
+    subprocess.run(
+        [sys.executable, "src/etl/ingest/update_recent_games.py", *args], check=True
+    )
+    if dry_run:
+        return
+    # Only the seasons the new games touched are recomputed
+    for script in DERIVE_SCRIPTS:
+        subprocess.run([sys.executable, script], check=True)
+    click.echo("Update complete.")
+
+
+@cli.command()
+@click.option("--as-of", help="Games before this date are final (default: today).")
+@click.option("--since", help="Ignore games before this date, YYYY-MM-DD.")
+@click.option("--urls", is_flag=True, help="Print the URLs to fetch, one per line.")
+def plan(as_of, since, urls):
+    """List scheduled games that are final but not ingested, and their URLs."""
+    args = ["--as-of", as_of] if as_of else []
+    args += ["--since", since] if since else []
+    if urls:
+        args.append("--urls")
+    subprocess.run([sys.executable, "src/scraping/fetch_planner.py", *args], check=True)
+
+
+@cli.command()
+@click.option(
+    "--season", type=int, help="Season start year (default: latest with a schedule)."
+)
+@click.option("--sims", type=int, default=10_000, show_default=True)
+@click.option("--workers", type=int, default=1, show_default=True)
+def simulate(season, sims, workers):
+    """Project final standings and playoff odds for a season."""
+    args = ["--sims", str(sims), "--workers", str(workers)]
+    if season:
+        args += ["--season", str(season)]
+    subprocess.run(
+        [sys.executable, "src/analytics/season_simulator.py", *args], check=True
+    )
+
+
+@cli.command()
+def compact():
+    """Convert unified tables to compact column types and ENUMs in place."""
+    subprocess.run(
+        [sys.executable, "src/etl/transform/compact_unified_schema.py"], check=True
+    )
+
+
+@cli.command()
+def cluster():
+    """Rewrite box scores clustered by player and date, and benchmark scans."""
+    subprocess.run(
+        [sys.executable, "src/etl/transform/cluster_boxscores.py"], check=True
+    )
+
+
+@cli.command()
+@click.option(
+    "--keep-live",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Latest seasons kept in the mutable tables.",
+)
+@click.option("--thaw", type=int, multiple=True, help="Season year to unfreeze.")
+def freeze(keep_live, thaw):
+    """Move finished seasons of games and box scores into frozen Parquet files."""
+    args = ["--keep-live", str(keep_live)]
+    if thaw:
+        args = ["--thaw", *map(str, thaw)]
+    subprocess.run(
+        [sys.executable, "src/etl/transform/freeze_seasons.py", *args], check=True
+    )
+
+
+@cli.command()
+@click.option(
+    "--out", type=click.Path(file_okay=False), help="Output directory (data/export)."
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Only rewrite season partitions that changed since the last export.",
+)
+@click.option("--table", "tables", multiple=True, help="Table to export (repeatable).")
+def export(out, incremental, tables):
+    """Export unified_* tables to season-partitioned Parquet."""
+    args = []
+    if out:
+        args += ["--out", out]
+    if incremental:
+        args.append("--incremental")
+    if tables:
+        args += ["--tables", *tables]
+    subprocess.run(
+        [sys.executable, "src/etl/export/parquet_export.py", *args], check=True
+    )
+
+
+@cli.command()
+@click.option("--workers", type=int, help="Checks run at once (default: one per CPU).")
+@click.option(
+    "--strict", is_flag=True, help="Exit non-zero if any error-severity check fails."
+)
+def audit(workers, strict):
+    """Run the data-quality checks and show each one's trend across runs."""
+    args = ["--workers", str(workers)] if workers else []
+    if strict:
+        args.append("--strict")
+    subprocess.run([sys.executable, "src/etl/quality/audit.py", *args], check=True)
+
+
+@cli.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=8000, show_default=True)
+def serve(host, port):
+    """Serve the read-only HTTP API."""
+    subprocess.run(
+        [sys.executable, "src/api/app.py", "--host", host, "--port", str(port)],
+        check=True,
+    )
+
+
+@cli.command()
+@click.option(
+    "--exact", is_flag=True, help="Count every table's rows (in parallel) instead."
+)
+@click.option("--workers", type=int, default=4, show_default=True)
+def status(exact, workers):
+    """Show tables, estimated rows, sizes and last pipeline runs from metadata."""
+    start = time.perf_counter()
+    con = get_db_connection(read_only=True)
+    stats = table_stats(con)
+    sizes = table_sizes(con, stats)
+    frozen = frozen_totals(con)
+    runs = last_runs(con)
+    db_size = con.execute(
+        "SELECT database_size FROM pragma_database_size()"
+    ).fetchone()[0]
+    counts = {}
+    if exact:
+        counts, count_seconds = exact_counts(con, [s[0] for s in stats], workers)
     con.close()
 
+    click.echo(f"Database: {DB_PATH} ({db_size})")
+    click.echo(f"Tables found: {len(stats)}")
+    for step, at in runs.items():
+        click.echo(f"Last {step}: {at or 'never'}")
+    click.echo(f"  {'table':<36} {'rows':>12} {'cols':>5} {'MB':>9}  last written")
+    for table, rows, columns, _, _, updated_at in stats:
+        rows = f"{counts[table]:,}" if exact else f"~{rows:,}"
+        click.echo(
+            f"  {table:<36} {rows:>12} {columns:>5} {sizes[table] / 1e6:>9.1f}"
+            f"  {updated_at or '-'}"
+        )
+        if table in frozen:
+            frozen_rows, frozen_bytes = frozen[table]
+            click.echo(
+                f"  {'  + frozen':<36} {frozen_rows:>12,} {'':>5}"
+                f" {frozen_bytes / 1e6:>9.1f}"
+            )
+    if exact:
+        click.echo(f"Counted rows in {count_seconds:.2f}s on {workers} workers")
+    click.echo(f"Status took {(time.perf_counter() - start) * 1000:.0f} ms")
+
 
 if __name__ == "__main__":
     cli()
@@ -54,6 +54,14 @@ def main():
     run_script("src/etl/ingest/ingest_awards.py", "Ingesting Awards (Historical)")
     run_script("src/etl/ingest/ingest_transactions.py", "Ingesting Transactions")
 
+    # 6. Derived metrics
+    run_script(
+        "src/etl/derive/compute_advanced_metrics.py", "Deriving Advanced Metrics"
+    )
+    run_script("src/etl/derive/team_ratings.py", "Updating Team Ratings")
+    run_script("src/etl/derive/player_game_log.py", "Updating Player Game Log")
+    run_script("src/etl/derive/leaderboards.py", "Refreshing Leaderboards")
+
     print(f"\n=== Pipeline Complete in {time.time() - pipeline_start:.2f}s ===")
 
 
@@ -0,0 +1,227 @@
+import itertools
+import time
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.core.table_versions import bump_table_version
+
+_writer_ids = itertools.count()
+
+
+class BulkWriter:
+    """
+    Buffers rows for one table and writes them to DuckDB in large Arrow batches.
+
+    Rows are collected as Python tuples (in `columns` order) or as ready-made
+    Arrow tables, and flushed with a single `INSERT ... SELECT FROM <arrow>`
+    per batch instead of binding parameters row by row. Every flush bumps the
+    table's entry in `table_versions`, which the read API uses for ETags.
+
+    Modes:
+        upsert: insert new keys, update non-key columns of existing keys.
+        ignore: insert new keys, leave existing keys untouched.
+        append: plain insert (no conflict handling).
+
+    Args:
+        con: DuckDB connection to write through.
+        table (str): Target table.
+        columns (list[str]): Column names, in the order rows are supplied.
+        key_columns (list[str]): Conflict target for upsert/ignore. Duplicate
+            keys inside a batch are collapsed to the first row added in ignore
+            mode (matching DO NOTHING) and to the last otherwise, and rows with
+            a NULL key are dropped since they can never satisfy the primary
+            key. `rows_sent` counts what reaches the INSERT and `rows_written`
+            only the rows it inserted or actually changed.
+        mode (str): One of "upsert", "ignore" or "append".
+        batch_size (int): Buffered rows that trigger an automatic flush.
+        changelog (Changelog): If given, the keys each batch inserts (and for
+            upserts, updates) are logged to it before the batch is written.
+    """
+
+    MODES = ("upsert", "ignore", "append")
+
+    def __init__(
+        self,
+        con,
+        table,
+        columns,
+        key_columns=None,
+        mode="upsert",
+        batch_size=50_000,
+        changelog=None,
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown BulkWriter mode: {mode}")
+        if mode != "append" and not key_columns:
+            raise ValueError(f"BulkWriter mode '{mode}' requires key_columns")
+
+        self.con = con
+        self.table = table
+        self.columns = list(columns)
+        self.key_columns = list(key_columns or [])
+        self.mode = mode
+        self.batch_size = batch_size
+        self.changelog = changelog
+
+        self.rows_sent = 0
+        self.rows_written = 0
+        self.rows_skipped = 0
+        self.rows_duplicate = 0
+        self.seconds = 0.0
+        self._rows = []
+        self._tables = []
+        self._buffered = 0
+        self._view = f"_bulk_{table}_{next(_writer_ids)}"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        return False
+
+    def _rows_to_table(self):
+        """Moves the buffered tuples into the table buffer, keeping add order."""
+        columns = list(zip(*self._rows, strict=True))
+        self._tables.append(
+            pa.table(
+                {
+                    name: pa.array(values)
+                    for name, values in zip(self.columns, columns, strict=True)
+                }
+            )
+        )
+        self._rows = []
+
+    def add(self, row):
+        """Buffers a single row (a tuple in `columns` order)."""
+        self._rows.append(row)
+        self._buffered += 1
+        if self._buffered >= self.batch_size:
+            self.flush()
+
+    def extend(self, rows):
+        """Buffers many rows."""
+        for row in rows:
+            self.add(row)
+
+    def write_table(self, table):
+        """Buffers an Arrow table (or record batch) whose columns match `columns`."""
+        if isinstance(table, pa.RecordBatch):
+            table = pa.Table.from_batches([table])
+        if self._rows:
+            self._rows_to_table()
+        self._tables.append(table.select(self.columns))
+        self._buffered += table.num_rows
+        if self._buffered >= self.batch_size:
+            self.flush()
+
+    def _to_arrow(self):
+        if self._rows:
+            self._rows_to_table()
+        tables = self._tables
+        if len(tables) == 1:
+            return tables[0]
+        return pa.concat_tables(tables, promote_options="permissive")
+
+    def _dedup(self, batch):
+        """One row per key, numbered in buffer order (SQL gives no row order)."""
+        seq = batch.append_column(
+            "_bulk_seq", pa.array(range(batch.num_rows), pa.int64())
+        )
+        pick = "min" if self.mode == "ignore" else "max"
+        keep = seq.group_by(self.key_columns, use_threads=False).aggregate(
+            [("_bulk_seq", pick)]
+        )[f"_bulk_seq_{pick}"]
+        if len(keep) == batch.num_rows:
+            return batch
+        return batch.take(keep.sort())
+
+    def _insert_sql(self):
+        cols = ", ".join(self.columns)
+        sql = f"INSERT INTO {self.table} ({cols}) SELECT {cols} FROM {self._view}"
+        if self.mode == "append":
+            return sql
+
+        conflict = ", ".join(self.key_columns)
+        updates = [c for c in self.columns if c not in self.key_columns]
+        if self.mode == "ignore" or not updates:
+            return f"{sql} ON CONFLICT ({conflict}) DO NOTHING"
+        assignments = ", ".join(f"{c} = EXCLUDED.{c}" for c in updates)
+        # Unchanged rows are left alone, so the statement's count is real changes
+        changed = " OR ".join(
+            f"{self.table}.{c} IS DISTINCT FROM EXCLUDED.{c}" for c in updates
+        )
+        return (
+            f"{sql} ON CONFLICT ({conflict}) DO UPDATE SET {assignments} "
+            f"WHERE {changed}"
+        )
+
+    def flush(self):
+        """Writes all buffered rows in one statement and returns how many it wrote."""
+        if not self._buffered:
+            return 0
+
+        start = time.perf_counter()
+        batch = self._to_arrow()
+        if self.key_columns:
+            null_key = pc.is_null(batch[self.key_columns[0]])
+            for key in self.key_columns[1:]:
+                null_key = pc.or_(null_key, pc.is_null(batch[key]))
+            skipped = pc.sum(null_key).as_py() or 0
+            if skipped:
+                self.rows_skipped += skipped
+                batch = batch.filter(pc.invert(null_key))
+            rows = batch.num_rows
+            batch = self._dedup(batch)
+            self.rows_duplicate += rows - batch.num_rows
+        self.con.register(self._view, batch)
+        try:
+            if self.changelog is not None and self.key_columns:
+                updates = [c for c in self.columns if c not in self.key_columns]
+                self.changelog.record_batch(
+                    self.table,
+                    self._view,
+                    self.columns,
+                    self.key_columns,
+                    updates if self.mode == "upsert" else None,
+                )
+            written = self.con.execute(self._insert_sql()).fetchone()[0]
+        finally:
+            self.con.unregister(self._view)
+        if written:
+            bump_table_version(self.con, self.table)
+        self.seconds += time.perf_counter() - start
+
+        self.rows_sent += batch.num_rows
+        self.rows_written += written
+        self._rows = []
+        self._tables = []
+        self._buffered = 0
+        return written
+
+    @property
+    def rows_per_second(self):
+        return self.rows_sent / self.seconds if self.seconds else 0.0
+
+    def report(self):
+        """Prints throughput for this sink."""
+        skipped = ""
+        if self.rows_sent != self.rows_written:
+            skipped += f", {self.rows_sent} sent"
+        if self.rows_skipped:
+            skipped += f", skipped {self.rows_skipped} with NULL keys"
+        if self.rows_duplicate:
+            skipped += f", collapsed {self.rows_duplicate} duplicate keys"
+        print(
+            f"  [bulk] {self.table}: {self.rows_written} rows in {self.seconds:.2f}s "
+            f"({self.rows_per_second:,.0f} rows/s{skipped})"
+        )
+
+    def close(self):
+        """Flushes remaining rows and prints the sink's throughput."""
+        self.flush()
+        if self.rows_sent or self.rows_skipped:
+            self.report()
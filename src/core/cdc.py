@@ -0,0 +1,297 @@
+from collections import Counter
+from contextlib import contextmanager
+
+from src.core.frozen_seasons import FROZEN_TABLES
+
+
+def ensure_changelog(con):
+    con.execute("CREATE SEQUENCE IF NOT EXISTS changelog_version_seq START 1")
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS changelog (
+        version      BIGINT NOT NULL,
+        step         VARCHAR NOT NULL,
+        table_name   VARCHAR NOT NULL,
+        op           VARCHAR NOT NULL,  -- I(nserted), U(pdated), D(eleted)
+        row_key      VARCHAR NOT NULL,  -- primary key value, (a, b) if composite
+        season_id    INTEGER,
+        recorded_at  TIMESTAMP NOT NULL
+    )
+    """)
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS changelog_consumers (
+        consumer    VARCHAR PRIMARY KEY,
+        version     BIGINT NOT NULL,
+        applied_at  TIMESTAMP NOT NULL
+    )
+    """)
+
+
+def primary_key(con, table):
+    rows = con.execute(
+        """
+        SELECT constraint_column_names FROM duckdb_constraints()
+        WHERE table_name = ? AND constraint_type = 'PRIMARY KEY'
+        """,
+        [table],
+    ).fetchall()
+    return rows[0][0] if rows else None
+
+
+def key_sql(columns, alias):
+    return "(" + ", ".join(f"{alias}.{c}" for c in columns) + ")::VARCHAR"
+
+
+def table_columns(con, table):
+    return {
+        row[0]
+        for row in con.execute(
+            "SELECT column_name FROM duckdb_columns() WHERE table_name = ?", [table]
+        ).fetchall()
+    }
+
+
+def season_sql(table, columns, alias):
+    """(join, expression) giving the season_id of a row with `columns`, if any."""
+    if "season_id" in columns:
+        return "", f"{alias}.season_id"
+    for key in ("game_key", "game_id"):
+        if key in columns and table != "unified_games":
+            return (
+                f"LEFT JOIN unified_games_all cdc_g ON {alias}.{key} = cdc_g.{key}",
+                "cdc_g.season_id",
+            )
+    return "", "NULL"
+
+
+def unified_tables(con):
+    return [
+        row[0]
+        for row in con.execute(
+            "SELECT table_name FROM duckdb_tables() "
+            "WHERE table_name LIKE 'unified\\_%' ESCAPE '\\' AND NOT temporary"
+        ).fetchall()
+    ]
+
+
+class Changelog:
+    """
+    One pipeline step's entry in the append-only `changelog`: every key it
+    inserted, updated or deleted, per table, under a single version taken from
+    `changelog_version_seq`, so versions only grow and consumers can apply
+    everything after the last version they saw.
+
+    Writes are captured two ways: begin()/commit() (or capture()) snapshot a
+    hash of every row before and after the step and diff them set-based, which
+    works for any SQL, including DROP and rebuild; BulkWriter logs the keys of
+    each batch as it inserts them when given a changelog.
+
+    Args:
+        con: DuckDB connection the step writes through.
+        step (str): Name of the pipeline step, e.g. the script name.
+    """
+
+    def __init__(self, con, step):
+        ensure_changelog(con)
+        self.con = con
+        self.step = step
+        self.version = con.execute(
+            "SELECT nextval('changelog_version_seq')"
+        ).fetchone()[0]
+        self._snapshots = {}
+        self._all_tables = False
+
+    def record(self, table, changes_sql, params=None):
+        """Appends the (op, row_key, season_id) rows returned by `changes_sql`."""
+        self.con.execute(
+            f"""
+            INSERT INTO changelog
+            SELECT ?, ?, ?, op, row_key, season_id, now() FROM ({changes_sql})
+            """,
+            [self.version, self.step, table, *(params or [])],
+        )
+
+    def record_batch(self, table, batch, columns, key_columns, updates=None):
+        """
+        Logs the keys a BulkWriter batch (registered as `batch`) is about to
+        insert and, if `updates` lists the columns an upsert overwrites, the
+        existing keys whose values it changes. Call before the INSERT.
+        """
+        primary = primary_key(self.con, table)
+        keys = primary if primary and set(primary) <= set(columns) else key_columns
+        on = " AND ".join(f"b.{k} = t.{k}" for k in keys)
+        join, season = season_sql(table, set(columns), "b")
+        changes = f"""
+        SELECT DISTINCT 'I' AS op, {key_sql(keys, "b")} AS row_key,
+               {season} AS season_id
+        FROM (SELECT b.* FROM {batch} b ANTI JOIN {table} t ON {on}) b {join}
+        """
+        if updates:
+            changed = " OR ".join(f"b.{c} IS DISTINCT FROM t.{c}" for c in updates)
+            changes += f"""
+            UNION
+            SELECT 'U', {key_sql(keys, "b")}, {season}
+            FROM (
+                SELECT b.* FROM {batch} b JOIN {table} t ON {on} WHERE {changed}
+            ) b {join}
+            """
+        self.record(table, changes)
+
+    def _snapshot(self, table, name, empty=False):
+        """Temp table of (row_key, season_id, row_hash) for `table`, now."""
+        self.con.execute(
+            f"CREATE OR REPLACE TEMP TABLE {name} "
+            "(row_key VARCHAR, season_id INTEGER, row_hash UBIGINT)"
+        )
+        columns = primary_key(self.con, table)
+        if empty or columns is None:
+            return
+        relation = table
+        if (
+            table in FROZEN_TABLES
+            and self.con.execute(
+                "SELECT COUNT(*) FROM duckdb_views() WHERE view_name = ?",
+                [f"{table}_all"],
+            ).fetchone()[0]
+        ):
+            relation = f"{table}_all"
+        join, season = season_sql(table, table_columns(self.con, table), "t")
+        self.con.execute(f"""
+        INSERT INTO {name}
+        SELECT {key_sql(columns, "t")}, {season}, hash(t)
+        FROM {relation} t {join}
+        """)
+
+    def begin(self, tables=None):
+        """
+        Snapshots `tables` before the step. By default every unified_* table is
+        captured, including those the step creates.
+        """
+        self._all_tables = tables is None
+        existing = unified_tables(self.con)
+        for table in tables or existing:
+            if table in existing and primary_key(self.con, table) is None:
+                print(f"  [changelog] {table} has no primary key, not captured")
+            self._snapshots[table] = f"cdc_before_{table}"
+            self._snapshot(table, self._snapshots[table])
+
+    def commit(self):
+        """Diffs the tables begun against their current rows and logs the changes."""
+        tables = set(self._snapshots)
+        if self._all_tables:
+            tables |= set(unified_tables(self.con))
+        for table in sorted(tables):
+            before = f"cdc_before_{table}"
+            if table not in self._snapshots:
+                self._snapshot(table, before, empty=True)  # created by the step
+            after = f"cdc_after_{table}"
+            self._snapshot(table, after)
+            self.record(
+                table,
+                f"""
+                SELECT CASE WHEN b.row_key IS NULL THEN 'I'
+                            WHEN a.row_key IS NULL THEN 'D'
+                            ELSE 'U' END AS op,
+                       COALESCE(a.row_key, b.row_key) AS row_key,
+                       COALESCE(a.season_id, b.season_id) AS season_id
+                FROM {before} b FULL JOIN {after} a ON a.row_key = b.row_key
+                WHERE a.row_hash IS DISTINCT FROM b.row_hash
+                """,
+            )
+            self.con.execute(f"DROP TABLE {before}")
+            self.con.execute(f"DROP TABLE {after}")
+        self._snapshots = {}
+        self.print_summary()
+
+    @contextmanager
+    def capture(self, tables=None):
+        """begin() before the block, commit() after it unless it raised."""
+        self.begin(tables)
+        yield self
+        self.commit()
+
+    def counts(self):
+        """{table: Counter(op: keys)} logged under this version."""
+        counts = {}
+        for table, op, n in self.con.execute(
+            """
+            SELECT table_name, op, COUNT(*) FROM changelog
+            WHERE version = ? GROUP BY table_name, op
+            """,
+            [self.version],
+        ).fetchall():
+            counts.setdefault(table, Counter())[op] = n
+        return counts
+
+    def print_summary(self):
+        counts = self.counts()
+        print(f"Changelog version {self.version} ({self.step}):")
+        if not counts:
+            print("  no changes")
+        for table, ops in sorted(counts.items()):
+            print(f"  {table}: +{ops['I']} ~{ops['U']} -{ops['D']}")
+
+
+def latest_version(con):
+    ensure_changelog(con)
+    return con.execute("SELECT COALESCE(MAX(version), 0) FROM changelog").fetchone()[0]
+
+
+def applied_version(con, consumer):
+    """The last changelog version `consumer` applied, 0 if none."""
+    ensure_changelog(con)
+    row = con.execute(
+        "SELECT version FROM changelog_consumers WHERE consumer = ?", [consumer]
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def net_changes(con, since, tables, until=None):
+    """
+    [(table, op, row_key, season_id)] changed after version `since` (up to
+    `until`), one row per key with the last op recorded for it.
+    """
+    ensure_changelog(con)
+    return con.execute(
+        """
+        SELECT table_name, op, row_key, season_id FROM changelog
+        WHERE version > ? AND version <= COALESCE(?, version)
+          AND table_name IN (SELECT UNNEST(?::VARCHAR[]))
+        QUALIFY ROW_NUMBER() OVER (
+            PARTITION BY table_name, row_key ORDER BY version DESC
+        ) = 1
+        ORDER BY table_name, row_key
+        """,
+        [since, until, list(tables)],
+    ).fetchall()
+
+
+def changed_seasons_since(con, since, tables, until=None):
+    """season_ids with any change to `tables` after version `since`."""
+    ensure_changelog(con)
+    return sorted(
+        row[0]
+        for row in con.execute(
+            """
+            SELECT DISTINCT season_id FROM changelog
+            WHERE version > ? AND version <= COALESCE(?, version)
+              AND table_name IN (SELECT UNNEST(?::VARCHAR[]))
+              AND season_id IS NOT NULL
+            """,
+            [since, until, list(tables)],
+        ).fetchall()
+    )
+
+
+def mark_applied(con, consumer, version):
+    """Records that `consumer` has applied every change up to `version`."""
+    ensure_changelog(con)
+    con.execute(
+        """
+        INSERT INTO changelog_consumers (consumer, version, applied_at)
+        VALUES (?, ?, now())
+        ON CONFLICT (consumer) DO UPDATE SET
+            version = EXCLUDED.version,
+            applied_at = EXCLUDED.applied_at
+        """,
+        [consumer, version],
+    )
@@ -1,24 +1,188 @@
 import os
+from dataclasses import dataclass
 from pathlib import Path
 
+from dotenv import load_dotenv
+
 # Base directory
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
+# Values from a local .env never override variables already set in the environment.
+load_dotenv(BASE_DIR / ".env")
+
+
+def _env_str(name: str, default: str | None) -> str | None:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip()
+
+
+def _env_int(name: str, default: int | None) -> int | None:
+    value = _env_str(name, None)
+    return int(value) if value is not None else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = _env_str(name, None)
+    return float(value) if value is not None else default
+
+
+def _env_optional_path(name: str) -> Path | None:
+    """Reads a path from the environment, resolving relative paths against BASE_DIR."""
+    value = _env_str(name, None)
+    if value is None:
+        return None
+    path = Path(value)
+    return path if path.is_absolute() else BASE_DIR / path
+
+
+def _env_path(name: str, default: Path) -> Path:
+    return _env_optional_path(name) or default
+
+
+@dataclass(frozen=True)
+class DuckDBSettings:
+    """Resource limits for every DuckDB connection. None keeps DuckDB's default."""
+
+    threads: int | None
+    memory_limit: str | None
+    temp_directory: Path | None
+
+    def connection_config(self) -> dict[str, str | int]:
+        config: dict[str, str | int] = {}
+        if self.threads:
+            config["threads"] = self.threads
+        if self.memory_limit:
+            config["memory_limit"] = self.memory_limit
+        if self.temp_directory:
+            config["temp_directory"] = str(self.temp_directory)
+        return config
+
+
+@dataclass(frozen=True)
+class ScraperSettings:
+    """Politeness, concurrency and retry settings shared by all scrapers."""
+
+    user_agent: str | None  # None rotates through get_random_user_agent()
+    concurrency: int
+    requests_per_minute: float
+    delay_min: float
+    delay_max: float
+    request_timeout: float
+    page_timeout_ms: int
+    retries: int
+    retry_delay: float
+    rate_limit_backoff: float
+
+
+@dataclass(frozen=True)
+class CacheSettings:
+    """Where scraped pages and derived artifacts are cached, and for how long."""
+
+    cache_dir: Path
+    html_dir: Path
+    html_ttl_seconds: int  # 0 means cached pages never expire
+
+
+@dataclass(frozen=True)
+class SourceURLs:
+    bbref_base_url: str
+    octonion_base_url: str
+    advanced_stats_csv_url: str
+    end_of_season_teams_csv_url: str
+    transactions_csv_url: str
+
+
+@dataclass(frozen=True)
+class Settings:
+    db_path: Path
+    duckdb: DuckDBSettings
+    scraper: ScraperSettings
+    cache: CacheSettings
+    urls: SourceURLs
+
+
+def load_settings() -> Settings:
+    """
+    Builds the settings from environment variables (and .env), falling back to
+    defaults.
+    """
+    data_dir = BASE_DIR / "data"
+    cache_dir = _env_path("CACHE_DIR", data_dir / "cache")
+    # retry_on_failure counts attempts, so 0 would never make the request
+    retries = _env_int("SCRAPE_RETRIES", 3)
+    if retries < 1:
+        raise ValueError(f"SCRAPE_RETRIES must be at least 1, got {retries}")
+
+    return Settings(
+        db_path=_env_path("DB_PATH", data_dir / "nba.duckdb"),
+        duckdb=DuckDBSettings(
+            threads=_env_int("DUCKDB_THREADS", None),
+            memory_limit=_env_str("DUCKDB_MEMORY_LIMIT", None),
+            temp_directory=_env_optional_path("DUCKDB_TEMP_DIRECTORY"),
+        ),
+        scraper=ScraperSettings(
+            user_agent=_env_str("USER_AGENT", None),
+            concurrency=_env_int("SCRAPE_CONCURRENCY", 4) or 1,
+            requests_per_minute=_env_float("SCRAPE_REQUESTS_PER_MINUTE", 20.0),
+            delay_min=_env_float("SCRAPE_DELAY_MIN", 3.0),
+            delay_max=_env_float("SCRAPE_DELAY_MAX", 5.0),
+            request_timeout=_env_float("SCRAPE_REQUEST_TIMEOUT", 30.0),
+            page_timeout_ms=_env_int("SCRAPE_PAGE_TIMEOUT_MS", 60000) or 60000,
+            retries=retries,
+            retry_delay=_env_float("SCRAPE_RETRY_DELAY", 5.0),
+            rate_limit_backoff=_env_float("SCRAPE_RATE_LIMIT_BACKOFF", 60.0),
+        ),
+        cache=CacheSettings(
+            cache_dir=cache_dir,
+            html_dir=_env_path("HTML_CACHE_DIR", data_dir / "raw" / "html"),
+            html_ttl_seconds=_env_int("HTML_CACHE_TTL", 0) or 0,
+        ),
+        urls=SourceURLs(
+            bbref_base_url=(
+                _env_str("BBREF_BASE_URL", None)
+                or "https://www.basketball-reference.com"
+            ).rstrip("/"),
+            octonion_base_url=(
+                _env_str("OCTONION_BASE_URL", None)
+                or "https://raw.githubusercontent.com/octonion/basketball/master/bbref/csv"
+            ).rstrip("/"),
+            advanced_stats_csv_url=_env_str("ADVANCED_STATS_CSV_URL", None)
+            or "https://raw.githubusercontent.com/peasant98/TheNBACSV/master/nbaNew.csv",
+            end_of_season_teams_csv_url=_env_str("END_OF_SEASON_TEAMS_CSV_URL", None)
+            or "https://raw.githubusercontent.com/sumitrodatta/bball-reference-datasets/master/Data/End%20of%20Season%20Teams.csv",
+            transactions_csv_url=_env_str("TRANSACTIONS_CSV_URL", None)
+            or "https://raw.githubusercontent.com/rossgraham/NBA-Transaction-History/main/DB/Player_Trans.csv",
+        ),
+    )
+
+
+settings = load_settings()
+
 # Data paths
 DATA_DIR = BASE_DIR / "data"
 RAW_DATA_DIR = DATA_DIR / "raw"
-DB_PATH = DATA_DIR / "nba.duckdb"
+DB_PATH = settings.db_path
+CACHE_DIR = settings.cache.cache_dir
 
 # Scraper paths
-SCRAPER_DATA_DIR = RAW_DATA_DIR / "html"
+SCRAPER_DATA_DIR = settings.cache.html_dir
+
+# Remote sources
+BBREF_BASE_URL = settings.urls.bbref_base_url
 
 # CSV Files
 GAMES_CSV = RAW_DATA_DIR / "Games.csv"
 TEAM_HISTORIES_CSV = RAW_DATA_DIR / "TeamHistories.csv"
 PLAYERS_CSV = RAW_DATA_DIR / "Players.csv"
 PLAYER_STATISTICS_CSV = RAW_DATA_DIR / "PlayerStatistics.csv"
+DRAFT_PICK_HISTORY_CSV = RAW_DATA_DIR / "Draft Pick History.csv"
+PLAYER_AWARD_SHARES_CSV = RAW_DATA_DIR / "Player Award Shares.csv"
+PLAYER_PLAY_BY_PLAY_CSV = RAW_DATA_DIR / "Player Play By Play.csv"
 
 # Ensure directories exist
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(RAW_DATA_DIR, exist_ok=True)
 os.makedirs(SCRAPER_DATA_DIR, exist_ok=True)
+os.makedirs(CACHE_DIR, exist_ok=True)
@@ -1,11 +1,18 @@
 import duckdb
 
-from src.core.config import DB_PATH
+from src.core.config import DB_PATH, settings
 
 
-def get_db_connection():
-    """Returns a connection to the DuckDB database."""
-    return duckdb.connect(str(DB_PATH))
+def get_db_connection(read_only=False):
+    """
+    Returns a connection to the DuckDB database, with the configured resource
+    limits. Read-only connections never take the write lock or checkpoint.
+    """
+    return duckdb.connect(
+        str(DB_PATH),
+        read_only=read_only,
+        config=settings.duckdb.connection_config(),
+    )
 
 
 def query_db(query, params=None):
@@ -0,0 +1,129 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.config import CACHE_DIR, DB_PATH
+
+SIZE_CACHE_PATH = CACHE_DIR / "table_sizes.json"
+
+
+def existing_tables(con):
+    return {
+        row[0]
+        for row in con.execute(
+            "SELECT table_name FROM duckdb_tables() WHERE NOT temporary"
+        ).fetchall()
+    }
+
+
+def table_stats(con):
+    """
+    [(table, estimated_rows, columns, indexes, version, updated_at)] from the
+    catalog and table_versions, without touching any table data.
+    """
+    versions = (
+        "table_versions"
+        if "table_versions" in existing_tables(con)
+        else "(SELECT NULL::VARCHAR AS table_name, NULL::BIGINT AS version, "
+        "NULL::TIMESTAMP AS updated_at)"
+    )
+    return con.execute(f"""
+    SELECT t.table_name, t.estimated_size, t.column_count, t.index_count,
+           COALESCE(v.version, 0), v.updated_at
+    FROM duckdb_tables() t
+    LEFT JOIN {versions} v ON v.table_name = t.table_name
+    WHERE NOT t.internal AND NOT t.temporary
+    ORDER BY t.table_name
+    """).fetchall()
+
+
+def storage_bytes(con, table, block_size):
+    """
+    Bytes of the blocks holding `table`'s checkpointed segments; a block shared
+    with other small tables counts in full.
+    """
+    blocks = con.execute(
+        f"""
+        SELECT COUNT(DISTINCT block) FROM (
+            SELECT block_id AS block FROM pragma_storage_info('{table}')
+            WHERE persistent
+            UNION ALL
+            SELECT UNNEST(additional_block_ids) FROM pragma_storage_info('{table}')
+            WHERE persistent
+        )
+        """
+    ).fetchone()[0]
+    return blocks * block_size
+
+
+def table_sizes(con, stats):
+    """
+    {table: bytes on disk}. pragma_storage_info walks every segment, so sizes
+    are cached in SIZE_CACHE_PATH per database and only re-read for tables
+    whose version or row estimate changed since.
+    """
+    cache = json.loads(SIZE_CACHE_PATH.read_text()) if SIZE_CACHE_PATH.exists() else {}
+    cached = cache.get(str(DB_PATH), {})
+    block_size = con.execute(
+        "SELECT block_size FROM pragma_database_size()"
+    ).fetchone()[0]
+    sizes, fresh = {}, {}
+    for table, rows, _, _, version, _ in stats:
+        signature = f"{version}:{rows}"
+        entry = cached.get(table)
+        if entry and entry[0] == signature:
+            size = entry[1]
+        else:
+            size = storage_bytes(con, table, block_size)
+        sizes[table] = size
+        fresh[table] = [signature, size]
+    if fresh != cached:
+        cache[str(DB_PATH)] = fresh
+        SIZE_CACHE_PATH.write_text(json.dumps(cache))
+    return sizes
+
+
+def frozen_totals(con):
+    """{table: (rows, bytes)} of the frozen season files, from frozen_seasons."""
+    if "frozen_seasons" not in existing_tables(con):
+        return {}
+    totals = {}
+    for table, rows, path in con.execute(
+        "SELECT table_name, rows, path FROM frozen_seasons"
+    ).fetchall():
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        prev_rows, prev_size = totals.get(table, (0, 0))
+        totals[table] = (prev_rows + rows, prev_size + size)
+    return totals
+
+
+def last_runs(con):
+    """{pipeline step: last run time} from the run logs this database keeps."""
+    logs = {
+        "load": "SELECT MAX(updated_at) FROM table_versions",
+        "update": "SELECT MAX(finished_at) FROM update_runs",
+        "derive": "SELECT MAX(refreshed_at) FROM derived_refresh_state",
+        "freeze": "SELECT MAX(frozen_at) FROM frozen_seasons",
+        "audit": "SELECT MAX(run_at) FROM data_quality_history",
+        "changelog": "SELECT MAX(recorded_at) FROM changelog",
+    }
+    tables = existing_tables(con)
+    return {
+        step: con.execute(sql).fetchone()[0]
+        for step, sql in logs.items()
+        if sql.rsplit(" ", 1)[1] in tables
+    }
+
+
+def exact_counts(con, tables, workers):
+    """{table: COUNT(*)}, counted concurrently on one cursor per thread."""
+
+    def count(table):
+        with con.cursor() as cur:
+            return table, cur.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        counts = dict(pool.map(count, tables))
+    return counts, time.perf_counter() - start
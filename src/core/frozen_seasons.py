@@ -0,0 +1,83 @@
+import shutil
+
+from src.core.config import DB_PATH
+
+FROZEN_DIR = DB_PATH.parent / "frozen"
+
+# Children before parents: a game can only leave its heap table once no heap row
+# references it. Each table is read through a `<table>_all` view.
+FROZEN_TABLES = ["unified_player_boxscores", "unified_pbp_events", "unified_games"]
+
+
+def ensure_frozen_registry(con):
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS frozen_seasons (
+        table_name   VARCHAR NOT NULL,
+        season_id    INTEGER NOT NULL,
+        season_year  INTEGER NOT NULL,
+        path         VARCHAR NOT NULL,
+        rows         BIGINT NOT NULL,
+        fingerprint  VARCHAR NOT NULL,
+        frozen_at    TIMESTAMP NOT NULL,
+        PRIMARY KEY (table_name, season_id)
+    )
+    """)
+
+
+def frozen_tables(con):
+    """FROZEN_TABLES that exist in this database, in freeze order."""
+    existing = {
+        row[0]
+        for row in con.execute(
+            "SELECT table_name FROM duckdb_tables() WHERE table_name IN "
+            "(SELECT UNNEST(?::VARCHAR[]))",
+            [FROZEN_TABLES],
+        ).fetchall()
+    }
+    return [t for t in FROZEN_TABLES if t in existing]
+
+
+def frozen_parts(con, table):
+    """[(season_id, season_year, path)] frozen for one table, in season order."""
+    ensure_frozen_registry(con)
+    return con.execute(
+        "SELECT season_id, season_year, path FROM frozen_seasons "
+        "WHERE table_name = ? ORDER BY season_year",
+        [table],
+    ).fetchall()
+
+
+def frozen_fingerprints(con, table):
+    """{season_id: fingerprint} recorded when each season of `table` was frozen."""
+    ensure_frozen_registry(con)
+    return dict(
+        con.execute(
+            "SELECT season_id, fingerprint FROM frozen_seasons WHERE table_name = ?",
+            [table],
+        ).fetchall()
+    )
+
+
+def ensure_history_views(con):
+    """
+    (Re)creates `<table>_all` = live heap rows UNION ALL the frozen Parquet files,
+    for every table in FROZEN_TABLES. Call after any freeze or thaw.
+    """
+    for table in frozen_tables(con):
+        paths = [path.replace("'", "''") for _, _, path in frozen_parts(con, table)]
+        sql = f"SELECT * FROM {table}"
+        if paths:
+            files = ", ".join(f"'{p}'" for p in paths)
+            sql += (
+                " UNION ALL BY NAME SELECT * FROM "
+                f"read_parquet([{files}], hive_partitioning = false)"
+            )
+        con.execute(f"CREATE OR REPLACE VIEW {table}_all AS {sql}")
+
+
+def reset_frozen(con):
+    """Forgets every frozen season and deletes its files, for full rebuilds."""
+    ensure_frozen_registry(con)
+    con.execute("DELETE FROM frozen_seasons")
+    shutil.rmtree(FROZEN_DIR, ignore_errors=True)
+    ensure_history_views(con)
@@ -0,0 +1,96 @@
+from src.core.frozen_seasons import ensure_history_views
+from src.core.schema_types import ensure_enum_types
+
+# NBA API IDs are all digits ("0022300061"); Basketball-Reference IDs are
+# YYYYMMDD0 + home team code ("194611010TRH"). backfill_early_games synthesizes
+# YYYYMMDD0 + home team id, or UNKNOWN_<hash>_<home id> when the date is unparsable.
+GAME_ID_SOURCE_SQL = r"""
+CASE
+    WHEN regexp_full_match({col}, '\d{{8}}0[A-Z]{{3}}') THEN 'bbref'
+    WHEN regexp_full_match({col}, '\d{{8}}0\d{{4,}}') THEN 'synthetic'
+    WHEN regexp_full_match({col}, '\d+') THEN 'nba'
+    ELSE 'synthetic'
+END
+"""
+
+
+def ensure_game_xref(con):
+    """
+    unified_game_xref maps every known external game ID to the game's integer
+    game_key and canonical game_id, so any ID style resolves with one primary key
+    probe.
+    """
+    ensure_enum_types(con)
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS unified_game_xref (
+        external_id  VARCHAR PRIMARY KEY,
+        game_key     BIGINT NOT NULL,
+        game_id      VARCHAR NOT NULL,
+        id_source    game_id_source NOT NULL
+    )
+    """)
+    con.execute(
+        "CREATE INDEX IF NOT EXISTS idx_game_xref_game_key "
+        "ON unified_game_xref (game_key)"
+    )
+
+
+def sync_game_xref(con):
+    """Registers each game's own game_id. Returns the number of IDs added."""
+    ensure_game_xref(con)
+    ensure_history_views(con)
+    before = con.execute("SELECT COUNT(*) FROM unified_game_xref").fetchone()[0]
+    con.execute(f"""
+    INSERT OR IGNORE INTO unified_game_xref (external_id, game_key, game_id, id_source)
+    SELECT game_id, game_key, game_id, {GAME_ID_SOURCE_SQL.format(col="game_id")}
+    FROM unified_games_all
+    WHERE game_key IS NOT NULL
+    """)
+    return con.execute("SELECT COUNT(*) FROM unified_game_xref").fetchone()[0] - before
+
+
+def rebuild_game_xref(con):
+    """
+    Rebuilds the crosswalk after unified_games was reloaded with new game_keys.
+    Aliases registered earlier (e.g. Basketball-Reference IDs matched by the
+    scrapers) are carried over through the canonical game_id they pointed at.
+    """
+    ensure_game_xref(con)
+    con.execute("""
+    CREATE OR REPLACE TEMP TABLE game_xref_aliases AS
+    SELECT external_id, game_id, id_source FROM unified_game_xref
+    WHERE external_id <> game_id
+    """)
+    # Recreated rather than emptied, so older databases pick up the current DDL
+    con.execute("DROP TABLE unified_game_xref")
+    sync_game_xref(con)
+    con.execute("""
+    INSERT OR IGNORE INTO unified_game_xref (external_id, game_key, game_id, id_source)
+    SELECT a.external_id, x.game_key, x.game_id, a.id_source
+    FROM game_xref_aliases a
+    JOIN unified_game_xref x ON x.external_id = a.game_id
+    """)
+    con.execute("DROP TABLE game_xref_aliases")
+
+
+def resolve_game(con, external_id):
+    """(game_key, game_id) for any registered game ID, or None."""
+    ensure_game_xref(con)
+    return con.execute(
+        "SELECT game_key, game_id FROM unified_game_xref WHERE external_id = ?",
+        [external_id],
+    ).fetchone()
+
+
+def register_game_id(con, external_id, game_key, game_id):
+    """Adds an alias for a game (no-op if the ID is already registered)."""
+    ensure_game_xref(con)
+    con.execute(
+        f"""
+        INSERT OR IGNORE INTO unified_game_xref
+            (external_id, game_key, game_id, id_source)
+        SELECT id, ?, ?, {GAME_ID_SOURCE_SQL.format(col="id")}
+        FROM (SELECT ?::VARCHAR AS id)
+        """,
+        [game_key, game_id, external_id],
+    )
@@ -0,0 +1,73 @@
+# Code lists stored as DuckDB ENUMs: one byte per value instead of a string, and
+# comparisons against plain strings keep working.
+SEASON_TYPES = [
+    "PRE",  # preseason
+    "REG",  # regular season
+    "PIN",  # play-in tournament
+    "PO",  # playoffs
+    "ASG",  # All-Star game
+]
+AWARD_CODES = [
+    "MVP",
+    "ROY",
+    "DPOY",
+    "SMOY",
+    "MIP",
+    "ALL-NBA",
+    "ALL-DEF",
+    "ALL-ROOK",
+    "FINALS-MVP",
+]
+# Which ID scheme a game ID in unified_game_xref comes from
+GAME_ID_SOURCES = ["nba", "bbref", "synthetic"]
+ENUM_TYPES = {
+    "season_type": SEASON_TYPES,
+    "award_code": AWARD_CODES,
+    "game_id_source": GAME_ID_SOURCES,
+}
+
+
+def enum_values_sql(values):
+    return ", ".join("'" + v.replace("'", "''") + "'" for v in values)
+
+
+def ensure_enum_types(con):
+    """Creates the fixed ENUM types (season_type, award_code, ...) if missing."""
+    for name, values in ENUM_TYPES.items():
+        con.execute(
+            f"CREATE TYPE IF NOT EXISTS {name} AS ENUM ({enum_values_sql(values)})"
+        )
+
+
+def create_team_abbreviation_type(con, values_sql):
+    """
+    (Re)creates the team_abbreviation ENUM from a query returning one column of
+    abbreviations. Team history is only written by the unified migration, so the
+    type is rebuilt there after the tables using it were dropped.
+    """
+    con.execute("DROP TYPE IF EXISTS team_abbreviation")
+    con.execute(f"""
+    CREATE TYPE team_abbreviation AS ENUM (
+        SELECT DISTINCT abbreviation FROM ({values_sql}) v(abbreviation)
+        WHERE abbreviation IS NOT NULL
+        ORDER BY abbreviation
+    )
+    """)
+
+
+def ensure_game_key_sequence(con):
+    """
+    Points unified_games.game_key's default at a sequence starting after the
+    current maximum, so games inserted later (backfills) get the next key.
+    """
+    next_key = con.execute(
+        "SELECT COALESCE(MAX(game_key), 0) + 1 FROM unified_games"
+    ).fetchone()[0]
+    # The old default depends on the sequence, so it has to go first
+    con.execute("ALTER TABLE unified_games ALTER COLUMN game_key DROP DEFAULT")
+    con.execute("DROP SEQUENCE IF EXISTS game_key_seq")
+    con.execute(f"CREATE SEQUENCE game_key_seq START {next_key}")
+    con.execute(
+        "ALTER TABLE unified_games ALTER COLUMN game_key "
+        "SET DEFAULT nextval('game_key_seq')"
+    )
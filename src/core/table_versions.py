@@ -0,0 +1,50 @@
+def ensure_table_versions(con):
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS table_versions (
+        table_name  VARCHAR PRIMARY KEY,
+        version     BIGINT NOT NULL,
+        updated_at  TIMESTAMP NOT NULL
+    )
+    """)
+
+
+def bump_table_version(con, *tables):
+    """Records that the given tables changed. Call after every committed write."""
+    ensure_table_versions(con)
+    con.executemany(
+        """
+        INSERT INTO table_versions (table_name, version, updated_at)
+        VALUES (?, 1, now())
+        ON CONFLICT (table_name) DO UPDATE SET
+            version = table_versions.version + 1,
+            updated_at = EXCLUDED.updated_at
+        """,
+        [[table] for table in tables],
+    )
+
+
+def get_table_versions(con, tables):
+    """
+    Returns {table: (version, estimated_rows)}. The row estimate comes from DuckDB's
+    catalog, so tables written by code that doesn't bump a version still change
+    their signature when rows are added or removed.
+    """
+    has_versions = con.execute(
+        "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = 'table_versions'"
+    ).fetchone()[0]
+    versions = (
+        "table_versions"
+        if has_versions
+        else ("(SELECT NULL::VARCHAR AS table_name, NULL::BIGINT AS version)")
+    )
+    rows = con.execute(
+        f"""
+        SELECT t.table_name, COALESCE(v.version, 0), t.estimated_size
+        FROM duckdb_tables() t
+        LEFT JOIN {versions} v ON v.table_name = t.table_name
+        WHERE t.table_name IN (SELECT UNNEST(?::VARCHAR[]))
+        """,
+        [list(tables)],
+    ).fetchall()
+    found = {name: (version, size) for name, version, size in rows}
+    return {table: found.get(table, (0, 0)) for table in tables}
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+from collections import Counter
+from datetime import date
+from functools import lru_cache
+
+from src.core.config import CACHE_DIR, TEAM_HISTORIES_CSV
+from src.core.team_resolver import TeamEra, TeamResolver, as_date, normalize_key
+
+REGISTRY_PATH = CACHE_DIR / "team_registry.json"
+
+# Source abbreviations that differ from the NBA's (Basketball-Reference)
+ABBREVIATION_ALIASES = {
+    "PHO": "PHX",  # Phoenix Suns
+    "BRK": "BKN",  # Brooklyn Nets
+    "CHO": "CHA",  # Charlotte Hornets
+}
+
+# Early BAA/NBA names missing from TeamHistories.csv, or spelled differently by
+# the sources. Dated lookups only fall back to these when no era matches, so a
+# name reused later (Baltimore Bullets, Denver Nuggets) still resolves by date.
+TEAM_OVERRIDES = {
+    "Anderson Packers": 9028,
+    "Baltimore Bullets": 9071,  # 1944-1954, not the later Washington franchise
+    "Boston Celtics": 1610612738,
+    "Chicago Stags": 9059,
+    "Cleveland Rebels": 9017,
+    "Denver Nuggets": 9070,  # 1949-50, not the ABA franchise
+    "Detroit Falcons": 9020,
+    "Fort Wayne Pistons": 1610612765,
+    "Ft. Wayne Zollner Pistons": 1610612765,
+    "Indianapolis Jets": 9008,
+    "Indianapolis Olympians": 9058,
+    "Minneapolis Lakers": 1610612747,
+    "New York Knicks": 1610612752,
+    "Philadelphia Warriors": 1610612744,  # the Warriors franchise, not the 76ers
+    "Pittsburgh Ironmen": 9001,
+    "Providence Steam Rollers": 9056,
+    "Providence Steamrollers": 9056,
+    "Rochester Royals": 1610612758,
+    "Sheboygan Red Skins": 9063,
+    "Sheboygan Redskins": 9063,
+    "St. Louis Bombers": 9012,
+    "Syracuse Nationals": 1610612755,
+    "Toronto Huskies": 9042,
+    "Tri-Cities Blackhawks": 1610612737,
+    "Washington Capitols": 9015,  # 1946-1951
+    "Waterloo Hawks": 9002,
+}
+
+# Fuzzy matches need this Dice similarity over character trigrams
+MIN_FUZZY_SCORE = 0.7
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def source_fingerprint(path=TEAM_HISTORIES_CSV):
+    """Changes when the CSV, the aliases or the overrides do."""
+    stat = os.stat(path) if os.path.exists(path) else None
+    payload = json.dumps(
+        [
+            stat and [stat.st_size, stat.st_mtime_ns],
+            ABBREVIATION_ALIASES,
+            TEAM_OVERRIDES,
+        ],
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class TeamRegistry:
+    """
+    Maps team names, abbreviations and nicknames to a canonical team ID. Exact
+    keys are a dict probe plus a bisect over that key's few eras; anything else
+    goes through a trigram index once and the match is remembered. Unresolved
+    names are counted in `misses` for print_miss_report().
+
+    Args:
+        resolver (TeamResolver): Team eras, with abbreviation aliases applied.
+        overrides (dict): Extra name -> team ID fallbacks.
+    """
+
+    def __init__(self, resolver, overrides):
+        self.resolver = resolver
+        self.overrides = {normalize_key(k): v for k, v in overrides.items()}
+        self.misses = Counter()
+        self.fuzzy_matches = {}
+        self._candidates = {}
+        self._ngram_index = None
+
+    def _lookup(self, key, day):
+        if day is None:
+            team_id = self.overrides.get(key)
+            if team_id is None:
+                era = self.resolver.latest(key)
+                team_id = era.team_id if era else None
+            return team_id
+        team_id = self.resolver.team_id(key, day)
+        return team_id if team_id is not None else self.overrides.get(key)
+
+    def _fuzzy_candidates(self, key):
+        """Known keys similar to `key`, best first."""
+        if key not in self._candidates:
+            if self._ngram_index is None:
+                self._ngram_index = {}
+                for known in {*self.resolver.keys(), *self.overrides}:
+                    for gram in trigrams(known):
+                        self._ngram_index.setdefault(gram, set()).add(known)
+            grams = trigrams(key)
+            shared = Counter(
+                known for gram in grams for known in self._ngram_index.get(gram, ())
+            )
+            scored = [
+                (2 * n / (len(grams) + len(trigrams(known))), known)
+                for known, n in shared.items()
+            ]
+            self._candidates[key] = [
+                known
+                for score, known in sorted(scored, reverse=True)
+                if score >= MIN_FUZZY_SCORE
+            ]
+        return self._candidates[key]
+
+    def team_id(self, name, when=None):
+        """
+        The team ID `name` referred to on `when` (a date, ISO date string or season
+        start year), or None. Without a date, overrides win over the most recent
+        era of the name.
+        """
+        if not name:
+            return None
+        key = normalize_key(str(name))
+        day = None if when is None else as_date(when)
+        team_id = self._lookup(key, day)
+        if team_id is None:
+            for candidate in self._fuzzy_candidates(key):
+                team_id = self._lookup(candidate, day)
+                if team_id is not None:
+                    self.fuzzy_matches[name] = candidate
+                    break
+        if team_id is None:
+            self.misses[name] += 1
+        return team_id
+
+    def print_miss_report(self):
+        if self.fuzzy_matches:
+            print(f"Team names matched approximately ({len(self.fuzzy_matches)}):")
+            for name, key in sorted(self.fuzzy_matches.items()):
+                print(f"  {name!r} -> {key!r}")
+        if self.misses:
+            print(f"Unresolved team names ({sum(self.misses.values())} lookups):")
+            for name, count in self.misses.most_common():
+                print(f"  {name!r}: {count}")
+
+
+def compile_registry(path=TEAM_HISTORIES_CSV):
+    """Writes the eras of TeamHistories.csv to REGISTRY_PATH."""
+    eras = TeamResolver.from_csv(path).eras
+    REGISTRY_PATH.write_text(
+        json.dumps(
+            {
+                "fingerprint": source_fingerprint(path),
+                "eras": [
+                    [
+                        e.team_id,
+                        e.city,
+                        e.nickname,
+                        e.abbreviation,
+                        e.start.isoformat(),
+                        e.end and e.end.isoformat(),
+                    ]
+                    for e in eras
+                ],
+            }
+        )
+    )
+    print(f"Compiled {len(eras)} team eras into {REGISTRY_PATH}")
+    return eras
+
+
+def load_eras(path=TEAM_HISTORIES_CSV):
+    if REGISTRY_PATH.exists():
+        compiled = json.loads(REGISTRY_PATH.read_text())
+        # A cached registry is still usable without the CSV
+        if compiled["fingerprint"] == source_fingerprint(path) or not os.path.exists(
+            path
+        ):
+            return [
+                TeamEra(
+                    team_id,
+                    city,
+                    nickname,
+                    abbreviation,
+                    date.fromisoformat(start),
+                    end and date.fromisoformat(end),
+                )
+                for team_id, city, nickname, abbreviation, start, end in compiled[
+                    "eras"
+                ]
+            ]
+    if not os.path.exists(path):
+        print(f"Warning: {path} not found. Team mapping will be limited.")
+        return []
+    return compile_registry(path)
+
+
+@lru_cache(maxsize=1)
+def load_team_registry():
+    """
+    The shared registry, compiled from TeamHistories.csv on first use (and when
+    it changes) and cached in data/cache. Callers share one instance, and with it
+    the miss counts.
+    """
+    resolver = TeamResolver(load_eras())
+    for alias, abbreviation in ABBREVIATION_ALIASES.items():
+        resolver.add_alias(alias, abbreviation)
+    return TeamRegistry(resolver, TEAM_OVERRIDES)
@@ -0,0 +1,184 @@
+import bisect
+import csv
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from src.core.config import TEAM_HISTORIES_CSV
+
+# TeamHistories.csv lists each era's first and last season (by start year). An era
+# runs from July 1 of its first season to July 1 after its last one, so drafts and
+# summer relocations land on the right side of the boundary.
+SEASON_ROLLOVER_MONTH = 7
+FIRST_SEASON = 1946
+# seasonActiveTill of teams still playing under that name
+ACTIVE_SINCE = 2025
+
+
+def season_start(season_year):
+    return date(season_year, SEASON_ROLLOVER_MONTH, 1)
+
+
+def season_of(day):
+    """Start year of the season `day` falls in, by the July rollover."""
+    return day.year if day.month >= SEASON_ROLLOVER_MONTH else day.year - 1
+
+
+def season_date(season_year):
+    """A date inside the given season (start year), for season-level lookups."""
+    return date(season_year + 1, 1, 1)
+
+
+@dataclass(frozen=True)
+class TeamEra:
+    team_id: int
+    city: str
+    nickname: str
+    abbreviation: str | None
+    start: date
+    end: date | None = None  # exclusive; None while the name is current
+
+    @property
+    def name(self):
+        return f"{self.city} {self.nickname}"
+
+    def covers(self, day):
+        return self.start <= day and (self.end is None or day < self.end)
+
+
+def normalize_key(key):
+    return " ".join(key.split()).casefold()
+
+
+def as_date(when):
+    if isinstance(when, datetime):
+        return when.date()
+    if isinstance(when, date):
+        return when
+    if isinstance(when, str):
+        return date.fromisoformat(when)
+    return season_date(int(when))
+
+
+class TeamResolver:
+    """
+    Point-in-time lookup of a team by abbreviation, full name ("Boston Celtics")
+    or nickname. Every key keeps its eras sorted by start date and a lookup bisects
+    on the date, so it returns at most one era in O(log eras).
+
+    Args:
+        eras (iterable[TeamEra]): Team eras, e.g. from from_csv() or from_db().
+    """
+
+    def __init__(self, eras):
+        self.eras = sorted(eras, key=lambda e: (e.start, e.team_id))
+        self._index = {}
+        for era in self.eras:
+            keys = {era.name, era.nickname}
+            if era.abbreviation:
+                keys.add(era.abbreviation)
+            for key in keys:
+                self._index.setdefault(normalize_key(key), []).append(era)
+        self._starts = {
+            key: [era.start for era in eras] for key, eras in self._index.items()
+        }
+
+    @classmethod
+    def from_csv(cls, path=TEAM_HISTORIES_CSV):
+        with open(path, encoding="utf-8") as f:
+            return cls(
+                TeamEra(
+                    team_id=int(row["teamId"]),
+                    city=row["teamCity"].strip(),
+                    nickname=row["teamName"].strip(),
+                    abbreviation=row["teamAbbrev"].strip() or None,
+                    start=season_start(int(row["seasonFounded"] or FIRST_SEASON)),
+                    end=(
+                        None
+                        if int(row["seasonActiveTill"]) >= ACTIVE_SINCE
+                        else season_start(int(row["seasonActiveTill"]) + 1)
+                    ),
+                )
+                for row in csv.DictReader(f)
+            )
+
+    @classmethod
+    def from_db(cls, con):
+        rows = con.execute("""
+            SELECT team_id, city, nickname, abbreviation::VARCHAR,
+                   effective_start, effective_end
+            FROM unified_team_history
+        """).fetchall()
+        return cls(TeamEra(*row) for row in rows)
+
+    def add_alias(self, alias, key):
+        """Makes `alias` (e.g. Basketball-Reference's "PHO") resolve like `key`."""
+        eras = self._index.get(normalize_key(key))
+        if eras:
+            self._index[normalize_key(alias)] = eras
+            self._starts[normalize_key(alias)] = self._starts[normalize_key(key)]
+
+    def keys(self):
+        """Normalized keys (abbreviations, names, nicknames and aliases)."""
+        return self._index.keys()
+
+    def latest(self, key):
+        """The most recent era `key` referred to, regardless of date."""
+        eras = self._index.get(normalize_key(key)) if key else None
+        return eras[-1] if eras else None
+
+    def resolve(self, key, when):
+        """
+        The era `key` referred to on `when` (a date, ISO date string or season
+        start year), or None. If eras overlap, the one that started last wins.
+        """
+        if not key:
+            return None
+        norm = normalize_key(key)
+        starts = self._starts.get(norm)
+        if not starts:
+            return None
+        day = as_date(when)
+        i = bisect.bisect_right(starts, day) - 1
+        if i < 0:
+            return None
+        era = self._index[norm][i]
+        return era if era.covers(day) else None
+
+    def team_id(self, key, when):
+        era = self.resolve(key, when)
+        return era.team_id if era else None
+
+
+def build_team_seasons(con):
+    """
+    (Re)builds unified_team_seasons: exactly one name/abbreviation row per team and
+    season, the pre-joined form of the resolver for SQL. Join it on
+    (team_id, season_id) instead of joining unified_team_history on team_id, which
+    fans out across every era of the franchise.
+    """
+    con.execute("""
+    CREATE OR REPLACE TABLE unified_team_seasons (
+      team_id          BIGINT NOT NULL,
+      season_id        INTEGER NOT NULL,
+      season_year      INTEGER NOT NULL,
+      team_history_id  INTEGER NOT NULL,
+      city             VARCHAR NOT NULL,
+      nickname         VARCHAR NOT NULL,
+      abbreviation     team_abbreviation,
+      PRIMARY KEY (team_id, season_id)
+    )
+    """)
+    con.execute("""
+    INSERT INTO unified_team_seasons
+    SELECT h.team_id, s.season_id, s.season_year, h.team_history_id,
+           h.city, h.nickname, h.abbreviation
+    FROM (
+        SELECT *, make_date(season_year + 1, 1, 1) AS season_day FROM unified_seasons
+    ) s
+    JOIN unified_team_history h
+      ON h.effective_start <= s.season_day
+     AND (h.effective_end IS NULL OR s.season_day < h.effective_end)
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY h.team_id, s.season_id ORDER BY h.effective_start DESC
+    ) = 1
+    """)
@@ -1,18 +1,25 @@
 import time
 import functools
-import requests
+import os
 import random
+import threading
 
+from src.core.config import settings
 
-def retry_on_failure(retries=3, delay=5, backoff=2):
+
+def retry_on_failure(retries=None, delay=None, backoff=2):
     """
     Retry decorator with exponential backoff.
 
     Args:
-        retries (int): Maximum number of retries.
-        delay (int): Initial delay in seconds.
+        retries (int): Maximum number of retries. Defaults to SCRAPE_RETRIES.
+        delay (int): Initial delay in seconds. Defaults to SCRAPE_RETRY_DELAY.
         backoff (int): Multiplier for delay after each failure.
     """
+    if retries is None:
+        retries = settings.scraper.retries
+    if delay is None:
+        delay = settings.scraper.retry_delay
 
     def decorator(func):
         @functools.wraps(func)
@@ -49,3 +56,70 @@ def get_random_user_agent():
         "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     ]
     return random.choice(user_agents)
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls evenly to stay within a per-minute budget.
+
+    Every worker shares the same instance, so the budget is global to the process
+    no matter how many fetches run concurrently.
+    """
+
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Blocks until the caller may issue its next request."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# Shared request budget for every scraper in this process (SCRAPE_REQUESTS_PER_MINUTE)
+scrape_rate_limiter = RateLimiter(settings.scraper.requests_per_minute)
+
+
+def get_request_headers():
+    """Returns HTTP headers for scraper requests, honouring a configured USER_AGENT."""
+    return {"User-Agent": settings.scraper.user_agent or get_random_user_agent()}
+
+
+def polite_sleep(min_seconds=None, max_seconds=None):
+    """
+    Sleeps for a random interval between requests (SCRAPE_DELAY_MIN/MAX by
+    default).
+    """
+    low = settings.scraper.delay_min if min_seconds is None else min_seconds
+    high = settings.scraper.delay_max if max_seconds is None else max_seconds
+    time.sleep(random.uniform(low, max(low, high)))
+
+
+def read_cached_page(path):
+    """
+    Returns the cached page at `path`, or None if it is missing or older than
+    HTML_CACHE_TTL seconds (a TTL of 0 keeps pages forever).
+    """
+    if not os.path.exists(path):
+        return None
+    ttl = settings.cache.html_ttl_seconds
+    if ttl and time.time() - os.path.getmtime(path) > ttl:
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def write_cached_page(path, content):
+    """Stores raw page content in the HTML cache."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if isinstance(content, bytes):
+        with open(path, "wb") as f:
+            f.write(content)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
@@ -0,0 +1,221 @@
+import argparse
+import time
+
+from src.core.database import get_db_connection
+from src.core.table_versions import bump_table_version
+from src.etl.derive.refresh_state import (
+    boxscore_fingerprints,
+    changed_seasons,
+    mark_refreshed,
+)
+
+ENGINE = "advanced_metrics"
+
+RATE_STATS = {
+    "pts": "points",
+    "reb": "rebounds_total",
+    "ast": "assists",
+    "stl": "steals",
+    "blk": "blocks",
+    "tov": "turnovers",
+}
+
+# Columns this engine owns; the external-CSV columns (per, ws, bpm, ...) are kept.
+DERIVED_COLUMNS = {
+    "games": "INTEGER",
+    "minutes": "DOUBLE",
+    "efg_pct": "DOUBLE",
+    "team_pace": "DOUBLE",
+    **{f"{name}_per36": "DOUBLE" for name in RATE_STATS},
+    **{f"{name}_per100": "DOUBLE" for name in RATE_STATS},
+}
+
+
+def ensure_columns(con):
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS unified_player_season_advanced (
+        season_id INTEGER REFERENCES unified_seasons(season_id),
+        player_id BIGINT REFERENCES unified_players(player_id),
+        team_id BIGINT REFERENCES unified_teams(team_id),
+        per DOUBLE,
+        ts_pct DOUBLE,
+        usg_pct DOUBLE,
+        ows DOUBLE,
+        dws DOUBLE,
+        ws DOUBLE,
+        ws_48 DOUBLE,
+        obpm DOUBLE,
+        dbpm DOUBLE,
+        bpm DOUBLE,
+        vorp DOUBLE,
+        PRIMARY KEY (season_id, player_id, team_id)
+    )
+    """)
+    for column, dtype in DERIVED_COLUMNS.items():
+        con.execute(
+            f"ALTER TABLE unified_player_season_advanced "
+            f"ADD COLUMN IF NOT EXISTS {column} {dtype}"
+        )
+
+
+def compute_sql():
+    """
+    Player-season metrics for the seasons in the `derive_seasons` temp table.
+
+    Team and opponent totals come from window partitions over each game, so the
+    whole computation is one scan of the box scores. unified_player_boxscores has
+    no offensive rebounds, so possessions are estimated as FGA + 0.44*FTA + TOV,
+    averaged over both teams.
+    """
+    per36 = ",\n        ".join(
+        f"36 * SUM({col}) / NULLIF(SUM(mp), 0) AS {name}_per36"
+        for name, col in RATE_STATS.items()
+    )
+    per100 = ",\n        ".join(
+        f"100 * SUM({col}) / NULLIF(SUM(on_court_poss), 0) AS {name}_per100"
+        for name, col in RATE_STATS.items()
+    )
+    return f"""
+    WITH box AS (
+        SELECT
+            g.season_id,
+            b.game_key,
+            b.player_id,
+            b.team_id,
+            COALESCE(b.minutes, 0) AS mp,
+            COALESCE(b.points, 0) AS points,
+            COALESCE(b.rebounds_total, 0) AS rebounds_total,
+            COALESCE(b.assists, 0) AS assists,
+            COALESCE(b.steals, 0) AS steals,
+            COALESCE(b.blocks, 0) AS blocks,
+            COALESCE(b.turnovers, 0) AS turnovers,
+            COALESCE(b.fgm, 0) AS fgm,
+            COALESCE(b.fga, 0) AS fga,
+            COALESCE(b.fg3m, 0) AS fg3m,
+            COALESCE(b.fta, 0) AS fta,
+            COALESCE(b.fga, 0) + 0.44 * COALESCE(b.fta, 0)
+                + COALESCE(b.turnovers, 0) AS plays
+        FROM unified_player_boxscores_all b
+        JOIN unified_games_all g ON b.game_key = g.game_key
+        WHERE g.season_id IN (SELECT season_id FROM derive_seasons)
+    ),
+    ctx AS (
+        SELECT
+            *,
+            SUM(mp) OVER team_game AS team_mp,
+            SUM(plays) OVER team_game AS team_plays,
+            -- Average of team and opponent possessions
+            SUM(plays) OVER game / 2 AS game_poss
+        FROM box
+        WINDOW
+            team_game AS (PARTITION BY game_key, team_id),
+            game AS (PARTITION BY game_key)
+    ),
+    played AS (
+        SELECT
+            *,
+            game_poss * mp / NULLIF(team_mp / 5, 0) AS on_court_poss
+        FROM ctx
+        WHERE mp > 0
+    ),
+    team_pace AS (
+        SELECT
+            season_id,
+            team_id,
+            48 * SUM(game_poss) / NULLIF(SUM(team_mp) / 5, 0) AS team_pace
+        FROM (SELECT DISTINCT season_id, game_key, team_id, game_poss, team_mp FROM ctx)
+        GROUP BY season_id, team_id
+    ),
+    player_season AS (
+        SELECT
+            season_id,
+            player_id,
+            team_id,
+            COUNT(*) AS games,
+            SUM(mp) AS minutes,
+            SUM(points) / NULLIF(2 * (SUM(fga) + 0.44 * SUM(fta)), 0) AS ts_pct,
+            (SUM(fgm) + 0.5 * SUM(fg3m)) / NULLIF(SUM(fga), 0) AS efg_pct,
+            -- Share of team plays while on court, over the games the player played
+            SUM(plays) * (SUM(team_mp) / 5)
+                / NULLIF(SUM(mp) * SUM(team_plays), 0) AS usg_pct,
+            {per36},
+            {per100}
+        FROM played
+        GROUP BY season_id, player_id, team_id
+    )
+    SELECT ps.*, tp.team_pace
+    FROM player_season ps
+    JOIN team_pace tp USING (season_id, team_id)
+    """
+
+
+def compute_advanced_metrics(full=False):
+    con = get_db_connection()
+    ensure_columns(con)
+
+    fingerprints = boxscore_fingerprints(con)
+    seasons = changed_seasons(
+        con,
+        ENGINE,
+        fingerprints,
+        full=full,
+        present_sql="SELECT DISTINCT season_id FROM unified_player_season_advanced "
+        "WHERE games IS NOT NULL",
+    )
+    if not seasons:
+        print("Advanced metrics are up to date.")
+        con.close()
+        return
+
+    print(f"Computing advanced metrics for {len(seasons)} seasons...")
+    start = time.perf_counter()
+
+    columns = ["ts_pct", "usg_pct", *DERIVED_COLUMNS]
+    col_list = ", ".join(columns)
+    assignments = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns)
+
+    con.begin()
+    try:
+        con.execute(
+            "CREATE OR REPLACE TEMP TABLE derive_seasons AS "
+            "SELECT UNNEST(?::INTEGER[]) AS season_id",
+            [seasons],
+        )
+        con.execute(f"""
+        INSERT INTO unified_player_season_advanced
+            (season_id, player_id, team_id, {col_list})
+        SELECT season_id, player_id, team_id, {col_list}
+        FROM ({compute_sql()})
+        ON CONFLICT (season_id, player_id, team_id) DO UPDATE SET {assignments}
+        """)
+        mark_refreshed(con, ENGINE, fingerprints, seasons)
+        bump_table_version(con, "unified_player_season_advanced")
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+
+    rows = con.execute(
+        "SELECT COUNT(*) FROM unified_player_season_advanced "
+        "WHERE season_id IN (SELECT season_id FROM derive_seasons) "
+        "AND games IS NOT NULL"
+    ).fetchone()[0]
+    print(
+        f"Wrote {rows} player-season rows for {len(seasons)} seasons "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    con.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Derive advanced metrics from unified box scores"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Recompute every season, not just changed ones",
+    )
+    args = parser.parse_args()
+
+    compute_advanced_metrics(full=args.full)
@@ -0,0 +1,197 @@
+import argparse
+import time
+
+from src.core.database import get_db_connection
+from src.core.table_versions import bump_table_version
+from src.etl.derive.refresh_state import (
+    boxscore_fingerprints,
+    changed_seasons,
+    mark_refreshed,
+)
+
+ENGINE = "leaderboards"
+
+# Share of the season's games (the most any team has played so far) a player
+# needs to qualify for per-game leaderboards; 0.79 ~ 65 of 82 games.
+MIN_GAMES_SHARE = 0.79
+
+# stat -> (value expression, qualifier expression) over `player_totals`.
+# `season_scale` is the season's games so far / 82, so made-shot minimums
+# scale with shortened and in-progress seasons.
+STATS = {
+    "pts_per_g": ("pts / games", "games_qualified"),
+    "trb_per_g": ("trb / games", "games_qualified"),
+    "ast_per_g": ("ast / games", "games_qualified"),
+    "stl_per_g": ("stl / games", "games_qualified"),
+    "blk_per_g": ("blk / games", "games_qualified"),
+    "tov_per_g": ("tov / games", "games_qualified"),
+    "mp_per_g": ("mp / games", "games_qualified"),
+    "pts": ("pts", "TRUE"),
+    "trb": ("trb", "TRUE"),
+    "ast": ("ast", "TRUE"),
+    "stl": ("stl", "TRUE"),
+    "blk": ("blk", "TRUE"),
+    "fg_pct": ("fgm / NULLIF(fga, 0)", "fgm >= 300 * season_scale"),
+    "fg3_pct": ("fg3m / NULLIF(fg3a, 0)", "fg3m >= 82 * season_scale"),
+    "ft_pct": ("ftm / NULLIF(fta, 0)", "ftm >= 125 * season_scale"),
+    "ts_pct": (
+        "pts / NULLIF(2 * (fga + 0.44 * fta), 0)",
+        "fga >= 300 * season_scale",
+    ),
+}
+
+
+def ensure_table(con):
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS unified_season_leaderboards (
+        season_id    INTEGER NOT NULL,
+        stat         VARCHAR NOT NULL,
+        player_id    BIGINT NOT NULL,
+        games        INTEGER,
+        value        DOUBLE,
+        qualified    BOOLEAN NOT NULL,
+        rank         INTEGER,
+        percentile   DOUBLE,
+        PRIMARY KEY (season_id, stat, player_id)
+    )
+    """)
+    con.execute(
+        "CREATE INDEX IF NOT EXISTS idx_season_leaderboards_player "
+        "ON unified_season_leaderboards (player_id)"
+    )
+
+
+def leaderboard_sql():
+    """
+    One row per (season, stat, player) for the seasons in `board_seasons`. Rank
+    and percentile are among qualified players only; ties share a rank.
+    """
+    per_stat = "\n        UNION ALL\n        ".join(
+        f"SELECT season_id, '{stat}' AS stat, player_id, games, "
+        f"CAST({value} AS DOUBLE) AS value, COALESCE({qualifier}, FALSE) AS qualified "
+        f"FROM player_totals"
+        for stat, (value, qualifier) in STATS.items()
+    )
+    return f"""
+    WITH box AS (
+        SELECT g.season_id, b.*
+        FROM unified_player_boxscores_all b
+        JOIN unified_games_all g ON b.game_key = g.game_key
+        WHERE g.season_id IN (SELECT season_id FROM board_seasons)
+    ),
+    season_games AS (
+        -- Most games played by any team so far in the season
+        SELECT season_id, MAX(team_games) AS team_games
+        FROM (
+            SELECT season_id, team_id, COUNT(DISTINCT game_key) AS team_games
+            FROM box
+            GROUP BY season_id, team_id
+        )
+        GROUP BY season_id
+    ),
+    player_totals AS (
+        SELECT
+            b.season_id,
+            b.player_id,
+            COUNT(*) FILTER (WHERE b.minutes > 0) AS games,
+            COUNT(*) FILTER (WHERE b.minutes > 0)
+                >= {MIN_GAMES_SHARE} * ANY_VALUE(sg.team_games) AS games_qualified,
+            ANY_VALUE(sg.team_games) / 82.0 AS season_scale,
+            SUM(b.minutes) AS mp,
+            CAST(SUM(b.points) AS DOUBLE) AS pts,
+            CAST(SUM(b.rebounds_total) AS DOUBLE) AS trb,
+            CAST(SUM(b.assists) AS DOUBLE) AS ast,
+            CAST(SUM(b.steals) AS DOUBLE) AS stl,
+            CAST(SUM(b.blocks) AS DOUBLE) AS blk,
+            CAST(SUM(b.turnovers) AS DOUBLE) AS tov,
+            CAST(SUM(b.fgm) AS DOUBLE) AS fgm,
+            CAST(SUM(b.fga) AS DOUBLE) AS fga,
+            CAST(SUM(b.fg3m) AS DOUBLE) AS fg3m,
+            CAST(SUM(b.fg3a) AS DOUBLE) AS fg3a,
+            CAST(SUM(b.ftm) AS DOUBLE) AS ftm,
+            CAST(SUM(b.fta) AS DOUBLE) AS fta
+        FROM box b
+        JOIN season_games sg ON b.season_id = sg.season_id
+        GROUP BY b.season_id, b.player_id
+        HAVING COUNT(*) FILTER (WHERE b.minutes > 0) > 0
+    ),
+    long AS (
+        {per_stat}
+    )
+    SELECT
+        season_id,
+        stat,
+        player_id,
+        games,
+        value,
+        qualified,
+        CASE WHEN qualified AND value IS NOT NULL THEN RANK() OVER board END AS rank,
+        CASE WHEN qualified AND value IS NOT NULL
+            THEN 1 - PERCENT_RANK() OVER board END AS percentile
+    FROM long
+    WINDOW board AS (
+        PARTITION BY season_id, stat, (qualified AND value IS NOT NULL)
+        ORDER BY value DESC
+    )
+    """
+
+
+def update_leaderboards(full=False):
+    con = get_db_connection()
+    ensure_table(con)
+
+    fingerprints = boxscore_fingerprints(con)
+    seasons = changed_seasons(
+        con,
+        ENGINE,
+        fingerprints,
+        full=full,
+        present_sql="SELECT DISTINCT season_id FROM unified_season_leaderboards",
+    )
+    if not seasons:
+        print("Leaderboards are up to date.")
+        con.close()
+        return
+
+    print(f"Refreshing leaderboards for {len(seasons)} seasons...")
+    start = time.perf_counter()
+    con.begin()
+    try:
+        con.execute(
+            "CREATE OR REPLACE TEMP TABLE board_seasons AS "
+            "SELECT UNNEST(?::INTEGER[]) AS season_id",
+            [seasons],
+        )
+        con.execute(
+            "DELETE FROM unified_season_leaderboards "
+            "WHERE season_id IN (SELECT season_id FROM board_seasons)"
+        )
+        con.execute(f"INSERT INTO unified_season_leaderboards {leaderboard_sql()}")
+        mark_refreshed(con, ENGINE, fingerprints, seasons)
+        bump_table_version(con, "unified_season_leaderboards")
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+
+    rows = con.execute(
+        "SELECT COUNT(*) FROM unified_season_leaderboards "
+        "WHERE season_id IN (SELECT season_id FROM board_seasons)"
+    ).fetchone()[0]
+    print(
+        f"Wrote {rows} leaderboard rows ({len(STATS)} stats) "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    con.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute season leaderboards")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Recompute every season, not just changed ones",
+    )
+    args = parser.parse_args()
+
+    update_leaderboards(full=args.full)
@@ -0,0 +1,268 @@
+import argparse
+import time
+
+from src.core.database import get_db_connection
+from src.core.table_versions import bump_table_version
+from src.etl.derive.refresh_state import (
+    boxscore_fingerprints,
+    changed_seasons,
+    mark_refreshed,
+)
+
+ENGINE = "player_game_log"
+
+# Box score columns copied per game; each also gets a season-to-date total
+GAME_STATS = {
+    "minutes": "DOUBLE",
+    "points": "INTEGER",
+    "rebounds_total": "INTEGER",
+    "assists": "INTEGER",
+    "steals": "INTEGER",
+    "blocks": "INTEGER",
+    "turnovers": "INTEGER",
+    "fgm": "INTEGER",
+    "fga": "INTEGER",
+    "fg3m": "INTEGER",
+    "ftm": "INTEGER",
+    "fta": "INTEGER",
+}
+TRAILING_STATS = ["minutes", "points", "rebounds_total", "assists"]
+TRAILING_WINDOWS = [5, 10, 20]
+# Logged games needed to extend trailing windows without recomputing a season
+TAIL_GAMES = max(TRAILING_WINDOWS) - 1
+
+KEY_COLUMNS = ["season_id", "player_id", "team_id", "game_id", "game_date"]
+
+
+def ensure_table(con):
+    stats = ",\n        ".join(f"{c:<22}{t}" for c, t in GAME_STATS.items())
+    cums = ",\n        ".join(
+        f"{'cum_' + c:<22}{'DOUBLE' if t == 'DOUBLE' else 'BIGINT'}"
+        for c, t in GAME_STATS.items()
+    )
+    avgs = ",\n        ".join(
+        f"{f'avg{w}_{c}':<22}DOUBLE" for w in TRAILING_WINDOWS for c in TRAILING_STATS
+    )
+    con.execute(f"""
+    CREATE TABLE IF NOT EXISTS unified_player_game_log (
+        season_id             INTEGER NOT NULL,
+        player_id             BIGINT NOT NULL,
+        team_id               BIGINT,
+        game_id               VARCHAR NOT NULL,
+        game_date             DATE NOT NULL,
+        game_number           INTEGER NOT NULL,
+        {stats},
+        {cums},
+        {avgs},
+        PRIMARY KEY (player_id, game_id)
+    )
+    """)
+
+
+def stage_source(con):
+    """Box score rows for the seasons in `log_seasons`, shaped like the log."""
+    stats = ", ".join(f"b.{c}" for c in GAME_STATS)
+    con.execute(f"""
+    CREATE OR REPLACE TEMP TABLE log_source AS
+    SELECT g.season_id, b.player_id, b.team_id, b.game_id, g.game_date, {stats}
+    FROM unified_player_boxscores_all b
+    JOIN unified_games_all g ON b.game_key = g.game_key
+    WHERE g.season_id IN (SELECT season_id FROM log_seasons)
+    """)
+
+
+def stage_changes(con):
+    """
+    Splits source changes into player-seasons that can be appended to (only new
+    games after the last logged one) and ones that must be rebuilt (corrected,
+    deleted or out-of-order games).
+    """
+    cols = ", ".join([*KEY_COLUMNS, *GAME_STATS])
+    con.execute(f"""
+    CREATE OR REPLACE TEMP TABLE log_existing AS
+    SELECT {cols} FROM unified_player_game_log
+    WHERE season_id IN (SELECT season_id FROM log_seasons)
+    """)
+    con.execute(f"""
+    CREATE OR REPLACE TEMP TABLE log_added AS
+    SELECT {cols} FROM log_source EXCEPT SELECT {cols} FROM log_existing
+    """)
+    con.execute("""
+    CREATE OR REPLACE TEMP TABLE log_rebuild AS
+    -- Logged rows that changed or disappeared from the source
+    SELECT DISTINCT e.season_id, e.player_id
+    FROM (
+        SELECT * FROM log_existing
+        EXCEPT
+        SELECT * FROM log_source
+    ) e
+    UNION
+    -- New rows that land on or before the last logged game of their season
+    SELECT DISTINCT a.season_id, a.player_id
+    FROM log_added a
+    JOIN (
+        SELECT season_id, player_id, MAX((game_date, game_id)) AS last_game
+        FROM log_existing
+        GROUP BY season_id, player_id
+    ) l USING (season_id, player_id)
+    WHERE (a.game_date, a.game_id) <= l.last_game
+    """)
+
+
+def insert_sql():
+    """
+    Windows over `log_input` (logged tail rows plus new rows, flagged by is_new),
+    offset by the last logged totals in `log_base`; inserts only the new rows.
+    """
+    order = "PARTITION BY i.season_id, i.player_id ORDER BY i.game_date, i.game_id"
+    cums = ",\n        ".join(
+        f"COALESCE(b.cum_{c}, 0) + SUM(CASE WHEN i.is_new THEN COALESCE(i.{c}, 0) END)"
+        f" OVER running AS cum_{c}"
+        for c in GAME_STATS
+    )
+    avgs = ",\n        ".join(
+        f"AVG(i.{c}) OVER (running_window ROWS BETWEEN {w - 1} PRECEDING AND CURRENT"
+        f" ROW) AS avg{w}_{c}"
+        for w in TRAILING_WINDOWS
+        for c in TRAILING_STATS
+    )
+    stats = ", ".join(f"i.{c}" for c in GAME_STATS)
+    keys = ", ".join(f"i.{c}" for c in KEY_COLUMNS)
+    return f"""
+    INSERT INTO unified_player_game_log
+    SELECT * EXCLUDE (is_new) FROM (
+        SELECT
+            {keys},
+            COALESCE(b.game_number, 0)
+                + COUNT(*) FILTER (WHERE i.is_new) OVER running AS game_number,
+            {stats},
+            {cums},
+            {avgs},
+            i.is_new
+        FROM log_input i
+        LEFT JOIN log_base b USING (season_id, player_id)
+        WINDOW
+            running_window AS ({order}),
+            running AS (running_window ROWS UNBOUNDED PRECEDING)
+    )
+    WHERE is_new
+    """
+
+
+def rebuild(con):
+    """Recomputes every player-season listed in `log_rebuild` from the source."""
+    con.execute("""
+    DELETE FROM unified_player_game_log l
+    USING log_rebuild r
+    WHERE l.season_id = r.season_id AND l.player_id = r.player_id
+    """)
+    con.execute("""
+    CREATE OR REPLACE TEMP TABLE log_input AS
+    SELECT s.*, TRUE AS is_new
+    FROM log_source s
+    JOIN log_rebuild USING (season_id, player_id)
+    """)
+    con.execute("""
+    CREATE OR REPLACE TEMP TABLE log_base AS
+    SELECT * FROM unified_player_game_log WHERE FALSE
+    """)
+    con.execute(insert_sql())
+    return con.execute("SELECT COUNT(*) FROM log_input").fetchone()[0]
+
+
+def append(con):
+    """Extends player-seasons whose only change is new games after the last one."""
+    cols = ", ".join([*KEY_COLUMNS, *GAME_STATS])
+    con.execute("""
+    CREATE OR REPLACE TEMP TABLE log_new AS
+    SELECT a.* FROM log_added a
+    ANTI JOIN log_rebuild r USING (season_id, player_id)
+    """)
+    con.execute("""
+    CREATE OR REPLACE TEMP TABLE log_base AS
+    SELECT l.*
+    FROM unified_player_game_log l
+    SEMI JOIN (SELECT DISTINCT season_id, player_id FROM log_new) n
+        USING (season_id, player_id)
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY l.season_id, l.player_id ORDER BY l.game_date DESC, l.game_id DESC
+    ) = 1
+    """)
+    con.execute(f"""
+    CREATE OR REPLACE TEMP TABLE log_input AS
+    SELECT {cols}, FALSE AS is_new
+    FROM unified_player_game_log l
+    SEMI JOIN (SELECT DISTINCT season_id, player_id FROM log_new) n
+        USING (season_id, player_id)
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY l.season_id, l.player_id ORDER BY l.game_date DESC, l.game_id DESC
+    ) <= {TAIL_GAMES}
+    UNION ALL
+    SELECT {cols}, TRUE AS is_new FROM log_new
+    """)
+    con.execute(insert_sql())
+    return con.execute("SELECT COUNT(*) FROM log_new").fetchone()[0]
+
+
+def update_player_game_log(full=False):
+    con = get_db_connection()
+    ensure_table(con)
+
+    fingerprints = boxscore_fingerprints(con)
+    seasons = changed_seasons(
+        con,
+        ENGINE,
+        fingerprints,
+        full=full,
+        present_sql="SELECT DISTINCT season_id FROM unified_player_game_log",
+    )
+    if not seasons:
+        print("Player game log is up to date.")
+        con.close()
+        return
+
+    print(f"Updating player game log for {len(seasons)} seasons...")
+    start = time.perf_counter()
+    con.begin()
+    try:
+        con.execute(
+            "CREATE OR REPLACE TEMP TABLE log_seasons AS "
+            "SELECT UNNEST(?::INTEGER[]) AS season_id",
+            [seasons],
+        )
+        if full:
+            con.execute(
+                "DELETE FROM unified_player_game_log "
+                "WHERE season_id IN (SELECT season_id FROM log_seasons)"
+            )
+        stage_source(con)
+        stage_changes(con)
+        rebuilt = rebuild(con)
+        appended = append(con)
+        mark_refreshed(con, ENGINE, fingerprints, seasons)
+        bump_table_version(con, "unified_player_game_log")
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+
+    player_seasons = con.execute("SELECT COUNT(*) FROM log_rebuild").fetchone()[0]
+    print(
+        f"Appended {appended} game rows and rebuilt {rebuilt} rows "
+        f"({player_seasons} player-seasons) in {time.perf_counter() - start:.2f}s"
+    )
+    con.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build unified_player_game_log with rolling aggregates"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rebuild every season instead of appending new games",
+    )
+    args = parser.parse_args()
+
+    update_player_game_log(full=args.full)
@@ -0,0 +1,82 @@
+from src.core.frozen_seasons import ensure_history_views, frozen_fingerprints
+
+
+def ensure_refresh_state(con):
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS derived_refresh_state (
+        engine        VARCHAR NOT NULL,
+        season_id     INTEGER NOT NULL,
+        fingerprint   VARCHAR NOT NULL,
+        refreshed_at  TIMESTAMP NOT NULL,
+        PRIMARY KEY (engine, season_id)
+    )
+    """)
+
+
+def boxscore_fingerprints(con):
+    """
+    Per-season fingerprint of unified_player_boxscores: row count, last game date
+    and an order-independent checksum of the stat columns, so late box scores and
+    stat corrections both change it. Frozen seasons reuse the fingerprint recorded
+    when they were frozen, so only the live heap rows are scanned.
+    """
+    ensure_history_views(con)
+    rows = con.execute("""
+    SELECT
+        g.season_id,
+        COUNT(*) || ':' || MAX(g.game_date) || ':' || BIT_XOR(HASH(
+            b.game_id, b.player_id, b.team_id, b.minutes, b.points, b.assists,
+            b.rebounds_total, b.steals, b.blocks, b.fgm, b.fga, b.fg3m, b.fg3a,
+            b.ftm, b.fta, b.pf, b.turnovers, b.plus_minus
+        ))
+    FROM unified_player_boxscores b
+    JOIN unified_games_all g ON b.game_key = g.game_key
+    GROUP BY g.season_id
+    """).fetchall()
+    fingerprints = dict(rows)
+    for season_id, frozen in frozen_fingerprints(
+        con, "unified_player_boxscores"
+    ).items():
+        live = fingerprints.get(season_id)
+        fingerprints[season_id] = frozen if live is None else f"{frozen}+{live}"
+    return fingerprints
+
+
+def changed_seasons(con, engine, fingerprints, full=False, present_sql=None):
+    """
+    Returns season_ids whose fingerprint differs from engine's last refresh.
+    `present_sql` lists the season_ids the engine's table has rows for; other
+    seasons count as changed, so a table dropped or rebuilt since (e.g. by the
+    unified migration) is refilled instead of reported up to date.
+    """
+    ensure_refresh_state(con)
+    if full:
+        return sorted(fingerprints)
+    stored = dict(
+        con.execute(
+            "SELECT season_id, fingerprint FROM derived_refresh_state WHERE engine = ?",
+            [engine],
+        ).fetchall()
+    )
+    if present_sql:
+        present = {s for (s,) in con.execute(present_sql).fetchall()}
+        stored = {s: fp for s, fp in stored.items() if s in present}
+    return sorted(s for s, fp in fingerprints.items() if stored.get(s) != fp)
+
+
+def mark_refreshed(con, engine, fingerprints, season_ids):
+    """Records the fingerprints the given seasons were refreshed from."""
+    ensure_refresh_state(con)
+    rows = [(engine, s, fingerprints[s]) for s in season_ids]
+    if not rows:
+        return
+    con.executemany(
+        """
+        INSERT INTO derived_refresh_state (engine, season_id, fingerprint, refreshed_at)
+        VALUES (?, ?, ?, now())
+        ON CONFLICT (engine, season_id) DO UPDATE SET
+            fingerprint = EXCLUDED.fingerprint,
+            refreshed_at = EXCLUDED.refreshed_at
+        """,
+        rows,
+    )
@@ -0,0 +1,316 @@
+import argparse
+import time
+
+import numpy as np
+import pyarrow as pa
+
+from src.core.bulk_writer import BulkWriter
+from src.core.database import get_db_connection
+from src.core.frozen_seasons import ensure_history_views
+
+INITIAL_RATING = 1500.0
+HOME_ADVANTAGE = 100.0
+# Share of last season's rating kept at the first game of a new season;
+# the rest regresses to MEAN_RATING.
+SEASON_CARRYOVER = 0.75
+MEAN_RATING = 1505.0
+
+MODELS = {
+    # Plain Elo: fixed K per game
+    "elo": {"k": 20.0, "margin": False},
+    # Margin-adjusted Elo: K scaled by log margin of victory, damped for
+    # favourites so blowouts by strong teams don't inflate ratings.
+    "elo_mov": {"k": 20.0, "margin": True},
+}
+
+RATING_COLUMNS = [
+    "model",
+    "game_id",
+    "team_id",
+    "season_id",
+    "game_date",
+    "is_home",
+    "rating_pre",
+    "rating_post",
+    "win_prob",
+]
+
+
+def ensure_tables(con):
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS unified_team_ratings (
+        model          VARCHAR NOT NULL,
+        game_id        VARCHAR NOT NULL,
+        team_id        BIGINT NOT NULL,
+        season_id      INTEGER,
+        game_date      DATE NOT NULL,
+        is_home        BOOLEAN,
+        rating_pre     DOUBLE,
+        rating_post    DOUBLE,
+        win_prob       DOUBLE,
+        PRIMARY KEY (model, game_id, team_id)
+    )
+    """)
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS team_rating_state (
+        model           VARCHAR NOT NULL,
+        team_id         BIGINT NOT NULL,
+        rating          DOUBLE NOT NULL,
+        season_id       INTEGER,
+        last_game_date  DATE,
+        last_game_id    VARCHAR,
+        PRIMARY KEY (model, team_id)
+    )
+    """)
+
+
+def win_probability(rating_diff):
+    return 1.0 / (1.0 + 10.0 ** (-rating_diff / 400.0))
+
+
+def load_state(con, model):
+    rows = con.execute(
+        "SELECT team_id, rating, season_id, last_game_date, last_game_id "
+        "FROM team_rating_state WHERE model = ?",
+        [model],
+    ).fetchall()
+    state = {r[0]: (r[1], r[2]) for r in rows}
+    watermark = max(((r[3], r[4]) for r in rows if r[3] is not None), default=None)
+    return state, watermark
+
+
+def needs_rebuild(con, model, watermark):
+    """True when games at or before the watermark are missing from the ratings."""
+    if watermark is None:
+        return False
+    missing = con.execute(
+        """
+        SELECT COUNT(*) FROM unified_games_all g
+        WHERE g.home_points IS NOT NULL AND g.away_points IS NOT NULL
+          AND (g.game_date, g.game_id) <= (?, ?)
+          AND NOT EXISTS (
+              SELECT 1 FROM unified_team_ratings r
+              WHERE r.model = ? AND r.game_id = g.game_id
+          )
+        """,
+        [watermark[0], watermark[1], model],
+    ).fetchone()[0]
+    return missing > 0
+
+
+def load_games(con, watermark):
+    sql = """
+    SELECT game_id, game_date, season_id, home_team_id, away_team_id,
+           home_points, away_points
+    FROM unified_games_all
+    WHERE home_points IS NOT NULL AND away_points IS NOT NULL
+    """
+    params = []
+    if watermark is not None:
+        sql += " AND (game_date, game_id) > (?, ?)"
+        params = list(watermark)
+    sql += " ORDER BY game_date, game_id"
+    return con.execute(sql, params).fetchnumpy()
+
+
+def date_batches(dates, home, away):
+    """
+    Yields index arrays of games that can be rated simultaneously: same date and
+    no team appearing twice (a second game for a team that day goes to the next
+    batch so it sees the first game's result).
+    """
+    _, starts = np.unique(dates, return_index=True)
+    bounds = list(starts) + [len(dates)]
+    for lo, hi in zip(bounds[:-1], bounds[1:], strict=True):
+        idx = np.arange(lo, hi)
+        teams = np.concatenate([home[idx], away[idx]])
+        if len(np.unique(teams)) == len(teams):
+            yield idx
+            continue
+        remaining = list(idx)
+        while remaining:
+            used, batch, rest = set(), [], []
+            for i in remaining:
+                if home[i] in used or away[i] in used:
+                    rest.append(i)
+                else:
+                    used.update((home[i], away[i]))
+                    batch.append(i)
+            yield np.array(batch)
+            remaining = rest
+
+
+def rate_games(games, state, k, margin):
+    """
+    Runs Elo over games (already in date order) and returns per-game arrays plus
+    the final per-team state.
+    """
+    team_ids = np.unique(
+        np.concatenate(
+            [games["home_team_id"], games["away_team_id"], list(state)]
+        ).astype(np.int64)
+    )
+    ratings = np.full(len(team_ids), INITIAL_RATING)
+    seasons = np.full(len(team_ids), -1, dtype=np.int64)
+    for team_id, (rating, season_id) in state.items():
+        i = np.searchsorted(team_ids, team_id)
+        ratings[i] = rating
+        seasons[i] = season_id if season_id is not None else -1
+
+    home = np.searchsorted(team_ids, games["home_team_id"].astype(np.int64))
+    away = np.searchsorted(team_ids, games["away_team_id"].astype(np.int64))
+    season = games["season_id"].astype(np.int64)
+    mov = games["home_points"].astype(np.float64) - games["away_points"].astype(
+        np.float64
+    )
+    n = len(home)
+    home_pre = np.empty(n)
+    away_pre = np.empty(n)
+    home_post = np.empty(n)
+    away_post = np.empty(n)
+    home_prob = np.empty(n)
+
+    for idx in date_batches(games["game_date"], home, away):
+        h, a, s = home[idx], away[idx], season[idx]
+
+        # Regress teams to the mean at their first game of a new season
+        for teams in (h, a):
+            new_season = (seasons[teams] != s) & (seasons[teams] != -1)
+            ratings[teams[new_season]] = (
+                SEASON_CARRYOVER * ratings[teams[new_season]]
+                + (1 - SEASON_CARRYOVER) * MEAN_RATING
+            )
+            seasons[teams] = s
+
+        rh, ra = ratings[h], ratings[a]
+        diff = rh + HOME_ADVANTAGE - ra
+        p_home = win_probability(diff)
+        result = (mov[idx] > 0).astype(np.float64) + 0.5 * (mov[idx] == 0)
+        step = k * (result - p_home)
+        if margin:
+            # Winner's pre-game edge, used to damp the multiplier for favourites
+            winner_diff = np.where(mov[idx] >= 0, diff, -diff)
+            step *= np.log(np.abs(mov[idx]) + 1) * 2.2 / (winner_diff * 0.001 + 2.2)
+
+        home_pre[idx], away_pre[idx], home_prob[idx] = rh, ra, p_home
+        ratings[h] = rh + step
+        ratings[a] = ra - step
+        home_post[idx], away_post[idx] = ratings[h], ratings[a]
+
+    touched = np.unique(np.concatenate([home, away]))
+    last_game = {}
+    for i in range(n):
+        last_game[home[i]] = i
+        last_game[away[i]] = i
+    final_state = {
+        int(team_ids[t]): (
+            float(ratings[t]),
+            int(seasons[t]),
+            games["game_date"][last_game[t]],
+            games["game_id"][last_game[t]],
+        )
+        for t in touched
+    }
+    return (home_pre, away_pre, home_post, away_post, home_prob), final_state
+
+
+def ratings_table(model, games, arrays):
+    home_pre, away_pre, home_post, away_post, home_prob = arrays
+    n = len(home_pre)
+
+    def both(home_values, away_values):
+        return np.concatenate([home_values, away_values])
+
+    return pa.table(
+        {
+            "model": pa.array([model] * (2 * n)),
+            "game_id": both(games["game_id"], games["game_id"]),
+            "team_id": both(games["home_team_id"], games["away_team_id"]).astype(
+                np.int64
+            ),
+            "season_id": both(games["season_id"], games["season_id"]),
+            "game_date": both(games["game_date"], games["game_date"]),
+            "is_home": both(np.ones(n, dtype=bool), np.zeros(n, dtype=bool)),
+            "rating_pre": both(home_pre, away_pre),
+            "rating_post": both(home_post, away_post),
+            "win_prob": both(home_prob, 1 - home_prob),
+        }
+    )
+
+
+def update_model(con, model, full=False):
+    params = MODELS[model]
+    state, watermark = ({}, None) if full else load_state(con, model)
+    if not full and needs_rebuild(con, model, watermark):
+        print(f"  [{model}] Games were added before the watermark; rebuilding.")
+        full = True
+        state, watermark = {}, None
+
+    start = time.perf_counter()
+    games = load_games(con, watermark)
+    if not len(games["game_id"]):
+        print(f"  [{model}] Up to date.")
+        return
+
+    arrays, final_state = rate_games(games, state, params["k"], params["margin"])
+    elapsed = time.perf_counter() - start
+
+    con.begin()
+    try:
+        if full:
+            con.execute("DELETE FROM unified_team_ratings WHERE model = ?", [model])
+            con.execute("DELETE FROM team_rating_state WHERE model = ?", [model])
+        with BulkWriter(
+            con,
+            "unified_team_ratings",
+            RATING_COLUMNS,
+            key_columns=["model", "game_id", "team_id"],
+        ) as writer:
+            writer.write_table(ratings_table(model, games, arrays))
+        with BulkWriter(
+            con,
+            "team_rating_state",
+            [
+                "model",
+                "team_id",
+                "rating",
+                "season_id",
+                "last_game_date",
+                "last_game_id",
+            ],
+            key_columns=["model", "team_id"],
+        ) as writer:
+            writer.extend(
+                (model, team_id, *values) for team_id, values in final_state.items()
+            )
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+
+    print(
+        f"  [{model}] Rated {len(games['game_id'])} games in {elapsed:.2f}s "
+        f"({'full rebuild' if full or watermark is None else 'incremental'})"
+    )
+
+
+def update_team_ratings(full=False):
+    con = get_db_connection()
+    ensure_tables(con)
+    ensure_history_views(con)
+    print("Updating team ratings...")
+    for model in MODELS:
+        update_model(con, model, full=full)
+    con.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Elo team ratings over unified_games")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Recompute from the first game instead of resuming",
+    )
+    args = parser.parse_args()
+
+    update_team_ratings(full=args.full)
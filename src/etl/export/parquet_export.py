@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import shutil
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+from src.core.config import DATA_DIR
+from src.core.database import get_db_connection
+from src.core.frozen_seasons import FROZEN_TABLES, ensure_history_views
+
+EXPORT_DIR = DATA_DIR / "export"
+MANIFEST_NAME = "manifest.json"
+
+# Bigger than DuckDB's default of 122,880 rows: a regular season of box scores
+# is ~26k rows, so most partitions become one row group and a scan of a season
+# reads one column chunk per column.
+ROW_GROUP_SIZE = 250_000
+COPY_OPTIONS = f"FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE {ROW_GROUP_SIZE}"
+
+# Dimensions exported as a single file even though they carry a season column
+UNPARTITIONED = {"unified_seasons"}
+
+
+def unified_tables(con):
+    return [
+        row[0]
+        for row in con.execute(
+            "SELECT table_name FROM duckdb_tables() "
+            "WHERE table_name LIKE 'unified\\_%' ESCAPE '\\' ORDER BY table_name"
+        ).fetchall()
+    ]
+
+
+def season_source(con, table):
+    """
+    SELECT returning the table's rows plus `season_year`, or None when the table
+    has no season. Season comes from the table itself, its season_id, or its
+    game_key (else game_id) via unified_games. Tables with frozen seasons are read
+    through their `_all` view so frozen rows are exported too.
+    """
+    if table in UNPARTITIONED:
+        return None
+    columns = {
+        row[0]
+        for row in con.execute(
+            "SELECT column_name FROM duckdb_columns() WHERE table_name = ?", [table]
+        ).fetchall()
+    }
+    relation = f"{table}_all" if table in FROZEN_TABLES else table
+    if "season_year" in columns:
+        return f"SELECT * FROM {relation}"
+    if "season_id" in columns:
+        return f"""
+        SELECT t.*, s.season_year FROM {relation} t
+        LEFT JOIN unified_seasons s ON t.season_id = s.season_id
+        """
+    if "game_key" in columns or "game_id" in columns:
+        key = "game_key" if "game_key" in columns else "game_id"
+        return f"""
+        SELECT t.*, s.season_year FROM {relation} t
+        LEFT JOIN unified_games_all g ON t.{key} = g.{key}
+        LEFT JOIN unified_seasons s ON g.season_id = s.season_id
+        """
+    return None
+
+
+def partition_key(season_year):
+    # Matches the directory name DuckDB's PARTITION_BY writes for NULLs
+    return "NULL" if season_year is None else str(season_year)
+
+
+def fingerprints(con, source):
+    """{partition key: (rows, fingerprint)}; source=None fingerprints one partition."""
+    if source is None:
+        return None
+    rows = con.execute(f"""
+        SELECT season_year, COUNT(*), BIT_XOR(HASH(r))
+        FROM ({source}) r
+        GROUP BY season_year
+    """).fetchall()
+    return {partition_key(year): (count, str(h)) for year, count, h in rows}
+
+
+def table_fingerprint(con, table):
+    count, h = con.execute(
+        f"SELECT COUNT(*), BIT_XOR(HASH(r)) FROM {table} r"
+    ).fetchone()
+    return count, str(h)
+
+
+def sql_path(path):
+    return str(path).replace("'", "''")
+
+
+def replace_dir(tmp, dest):
+    if dest.exists():
+        shutil.rmtree(dest)
+    tmp.rename(dest)
+
+
+def write_table(con, table, source, dest):
+    """Writes the whole table (every partition) in one pass, then swaps it in."""
+    tmp = dest.with_name(dest.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    if source is None:
+        tmp.mkdir(parents=True)
+        con.execute(
+            f"COPY {table} TO '{sql_path(tmp / 'data_0.parquet')}' ({COPY_OPTIONS})"
+        )
+    else:
+        con.execute(f"""
+            COPY ({source}) TO '{sql_path(tmp)}'
+            ({COPY_OPTIONS}, PARTITION_BY (season_year), FILENAME_PATTERN 'data_{{i}}')
+        """)
+    replace_dir(tmp, dest)
+
+
+def write_partition(con, source, dest, key):
+    """Rewrites one season_year=<key> directory."""
+    part_dir = dest / f"season_year={key}"
+    tmp = dest / f".season_year={key}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    where = "season_year IS NULL" if key == "NULL" else f"season_year = {int(key)}"
+    con.execute(f"""
+        COPY (SELECT * EXCLUDE (season_year) FROM ({source}) WHERE {where})
+        TO '{sql_path(tmp / "data_0.parquet")}' ({COPY_OPTIONS})
+    """)
+    replace_dir(tmp, part_dir)
+
+
+def files_entry(path, out_dir):
+    files = sorted(path.glob("*.parquet"))
+    return {
+        "files": [str(f.relative_to(out_dir)) for f in files],
+        "bytes": sum(f.stat().st_size for f in files),
+    }
+
+
+def load_manifest(out_dir):
+    path = out_dir / MANIFEST_NAME
+    return json.loads(path.read_text()) if path.exists() else {"tables": {}}
+
+
+def export_table(con, table, out_dir, previous, incremental):
+    dest = out_dir / table
+    source = season_source(con, table)
+    parts = fingerprints(con, source)
+    if parts is None:
+        parts = {"all": table_fingerprint(con, table)}
+
+    old = previous.get("partitions", {}) if incremental and dest.exists() else {}
+    changed = [
+        k for k, (rows, fp) in parts.items() if old.get(k, {}).get("fingerprint") != fp
+    ]
+    removed = [k for k in old if k not in parts]
+
+    if not changed and not removed:
+        return previous, 0
+    if source is None or not old or len(changed) > len(parts) // 2:
+        # Rewriting most of a table is cheaper as one partitioned COPY
+        write_table(con, table, source, dest)
+        changed = list(parts)
+    else:
+        for key in changed:
+            write_partition(con, source, dest, key)
+        for key in removed:
+            shutil.rmtree(dest / f"season_year={key}", ignore_errors=True)
+
+    partitions = {}
+    for key, (rows, fp) in parts.items():
+        path = dest if source is None else dest / f"season_year={key}"
+        partitions[key] = {
+            "rows": rows,
+            "fingerprint": fp,
+            **files_entry(path, out_dir),
+        }
+    entry = {
+        "partitioned_by": None if source is None else "season_year",
+        "rows": sum(p["rows"] for p in partitions.values()),
+        "bytes": sum(p["bytes"] for p in partitions.values()),
+        "partitions": partitions,
+    }
+    return entry, len(changed)
+
+
+def export(out_dir=EXPORT_DIR, tables=None, incremental=False):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    con = get_db_connection()
+    ensure_history_views(con)
+    manifest = load_manifest(out_dir)
+    all_tables = unified_tables(con)
+    tables = tables or all_tables
+
+    print(f"Exporting {len(tables)} tables to {out_dir}...")
+    start = time.perf_counter()
+    for table in tables:
+        if table not in all_tables:
+            print(f"  [{table}] Not found, skipping.")
+            continue
+        table_start = time.perf_counter()
+        previous = manifest["tables"].get(table, {})
+        entry, written = export_table(con, table, out_dir, previous, incremental)
+        manifest["tables"][table] = entry
+        print(
+            f"  [{table}] {entry['rows']} rows, {len(entry['partitions'])} partitions "
+            f"({written} written), {entry['bytes'] / 1e6:.1f} MB "
+            f"in {time.perf_counter() - table_start:.2f}s"
+        )
+    con.close()
+
+    # Tables dropped from the database since the last export
+    for table in list(manifest["tables"]):
+        if table not in all_tables:
+            shutil.rmtree(out_dir / table, ignore_errors=True)
+            del manifest["tables"][table]
+
+    manifest.update(
+        exported_at=datetime.now(UTC).isoformat(timespec="seconds"),
+        format={"compression": "zstd", "row_group_size": ROW_GROUP_SIZE},
+    )
+    tmp = out_dir / (MANIFEST_NAME + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, out_dir / MANIFEST_NAME)
+    print(f"Export complete in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export unified_* tables to season-partitioned Parquet"
+    )
+    parser.add_argument("--out", default=str(EXPORT_DIR), help="Output directory")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rewrite partitions whose rows changed since the last export",
+    )
+    parser.add_argument("--tables", nargs="+", help="Tables to export (default: all)")
+    args = parser.parse_args()
+
+    export(out_dir=args.out, tables=args.tables, incremental=args.incremental)
@@ -1,94 +1,41 @@
 import argparse
 import csv
 import os
-import random
-import time
 from datetime import datetime
 
 import requests
 from bs4 import BeautifulSoup
 
+from src.core.config import (
+    BBREF_BASE_URL,
+    GAMES_CSV,
+    SCRAPER_DATA_DIR,
+    settings,
+)
 from src.core.database import get_db_connection
+from src.core.team_registry import load_team_registry
+from src.core.utils import (
+    get_request_headers,
+    polite_sleep,
+    read_cached_page,
+    write_cached_page,
+)
 
 # Configuration
-DATA_DIR = "data/raw"
-GAMES_FILE = os.path.join(DATA_DIR, "Games.csv")
-TEAM_HISTORIES_FILE = os.path.join(DATA_DIR, "TeamHistories.csv")
-
-
-# Manual overrides for team mapping if simple string matching fails
-TEAM_OVERRIDES = {
-    "Fort Wayne Pistons": 1610612765,  # Ft. Wayne Zollner Pistons
-    "Tri-Cities Blackhawks": 1610612737,
-    "Minneapolis Lakers": 1610612747,
-    "Rochester Royals": 1610612758,
-    "Syracuse Nationals": 1610612755,
-    "Indianapolis Olympians": 9058,
-    "Washington Capitols": 9015,  # Or 1610612764? TeamHistories has multiple entries. 9015 is BAA/NBA 1946-1949.
-    "Anderson Packers": 9028,
-    "Sheboygan Red Skins": 9063,  # Check spelling "Redskins" vs "Red Skins"
-    "Waterloo Hawks": 9002,
-    "Denver Nuggets": 9070,  # Old Denver Nuggets (1949-50)
-    "Baltimore Bullets": 9071,  # Old Baltimore Bullets (1944-1954)
-}
-
-
-def load_team_map():
-    team_map = {}
-    with open(TEAM_HISTORIES_FILE, encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            full_name = f"{row['teamCity']} {row['teamName']}"
-            team_id = row["teamId"]
-            team_map[full_name] = team_id
-
-            # Also map just the city if unique? No, dangerous.
-            # Map "City Name" -> ID
-
-    # Add overrides
-    team_map.update(TEAM_OVERRIDES)
-
-    # Add specific fixes based on known BAA/early NBA teams
-    team_map["St. Louis Bombers"] = "9012"
-    team_map["Chicago Stags"] = "9059"
-    team_map["Detroit Falcons"] = "9020"
-    team_map["Toronto Huskies"] = "9042"
-    team_map["Washington Capitols"] = "9015"
-    team_map["Cleveland Rebels"] = "9017"
-    team_map["Pittsburgh Ironmen"] = "9001"
-    team_map["Providence Steamrollers"] = "9056"
-    team_map["Indianapolis Jets"] = "9008"
-    team_map["Sheboygan Red Skins"] = "9063"  # Website might use space
-    team_map["Sheboygan Redskins"] = "9063"
-    team_map["Waterloo Hawks"] = "9002"
-    team_map["Denver Nuggets"] = "9070"
-    team_map["Baltimore Bullets"] = "9071"
-
-    return team_map
-
-
-def get_team_id(team_name, team_map):
-    if team_name in team_map:
-        return team_map[team_name]
-    # Try fuzzy match or partials?
-    # For now, return None and log warning
-    print(f"Warning: Could not find ID for team '{team_name}'")
-    return None
-
-
-def scrape_season(year, team_map, dry_run=False):
+GAMES_FILE = str(GAMES_CSV)
+
+
+def scrape_season(year, teams, dry_run=False):
     league = "BAA" if year < 1950 else "NBA"
-    base_url = "https://www.basketball-reference.com"
+    base_url = BBREF_BASE_URL
     main_url = f"{base_url}/leagues/{league}_{year}_games.html"
     print(f"Scraping {main_url}...")
 
     # Try to read from local file first
-    local_main_file = os.path.join("data/raw/html", f"{league}_{year}_games.html")
-    content = None
-    if os.path.exists(local_main_file):
+    local_main_file = os.path.join(SCRAPER_DATA_DIR, f"{league}_{year}_games.html")
+    content = read_cached_page(local_main_file)
+    if content is not None:
         print(f"Reading from local file: {local_main_file}")
-        with open(local_main_file, encoding="utf-8") as f:
-            content = f.read()
     else:
         content = fetch_url(main_url, local_main_file)
 
@@ -113,44 +60,41 @@ def scrape_season(year, team_map, dry_run=False):
     for url in month_links:
         # Generate local filename for month
         month_filename = url.split("/")[-1]
-        local_month_file = os.path.join("data/raw/html", month_filename)
+        local_month_file = os.path.join(SCRAPER_DATA_DIR, month_filename)
 
-        month_content = None
-        if os.path.exists(local_month_file):
+        month_content = read_cached_page(local_month_file)
+        if month_content is not None:
             print(f"Reading from local file: {local_month_file}")
-            with open(local_month_file, encoding="utf-8") as f:
-                month_content = f.read()
         else:
             print(f"Fetching {url}...")
             month_content = fetch_url(url, local_month_file)
             if month_content:
-                time.sleep(random.uniform(3, 5))  # Be nice
+                polite_sleep()  # Be nice
 
         if month_content:
-            all_games.extend(parse_games_table(month_content, team_map))
+            all_games.extend(parse_games_table(month_content, teams))
 
     return all_games
 
 
 def fetch_url(url, local_path):
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers)
+        response = requests.get(
+            url,
+            headers=get_request_headers(),
+            timeout=settings.scraper.request_timeout,
+        )
         response.raise_for_status()
         content = response.content
         # Save to local file for future use
-        os.makedirs(os.path.dirname(local_path), exist_ok=True)
-        with open(local_path, "wb") as f:
-            f.write(content)
+        write_cached_page(local_path, content)
         return content
     except Exception as e:
         print(f"Error fetching {url}: {e}")
         return None
 
 
-def parse_games_table(content, team_map):
+def parse_games_table(content, teams):
     soup = BeautifulSoup(content, "html.parser")
     table = soup.find("table", {"id": "schedule"})
 
@@ -198,8 +142,8 @@ def parse_games_table(content, team_map):
         except ValueError:
             game_datetime = date_str
 
-        home_id = get_team_id(home_name, team_map)
-        away_id = get_team_id(visitor_name, team_map)
+        home_id = teams.team_id(home_name, dt)
+        away_id = teams.team_id(visitor_name, dt)
 
         def split_team_name(full_name):
             parts = full_name.split()
@@ -274,7 +218,7 @@ def main():
     )
     args = parser.parse_args()
 
-    team_map = load_team_map()
+    teams = load_team_registry()
 
     years_to_process = [1947] if args.dry_run else range(1947, 1956)
 
@@ -282,10 +226,11 @@ def main():
 
     for year in years_to_process:
         print(f"Processing {year}...")
-        games = scrape_season(year, team_map, args.dry_run)
+        games = scrape_season(year, teams, args.dry_run)
         print(f"Found {len(games)} games for {year}.")
         all_new_games.extend(games)
-        time.sleep(1)  # Be nice to the server
+        polite_sleep()  # Be nice to the server
+    teams.print_miss_report()
 
     if args.dry_run:
         print("Dry run complete. No data saved.")
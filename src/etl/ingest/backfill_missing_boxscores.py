@@ -1,11 +1,17 @@
-import random
 import re
 import time
 
 import requests
 from bs4 import BeautifulSoup
 
+from src.core.bulk_writer import BulkWriter
+from src.core.cdc import Changelog
+from src.core.config import BBREF_BASE_URL, settings
 from src.core.database import get_db_connection
+from src.core.frozen_seasons import ensure_history_views
+from src.core.game_xref import resolve_game
+from src.core.team_registry import load_team_registry
+from src.core.utils import get_request_headers, polite_sleep
 
 
 def get_missing_games():
@@ -21,18 +27,19 @@ def get_missing_games():
 
 
 def scrape_box_score(game_id):
-    url = f"https://www.basketball-reference.com/boxscores/{game_id}.html"
+    url = f"{BBREF_BASE_URL}/boxscores/{game_id}.html"
     print(f"Scraping {url}...")
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    }
-
     try:
-        response = requests.get(url, headers=headers)
+        response = requests.get(
+            url,
+            headers=get_request_headers(),
+            timeout=settings.scraper.request_timeout,
+        )
         if response.status_code == 429:
-            print("Rate limited. Sleeping for 60s...")
-            time.sleep(60)
+            backoff = settings.scraper.rate_limit_backoff
+            print(f"Rate limited. Sleeping for {backoff:.0f}s...")
+            time.sleep(backoff)
             return None
         response.raise_for_status()
     except Exception as e:
@@ -75,6 +82,7 @@ def scrape_box_score(game_id):
 
             player_id = player_td["data-append-csv"]
             name = player_td.text.strip()
+            mp_td = tr.find("td", {"data-stat": "mp"})
 
             # Helper to get stat
             def get_stat(tr_element, stat_name, default=0):
@@ -91,7 +99,8 @@ def scrape_box_score(game_id):
                 "player_id": player_id,
                 "team_abbr": team_abbr,
                 "name": name,
-                "mp": get_stat(tr, "mp", 0),  # Changed default to 0 to match type hint
+                # "MM:SS"; float() would turn every played minute into 0
+                "mp": mp_td.text.strip() if mp_td and mp_td.text.strip() else 0,
                 "fg": get_stat(tr, "fg"),
                 "fga": get_stat(tr, "fga"),
                 "fg3": get_stat(tr, "fg3"),
@@ -107,55 +116,103 @@ def scrape_box_score(game_id):
                 "tov": get_stat(tr, "tov"),
                 "pf": get_stat(tr, "pf"),
                 "pts": get_stat(tr, "pts"),
+                "plus_minus": get_stat(tr, "plus_minus"),
             }
             stats.append(row)
 
     return {"stats": stats, "referees": referees}
 
 
+def parse_minutes(mp):
+    """Minutes played as a number, from "MM:SS" or a plain number."""
+    mp_str = str(mp)
+    if ":" in mp_str:
+        parts = mp_str.split(":")
+        return float(parts[0]) + float(parts[1]) / 60.0
+    return float(mp_str)
+
+
 def save_to_db(data):
     if not data:
         return
     con = get_db_connection()
+    changelog = Changelog(con, "backfill_missing_boxscores")
 
     # 1. Players
-    players = []
-    for s in data["stats"]:
-        players.append((s["player_id"], s["name"]))
-    con.executemany(
-        "INSERT OR IGNORE INTO unified_players (player_id, display_name) VALUES (?, ?)",
-        players,
-    )
+    with BulkWriter(
+        con,
+        "unified_players",
+        ["player_id", "display_name"],
+        ["player_id"],
+        mode="ignore",
+        changelog=changelog,
+    ) as players:
+        for s in data["stats"]:
+            players.add((s["player_id"], s["name"]))
 
     # 2. Boxscores
-    boxscores = []
+    # Scraped IDs (Basketball-Reference style) map to the game's key and
+    # canonical game_id through the crosswalk
+    games = {
+        game_id: resolve_game(con, game_id)
+        for game_id in {s["game_id"] for s in data["stats"]}
+    }
+    # Abbreviations resolve to the team that used them on the game's date
+    ensure_history_views(con)
+    game_dates = dict(
+        con.execute(
+            "SELECT game_key, game_date FROM unified_games_all "
+            "WHERE game_key IN (SELECT UNNEST(?))",
+            [[game[0] for game in games.values() if game]],
+        ).fetchall()
+    )
+    teams = load_team_registry()
+
+    boxscores = BulkWriter(
+        con,
+        "unified_player_boxscores",
+        [
+            "game_id",
+            "game_key",
+            "player_id",
+            "team_id",
+            "minutes",
+            "points",
+            "assists",
+            "rebounds_total",
+            "steals",
+            "blocks",
+            "fgm",
+            "fga",
+            "fg3m",
+            "fg3a",
+            "ftm",
+            "fta",
+            "pf",
+            "turnovers",
+            "plus_minus",
+        ],
+        ["game_id", "player_id"],
+        mode="ignore",
+        changelog=changelog,
+    )
     for s in data["stats"]:
-        # We need to map team_abbr to team_id
-        # For simplicity in this backfill, we'll try to find it in team_history
-        team_id_res = con.execute(
-            "SELECT team_id FROM unified_team_history WHERE abbreviation = ? LIMIT 1",
-            (s["team_abbr"],),
-        ).fetchone()
-        team_id = team_id_res[0] if team_id_res else None
+        game = games[s["game_id"]]
+        if not game:
+            print(f"Warning: {s['game_id']} is not in unified_game_xref")
+            continue
+        team_id = teams.team_id(s["team_abbr"], game_dates.get(game[0]))
 
         if not team_id:
-            # Fallback for old abbreviations
-            # Huskies = TRH, Stags = CHS, etc.
-            # They should be in our updated TeamHistories.csv
             print(f"Warning: Could not find team_id for {s['team_abbr']}")
             continue
 
-        # Convert MP to double
-        mp_str = str(s["mp"])
-        if ":" in mp_str:
-            parts = mp_str.split(":")
-            mp = float(parts[0]) + float(parts[1]) / 60.0
-        else:
-            mp = float(mp_str)
+        mp = parse_minutes(s["mp"])
 
-        boxscores.append(
+        boxscores.add(
             (
-                s["game_id"],
+                game[1],
+                game[0],
                 s["player_id"],
                 team_id,
                 mp,
@@ -176,14 +233,9 @@ def save_to_db(data):
             )
         )
 
-    con.executemany(
-        """
-        INSERT OR IGNORE INTO unified_player_boxscores
-        (game_id, player_id, team_id, minutes, points, assists, rebounds_total, steals, blocks, fgm, fga, fg3m, fg3a, ftm, fta, pf, turnovers, plus_minus)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """,
-        boxscores,
-    )
+    boxscores.close()
+    changelog.print_summary()
+    teams.print_miss_report()
 
     con.close()
 
@@ -199,4 +251,4 @@ if __name__ == "__main__":
         if data:
             save_to_db(data)
             print(f"Saved {len(data['stats'])} player stats for {game_id}")
-        time.sleep(random.uniform(5, 8))  # Very slow to avoid block
+        polite_sleep(5, 8)  # Very slow to avoid block
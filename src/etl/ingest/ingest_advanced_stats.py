@@ -3,17 +3,18 @@ import io
 import pandas as pd
 import requests
 
+from src.core.cdc import Changelog
+from src.core.config import settings
 from src.core.database import get_db_connection
 
 
 def ingest_advanced_stats():
-    # The librarian provided a blob link, converting to raw
-    url = "https://raw.githubusercontent.com/peasant98/TheNBACSV/master/nbaNew.csv"
+    url = settings.urls.advanced_stats_csv_url
     print(f"Fetching advanced stats from {url}...")
 
     try:
         # This is a large file (~24K rows, but 5MB+)
-        response = requests.get(url)
+        response = requests.get(url, timeout=settings.scraper.request_timeout)
         response.raise_for_status()
         df = pd.read_csv(io.StringIO(response.text))
         print(f"Loaded {len(df)} player-season records.")
@@ -48,6 +49,8 @@ def ingest_advanced_stats():
     con.register("raw_adv", df)
 
     print("Mapping and ingesting advanced stats...")
+    changelog = Changelog(con, "ingest_advanced_stats")
+    changelog.begin(["unified_player_season_advanced"])
     # Map SeasonStart to Season, PlayerName to ID, Tm to ID
     # Fix: TS% and USG% contain '%' signs, strip them
     con.execute("""
@@ -71,8 +74,9 @@ def ingest_advanced_stats():
     FROM raw_adv ra
     JOIN unified_seasons s ON CAST(ra.SeasonStart AS INTEGER) = s.season_year
     JOIN unified_players p ON LOWER(p.display_name) = LOWER(ra.PlayerName)
-    JOIN unified_team_history t ON ra.Tm = t.abbreviation
+    JOIN unified_team_seasons t ON ra.Tm = t.abbreviation AND t.season_id = s.season_id
     """)
+    changelog.commit()
 
     res = con.execute("SELECT count(*) FROM unified_player_season_advanced")
     row = res.fetchone()
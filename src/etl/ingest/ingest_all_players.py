@@ -1,11 +1,14 @@
 import pandas as pd
 
+from src.core.cdc import Changelog
 from src.core.database import get_db_connection
 
 
 def ingest_players():
     print("Ingesting players from common_player_info table...")
     con = get_db_connection()
+    changelog = Changelog(con, "ingest_all_players")
+    changelog.begin(["unified_players"])
 
     con.execute("""
         INSERT INTO unified_players (player_id, nba_api_person_id, display_name, from_year, to_year)
@@ -27,6 +30,7 @@ def ingest_players():
         WHERE unified_players.player_id = CAST(cpi.person_id AS BIGINT)
         AND unified_players.from_year IS NULL
     """)
+    changelog.commit()
 
     res = con.execute("SELECT count(*) FROM unified_players")
     row = res.fetchone()
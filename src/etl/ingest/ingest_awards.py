@@ -3,15 +3,18 @@ import io
 import pandas as pd
 import requests
 
+from src.core.cdc import Changelog
+from src.core.config import settings
 from src.core.database import get_db_connection
+from src.core.schema_types import ensure_enum_types
 
 
 def ingest_awards():
-    url = "https://raw.githubusercontent.com/sumitrodatta/bball-reference-datasets/master/Data/End%20of%20Season%20Teams.csv"
+    url = settings.urls.end_of_season_teams_csv_url
     print(f"Fetching awards from {url}...")
 
     try:
-        response = requests.get(url)
+        response = requests.get(url, timeout=settings.scraper.request_timeout)
         response.raise_for_status()
         df = pd.read_csv(io.StringIO(response.text))
         print(f"Loaded {len(df)} team records.")
@@ -20,9 +23,16 @@ def ingest_awards():
         return
 
     con = get_db_connection()
+    ensure_enum_types(con)
+
+    changelog = Changelog(con, "ingest_awards")
+    changelog.begin(
+        ["unified_awards", "unified_season_awards", "unified_award_results"]
+    )
 
     con.execute(
-        "CREATE TABLE IF NOT EXISTS unified_awards (award_id INTEGER PRIMARY KEY, award_code VARCHAR NOT NULL UNIQUE, award_name VARCHAR NOT NULL)"
+        "CREATE TABLE IF NOT EXISTS unified_awards (award_id INTEGER PRIMARY KEY, "
+        "award_code award_code NOT NULL UNIQUE, award_name VARCHAR NOT NULL)"
     )
     awards_data = [
         (1, "MVP", "Most Valuable Player"),
@@ -45,7 +55,7 @@ def ingest_awards():
       season_award_id    INTEGER PRIMARY KEY,
       season_id          INTEGER NOT NULL REFERENCES unified_seasons(season_id),
       award_id           INTEGER NOT NULL REFERENCES unified_awards(award_id),
-      season_type        VARCHAR NOT NULL,
+      season_type        season_type NOT NULL,
       UNIQUE (season_id, award_id, season_type)
     );
     """)
@@ -109,6 +119,8 @@ def ingest_awards():
     JOIN unified_players p ON LOWER(p.display_name) = LOWER(ra.player)
     """)
 
+    changelog.commit()
+
     res = con.execute("SELECT count(*) FROM unified_award_results")
     row = res.fetchone()
     count = row[0] if row else 0
@@ -1,10 +1,12 @@
 import pandas as pd
 
+from src.core.cdc import Changelog
+from src.core.config import settings
 from src.core.database import get_db_connection
 
 
 def ingest_transactions():
-    url = "https://raw.githubusercontent.com/rossgraham/NBA-Transaction-History/main/DB/Player_Trans.csv"
+    url = settings.urls.transactions_csv_url
     print(f"Fetching transactions from {url}...")
 
     try:
@@ -16,6 +18,9 @@ def ingest_transactions():
 
     con = get_db_connection()
 
+    changelog = Changelog(con, "ingest_transactions")
+    changelog.begin(["unified_transactions"])
+
     con.execute("DROP TABLE IF EXISTS unified_transactions")
 
     con.execute("""
@@ -50,6 +55,8 @@ def ingest_transactions():
     FROM raw_trans rt
     """)
 
+    changelog.commit()
+
     res = con.execute("SELECT count(*) FROM unified_transactions")
     row = res.fetchone()
     count = row[0] if row else 0
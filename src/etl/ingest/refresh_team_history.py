@@ -3,8 +3,9 @@ import os
 import pandas as pd
 from nba_api.stats.static import teams  # type: ignore
 
-TEAM_HISTORIES_CSV = "data/raw/TeamHistories.csv"
-OUTPUT_CSV = "data/raw/TeamHistories_Updated.csv"
+from src.core.config import RAW_DATA_DIR, TEAM_HISTORIES_CSV
+
+OUTPUT_CSV = RAW_DATA_DIR / "TeamHistories_Updated.csv"
 
 
 def refresh_teams():
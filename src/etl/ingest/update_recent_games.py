@@ -0,0 +1,433 @@
+import argparse
+import hashlib
+import time
+from datetime import date, datetime, timedelta
+
+from src.core.bulk_writer import BulkWriter
+from src.core.cdc import Changelog
+from src.core.database import get_db_connection
+from src.core.frozen_seasons import ensure_history_views, frozen_parts
+from src.core.game_xref import register_game_id, resolve_game, sync_game_xref
+from src.core.table_versions import bump_table_version
+from src.core.team_registry import load_team_registry
+from src.core.team_resolver import season_of
+from src.core.utils import polite_sleep
+from src.etl.ingest.backfill_missing_boxscores import parse_minutes, scrape_box_score
+from src.scraping.fetch_planner import (
+    load_schedule,
+    schedule_coverage,
+    scheduled_games,
+)
+from src.scraping.sites.basketball_reference_games import (
+    final_game_ids,
+    get_nba_game_id,
+    open_sinks,
+    save_to_db,
+)
+
+STEP = "update_recent_games"
+
+# Players Basketball-Reference lists that unified_players has no name for get a
+# stable ID derived from their Basketball-Reference ID, above every NBA ID.
+SYNTHETIC_PLAYER_ID_BASE = 9_000_000_000_000
+
+GAME_COLUMNS = [
+    "game_id",
+    "league_id",
+    "season_id",
+    "season_type",
+    "game_date",
+    "home_team_id",
+    "away_team_id",
+    "home_points",
+    "away_points",
+]
+BOXSCORE_COLUMNS = [
+    "game_id",
+    "game_key",
+    "player_id",
+    "team_id",
+    "minutes",
+    "points",
+    "assists",
+    "rebounds_total",
+    "steals",
+    "blocks",
+    "fgm",
+    "fga",
+    "fg3m",
+    "fg3a",
+    "ftm",
+    "fta",
+    "pf",
+    "turnovers",
+    "plus_minus",
+]
+
+
+def ensure_update_runs(con):
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS update_runs (
+        run_id         INTEGER PRIMARY KEY,
+        started_at     TIMESTAMP NOT NULL,
+        finished_at    TIMESTAMP NOT NULL,
+        first_date     DATE NOT NULL,
+        last_date      DATE NOT NULL,
+        games          INTEGER NOT NULL,
+        boxscore_rows  INTEGER NOT NULL,
+        changelog_version BIGINT NOT NULL
+    )
+    """)
+
+
+def update_window(con, since=None, until=None):
+    """
+    (first, last) dates to fetch: from `since`, else the day after the last
+    successful update, else the day after the last game with box scores, up to
+    `until` (yesterday: today's games aren't final).
+    """
+    until = until or date.today() - timedelta(days=1)
+    if since is None:
+        ensure_update_runs(con)
+        ensure_history_views(con)
+        last = con.execute("SELECT MAX(last_date) FROM update_runs").fetchone()[0]
+        if last is None:
+            last = con.execute("""
+            SELECT MAX(g.game_date) FROM unified_games_all g
+            WHERE g.game_key IN (SELECT game_key FROM unified_player_boxscores_all)
+            """).fetchone()[0]
+        since = last + timedelta(days=1) if last else until
+    return since, until
+
+
+def synthetic_player_id(bbref_id):
+    digest = hashlib.sha1(bbref_id.encode()).hexdigest()
+    return SYNTHETIC_PLAYER_ID_BASE + int(digest[:10], 16)
+
+
+def match_players(con, stats):
+    """
+    {Basketball-Reference player ID: player_id}, matched on display name (the
+    most recently active player of that name); unknown names get a synthetic ID.
+    """
+    names = {s["player_id"]: s["name"] for s in stats}
+    matched = dict(
+        con.execute(
+            """
+            SELECT n.bbref_id, arg_max(p.player_id, COALESCE(p.to_year, 0))
+            FROM (SELECT UNNEST(?::VARCHAR[]) AS bbref_id,
+                         UNNEST(?::VARCHAR[]) AS name) n
+            JOIN unified_players p ON LOWER(p.display_name) = LOWER(n.name)
+            GROUP BY n.bbref_id
+            """,
+            [list(names), list(names.values())],
+        ).fetchall()
+    )
+    return {
+        bbref_id: matched.get(bbref_id) or synthetic_player_id(bbref_id)
+        for bbref_id in names
+    }
+
+
+def season_row(con, day):
+    """(season_id, league_id, season_type) for a game day, adding the season if new."""
+    year = season_of(day)
+    row = con.execute(
+        "SELECT season_id, league_id FROM unified_seasons WHERE season_year = ?",
+        [year],
+    ).fetchone()
+    if row is None:
+        con.execute(
+            """
+            INSERT INTO unified_seasons (season_id, league_id, season_year)
+            SELECT COALESCE(MAX(season_id), 0) + 1, 1, ? FROM unified_seasons
+            """,
+            [year],
+        )
+        return season_row(con, day)
+    phase = con.execute(
+        "SELECT phase FROM unified_calendar WHERE calendar_date = ?", [day]
+    ).fetchone()
+    return row[0], row[1], (phase and phase[0]) or "REG"
+
+
+def fetch_day(day, planned=None, dry_run=False):
+    """
+    [(Basketball-Reference game ID, NBA game ID or None, scraped box score)] for
+    a day's final games: the `planned` (NBA game ID, Basketball-Reference ID)
+    pairs from the schedule if given, else the games on the day's scoreboard.
+    """
+    if planned and all(br_game_id for _, br_game_id in planned):
+        game_ids = [(br_game_id, game_id) for game_id, br_game_id in planned]
+    else:
+        try:
+            game_ids = [(br, None) for br in final_game_ids(day.strftime("%Y%m%d"))]
+        except Exception as e:
+            print(f"  Error fetching scoreboard for {day}: {e}")
+            return None
+        polite_sleep()
+    games = []
+    for br_game_id, game_id in game_ids:
+        if dry_run:
+            print(f"  {br_game_id}")
+            continue
+        data = scrape_box_score(br_game_id)
+        polite_sleep()
+        if not data or not data["stats"]:
+            print(f"  Warning: no box score for {br_game_id}")
+            return None
+        games.append((br_game_id, game_id, data))
+    return games
+
+
+def upsert_games(con, changelog, rows):
+    """
+    Inserts new games and updates the scores of known ones. Box scores reference
+    unified_games, which DuckDB's ON CONFLICT DO UPDATE can't rewrite, so
+    existing games are updated in place instead.
+    """
+    ensure_history_views(con)
+    columns = ", ".join(GAME_COLUMNS)
+    con.execute(
+        f"CREATE OR REPLACE TEMP TABLE update_games AS "
+        f"SELECT {columns} FROM unified_games LIMIT 0"
+    )
+    con.executemany(
+        f"INSERT INTO update_games VALUES ({', '.join('?' * len(GAME_COLUMNS))})",
+        rows,
+    )
+    changelog.record_batch(
+        "unified_games",
+        "update_games",
+        GAME_COLUMNS,
+        ["game_id"],
+        updates=["home_points", "away_points"],
+    )
+    # Only IDs not stored yet, with a plain INSERT so a game_key conflict fails
+    con.execute(f"""
+    INSERT INTO unified_games ({columns})
+    SELECT {columns} FROM update_games u
+    WHERE u.game_id NOT IN (SELECT game_id FROM unified_games_all)
+    """)
+    con.execute("""
+    UPDATE unified_games g
+    SET home_points = u.home_points, away_points = u.away_points
+    FROM update_games u
+    WHERE g.game_id = u.game_id
+      AND (g.home_points IS DISTINCT FROM u.home_points
+           OR g.away_points IS DISTINCT FROM u.away_points)
+    """)
+    con.execute("DROP TABLE update_games")
+    bump_table_version(con, "unified_games")
+
+
+def save_games(con, changelog, scraped):
+    """
+    Upserts the scraped games, their box scores, new players and officials.
+    Games of frozen seasons are skipped: their rows live in read-only Parquet.
+    """
+    teams = load_team_registry()
+    frozen = {year for _, year, _ in frozen_parts(con, "unified_games")}
+    games, game_ids = [], {}
+    with BulkWriter(
+        con,
+        "unified_players",
+        ["player_id", "display_name"],
+        ["player_id"],
+        mode="ignore",
+        changelog=changelog,
+    ) as players:
+        for day, br_game_id, known_id, data in scraped:
+            if season_of(day) in frozen:
+                print(
+                    f"  Warning: season {season_of(day)} is frozen, {br_game_id} "
+                    f"skipped; thaw it with `freeze --thaw {season_of(day)}` first"
+                )
+                continue
+            points = {}
+            for s in data["stats"]:
+                points[s["team_abbr"]] = points.get(s["team_abbr"], 0) + int(s["pts"])
+            home = br_game_id[9:]
+            away = next((abbr for abbr in points if abbr != home), None)
+            home_id = teams.team_id(home, day)
+            away_id = teams.team_id(away, day)
+            if not home_id or not away_id:
+                print(f"  Warning: unknown teams {home}/{away} in {br_game_id}")
+                continue
+            # A game already stored keeps its ID; a new one takes the schedule's
+            game_id = get_nba_game_id(con, br_game_id, teams) or known_id or br_game_id
+            game_ids[br_game_id] = game_id
+            season_id, league_id, season_type = season_row(con, day)
+            games.append(
+                (
+                    game_id,
+                    league_id,
+                    season_id,
+                    season_type,
+                    day,
+                    home_id,
+                    away_id,
+                    points.get(home, 0),
+                    points[away],
+                )
+            )
+            player_ids = match_players(con, data["stats"])
+            for s in data["stats"]:
+                players.add((player_ids[s["player_id"]], s["name"]))
+    if games:
+        upsert_games(con, changelog, games)
+    # New games got their game_key from the sequence; register their IDs
+    sync_game_xref(con)
+
+    sinks = open_sinks(con)
+    boxscores = BulkWriter(
+        con,
+        "unified_player_boxscores",
+        BOXSCORE_COLUMNS,
+        ["game_id", "player_id"],
+        changelog=changelog,
+    )
+    saved = 0
+    for day, br_game_id, known_id, data in scraped:
+        if br_game_id not in game_ids:
+            continue
+        game = resolve_game(con, game_ids[br_game_id])
+        if game is None:
+            print(f"  Warning: {game_ids[br_game_id]} not registered, skipped")
+            continue
+        game_key, game_id = game
+        for alias in (br_game_id, known_id):
+            if alias:
+                register_game_id(con, alias, game_key, game_id)
+        player_ids = match_players(con, data["stats"])
+        for s in data["stats"]:
+            team_id = teams.team_id(s["team_abbr"], day)
+            if not team_id:
+                continue
+            boxscores.add(
+                (
+                    game_id,
+                    game_key,
+                    player_ids[s["player_id"]],
+                    team_id,
+                    parse_minutes(s["mp"]),
+                    s["pts"],
+                    s["ast"],
+                    s["trb"],
+                    s["stl"],
+                    s["blk"],
+                    s["fg"],
+                    s["fga"],
+                    s["fg3"],
+                    s["fg3a"],
+                    s["ft"],
+                    s["fta"],
+                    s["pf"],
+                    s["tov"],
+                    s["plus_minus"],
+                )
+            )
+        save_to_db(sinks, game_id, data["referees"], [])
+        saved += 1
+    boxscores.close()
+    for writer in sinks.values():
+        writer.close()
+    return saved, boxscores.rows_written
+
+
+def update(since=None, until=None, dry_run=False):
+    start = time.perf_counter()
+    started_at = datetime.now()
+    con = get_db_connection()
+    first, last = update_window(con, since, until)
+    if first > last:
+        print(f"Up to date through {last}.")
+        con.close()
+        return
+
+    days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    print(f"Updating {len(days)} days: {first} to {last}")
+    # Inside the official schedule only game days with games not yet ingested
+    # are fetched, straight from their box scores; outside it, every scoreboard
+    load_schedule(con)
+    covered_first, covered_last = schedule_coverage(con)
+    planned = {}
+    for game_id, day, br_game_id, _ in scheduled_games(con, first, last):
+        planned.setdefault(day, []).append((game_id, br_game_id))
+    scraped = []
+    fetched_through = None
+    skipped = 0
+    for day in days:
+        covered = covered_first is not None and covered_first <= day <= covered_last
+        if covered and day not in planned:
+            skipped += 1
+            fetched_through = day
+            continue
+        games = fetch_day(day, planned.get(day), dry_run)
+        if games is None:
+            # Stop at the first incomplete day so the next run retries it
+            break
+        scraped += [(day, *game) for game in games]
+        fetched_through = day
+    if skipped:
+        print(f"  {skipped} days skipped (no games due per the schedule)")
+    fetch_seconds = time.perf_counter() - start
+    if dry_run or fetched_through is None:
+        con.close()
+        return
+
+    changelog = Changelog(con, STEP)
+    ensure_update_runs(con)
+    # All or nothing: a failed save leaves the window to the next run
+    con.begin()
+    try:
+        saved, rows = save_games(con, changelog, scraped)
+        con.execute(
+            """
+            INSERT INTO update_runs
+            SELECT COALESCE(MAX(run_id), 0) + 1, ?, ?, ?, ?, ?, ?, ?
+            FROM update_runs
+            """,
+            [
+                started_at,
+                datetime.now(),
+                first,
+                fetched_through,
+                saved,
+                rows,
+                changelog.version,
+            ],
+        )
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    changelog.print_summary()
+    con.close()
+    load_team_registry().print_miss_report()
+    print(
+        f"Updated {saved} games ({rows} box score rows) through {fetched_through} "
+        f"in {time.perf_counter() - start:.1f}s ({fetch_seconds:.1f}s fetching)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Fetch and upsert the games completed since the last update"
+    )
+    parser.add_argument(
+        "--since",
+        type=date.fromisoformat,
+        help="First date to fetch, YYYY-MM-DD (default: after the last update)",
+    )
+    parser.add_argument(
+        "--until",
+        type=date.fromisoformat,
+        help="Last date to fetch (default: yesterday)",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="List the games without saving them"
+    )
+    args = parser.parse_args()
+
+    update(args.since, args.until, args.dry_run)
@@ -1,9 +1,11 @@
 import os
+from datetime import date
 
 import pandas as pd
 
 from src.core.config import TEAM_HISTORIES_CSV
 from src.core.database import get_db_connection
+from src.core.team_resolver import FIRST_SEASON, season_of
 
 
 def init_dimensions():
@@ -32,7 +34,9 @@ def init_dimensions():
 
     print("Initializing raw_dim_seasons...")
     seasons = []
-    for year in range(1946, 2026):
+    # Through the current season; the unified migration adds any other season
+    # found in the games
+    for year in range(FIRST_SEASON, season_of(date.today()) + 1):
         season_id = f"{year}-{str(year + 1)[2:]}"
         league = "BAA" if year < 1949 else "NBA"
         seasons.append((season_id, year, year + 1, league))
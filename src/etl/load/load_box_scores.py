@@ -1,8 +1,9 @@
 import os
 
+from src.core.config import PLAYER_STATISTICS_CSV
 from src.core.database import get_db_connection
 
-CSV_PATH = "data/raw/PlayerStatistics.csv"
+CSV_PATH = PLAYER_STATISTICS_CSV
 
 
 def load_box_scores():
@@ -0,0 +1,162 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import duckdb
+
+from src.core.database import get_db_connection
+from src.core.frozen_seasons import ensure_history_views
+from src.etl.quality.checks import CHECKS
+
+
+def ensure_quality_history(con):
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS data_quality_history (
+        run_id       INTEGER NOT NULL,
+        run_at       TIMESTAMP NOT NULL,
+        check_name   VARCHAR NOT NULL,
+        severity     VARCHAR NOT NULL,
+        failures     BIGINT NOT NULL,
+        example      VARCHAR,
+        seconds      DOUBLE NOT NULL,
+        PRIMARY KEY (run_id, check_name)
+    )
+    """)
+
+
+def runnable_checks(con, checks=CHECKS):
+    """The checks whose tables and views all exist."""
+    existing = {
+        row[0]
+        for row in con.execute(
+            "SELECT table_name FROM duckdb_tables() "
+            "UNION ALL SELECT view_name FROM duckdb_views()"
+        ).fetchall()
+    }
+    return [c for c in checks if set(c.tables) <= existing]
+
+
+def run_check(con, check):
+    """
+    (check, failures, example, seconds), on a cursor of its own. A check that
+    can't run (a column missing from an older schema) has failures None and
+    the error as its example.
+    """
+    start = time.perf_counter()
+    try:
+        with con.cursor() as cur:
+            failures, example = cur.execute(check.sql).fetchone()
+        failures = int(failures)
+    except duckdb.Error as e:
+        failures, example = None, str(e).splitlines()[0]
+    return check, failures, example, time.perf_counter() - start
+
+
+def run_checks(con, checks, workers):
+    """Runs independent checks concurrently; DuckDB releases the GIL per query."""
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda c: run_check(con, c), checks))
+    return [run_check(con, c) for c in checks]
+
+
+def record_run(con, results):
+    ensure_quality_history(con)
+    run_id = con.execute(
+        "SELECT COALESCE(MAX(run_id), 0) + 1 FROM data_quality_history"
+    ).fetchone()[0]
+    con.executemany(
+        """
+        INSERT INTO data_quality_history
+        VALUES (?, now(), ?, ?, ?, ?, ?)
+        """,
+        [
+            (run_id, c.name, c.severity, failures, example, seconds)
+            for c, failures, example, seconds in results
+            if failures is not None
+        ],
+    )
+    return run_id
+
+
+def failure_trends(con, run_id, runs):
+    """{check_name: [failures]} over the last `runs` runs, oldest first."""
+    trends = {}
+    for name, failures in con.execute(
+        """
+        SELECT check_name, failures FROM data_quality_history
+        WHERE run_id > ? - ? ORDER BY run_id
+        """,
+        [run_id, runs],
+    ).fetchall():
+        trends.setdefault(name, []).append(failures)
+    return trends
+
+
+def print_report(results, trends):
+    print(f"{'check':<28} {'severity':<8} {'failures':>9}  trend (oldest first)")
+    for check, failures, example, seconds in sorted(
+        results, key=lambda r: (r[1] == 0, r[0].severity != "error", r[0].name)
+    ):
+        if failures is None:
+            print(f"{check.name:<28} {check.severity:<8} {'-':>9}  {example}")
+            continue
+        trend = " -> ".join(map(str, trends.get(check.name, [])))
+        print(
+            f"{check.name:<28} {check.severity:<8} {failures:>9}  {trend}"
+            f"  ({seconds:.2f}s)"
+        )
+        if failures:
+            print(f"    {check.description}; e.g. {example}")
+
+
+def audit(workers=None, runs=5):
+    """Runs every check, records it in data_quality_history and returns the results."""
+    con = get_db_connection()
+    ensure_history_views(con)
+    checks = runnable_checks(con)
+    workers = workers or min(len(checks), os.cpu_count() or 1)
+
+    start = time.perf_counter()
+    results = run_checks(con, checks, workers)
+    elapsed = time.perf_counter() - start
+
+    run_id = record_run(con, results)
+    trends = failure_trends(con, run_id, runs)
+    con.close()
+
+    print_report(results, trends)
+    skipped = len(CHECKS) - len(checks)
+    print(
+        f"Audit run {run_id}: {len(checks)} checks ({skipped} skipped, tables "
+        f"missing) on {workers} workers in {elapsed:.2f}s"
+    )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run the data-quality checks and record the results"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="Checks run at once (default: one per CPU)"
+    )
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Past runs shown in each check's trend"
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Exit non-zero if any error-severity check fails",
+    )
+    args = parser.parse_args()
+
+    results = audit(args.workers, args.runs)
+    errors = [
+        c.name for c, failures, _, _ in results if failures and c.severity == "error"
+    ]
+    if args.strict and errors:
+        print(f"Failed checks: {', '.join(errors)}")
+        sys.exit(1)
@@ -0,0 +1,170 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Check:
+    """
+    One data-quality rule. `sql` is a single set-based query returning
+    (failures, example): how many rows break the rule and one of them.
+    Checks whose `tables` don't exist are skipped.
+    """
+
+    name: str
+    description: str
+    tables: tuple
+    sql: str
+    severity: str = "error"  # or "warn": expected in part of the history
+
+
+def orphans(name, table, column, parent, parent_column=None, severity="error"):
+    """Rows of `table` whose non-NULL `column` has no match in `parent`."""
+    parent_column = parent_column or column
+    return Check(
+        name,
+        f"{table}.{column} not in {parent}.{parent_column}",
+        (table, parent),
+        f"""
+        SELECT COUNT(*), ANY_VALUE(c.{column}::VARCHAR)
+        FROM (SELECT {column} FROM {table} WHERE {column} IS NOT NULL) c
+        ANTI JOIN {parent} p ON c.{column} = p.{parent_column}
+        """,
+        severity,
+    )
+
+
+def duplicates(name, table, columns, where="TRUE", severity="error"):
+    """Extra rows sharing the same `columns` values."""
+    cols = ", ".join(columns)
+    return Check(
+        name,
+        f"{table} rows duplicated on ({cols})",
+        (table,),
+        f"""
+        SELECT COALESCE(SUM(n - 1), 0), ANY_VALUE(key) FROM (
+            SELECT COUNT(*) AS n, ({cols})::VARCHAR AS key
+            FROM {table} WHERE {where}
+            GROUP BY {cols} HAVING COUNT(*) > 1
+        )
+        """,
+        severity,
+    )
+
+
+BOX_TEAM_POINTS_SQL = """
+WITH box AS (
+    SELECT game_key, team_id, SUM(points) AS points
+    FROM unified_player_boxscores_all
+    GROUP BY game_key, team_id
+)
+SELECT COUNT(*), ANY_VALUE(g.game_id || ' team ' || b.team_id || ': '
+                          || b.points || ' vs ' || {side}_points)
+FROM box b
+JOIN unified_games_all g
+  ON b.game_key = g.game_key AND b.team_id = g.{side}_team_id
+WHERE b.points IS DISTINCT FROM g.{side}_points
+"""
+
+CHECKS = [
+    # Referential integrity of the fact tables
+    orphans(
+        "boxscore_game",
+        "unified_player_boxscores_all",
+        "game_key",
+        "unified_games_all",
+    ),
+    orphans(
+        "boxscore_player",
+        "unified_player_boxscores_all",
+        "player_id",
+        "unified_players",
+    ),
+    orphans(
+        "boxscore_team", "unified_player_boxscores_all", "team_id", "unified_teams"
+    ),
+    orphans("game_season", "unified_games_all", "season_id", "unified_seasons"),
+    orphans(
+        "game_home_team",
+        "unified_games_all",
+        "home_team_id",
+        "unified_teams",
+        "team_id",
+    ),
+    orphans(
+        "game_away_team",
+        "unified_games_all",
+        "away_team_id",
+        "unified_teams",
+        "team_id",
+    ),
+    Check(
+        "game_team_season",
+        "games whose team has no unified_team_seasons row for the season",
+        ("unified_games_all", "unified_team_seasons"),
+        """
+        SELECT COUNT(*), ANY_VALUE(g.game_id || ' team ' || g.team_id)
+        FROM (
+            SELECT game_id, season_id, home_team_id AS team_id FROM unified_games_all
+            UNION ALL
+            SELECT game_id, season_id, away_team_id FROM unified_games_all
+        ) g
+        ANTI JOIN unified_team_seasons t
+          ON g.team_id = t.team_id AND g.season_id = t.season_id
+        """,
+    ),
+    orphans("game_xref", "unified_games_all", "game_key", "unified_game_xref"),
+    orphans("pbp_game", "unified_pbp_events_all", "game_key", "unified_games_all"),
+    orphans("draft_player", "unified_drafts", "player_id", "unified_players"),
+    orphans("draft_team", "unified_drafts", "team_id", "unified_teams"),
+    orphans("team_history_team", "unified_team_history", "team_id", "unified_teams"),
+    # Completeness: most games before the 1980s have no box scores
+    Check(
+        "game_without_boxscores",
+        "played games with no box score rows",
+        ("unified_games_all", "unified_player_boxscores_all"),
+        """
+        SELECT COUNT(*), ANY_VALUE(g.game_id)
+        FROM (SELECT game_key, game_id FROM unified_games_all
+              WHERE home_points IS NOT NULL) g
+        ANTI JOIN unified_player_boxscores_all b ON g.game_key = b.game_key
+        """,
+        "warn",
+    ),
+    Check(
+        "boxscore_team_not_in_game",
+        "box score rows for a team that played neither side of the game",
+        ("unified_games_all", "unified_player_boxscores_all"),
+        """
+        SELECT COUNT(*), ANY_VALUE(g.game_id || ' team ' || b.team_id)
+        FROM unified_player_boxscores_all b
+        JOIN unified_games_all g ON b.game_key = g.game_key
+        WHERE b.team_id NOT IN (g.home_team_id, g.away_team_id)
+        """,
+    ),
+    # Consistency: a team's box score points add up to its game score
+    Check(
+        "box_points_home",
+        "home box score points differ from home_points",
+        ("unified_games_all", "unified_player_boxscores_all"),
+        BOX_TEAM_POINTS_SQL.format(side="home"),
+    ),
+    Check(
+        "box_points_away",
+        "away box score points differ from away_points",
+        ("unified_games_all", "unified_player_boxscores_all"),
+        BOX_TEAM_POINTS_SQL.format(side="away"),
+    ),
+    # Duplicates
+    duplicates(
+        "boxscore_duplicate",
+        "unified_player_boxscores_all",
+        ["game_key", "player_id"],
+    ),
+    duplicates("game_duplicate", "unified_games_all", ["game_id"]),
+    duplicates(
+        "player_duplicate",
+        "unified_players",
+        ["lower(display_name)", "birth_date"],
+        where="birth_date IS NOT NULL",
+        severity="warn",
+    ),
+]
@@ -0,0 +1,200 @@
+import argparse
+import time
+
+from src.core.database import get_db_connection
+from src.core.table_versions import bump_table_version
+
+# Last season played as the BAA before the merger into the NBA
+BAA_LAST_SEASON = 1948
+
+# NBA game IDs (0021900001, or 21900001 once a CSV drops the zeros) encode the
+# season's start year in digits 4-5: 46-99 are the 1900s.
+NBA_ID_SEASON_SQL = r"""
+CASE WHEN regexp_full_match(lpad({col}, 10, '0'), '00[1-6]\d{{7}}') THEN
+    1900 + CAST(substr(lpad({col}, 10, '0'), 4, 2) AS INTEGER)
+    + CASE WHEN substr(lpad({col}, 10, '0'), 4, 2) < '46' THEN 100 ELSE 0 END
+END
+"""
+
+# Games.csv gameType -> season_type code
+PHASE_SQL = """
+CASE
+    WHEN {col} ILIKE '%preseason%' THEN 'PRE'
+    WHEN {col} ILIKE '%play-in%' THEN 'PIN'
+    WHEN {col} ILIKE '%playoff%' THEN 'PO'
+    WHEN {col} ILIKE '%all-star%' THEN 'ASG'
+    ELSE 'REG'
+END
+"""
+
+# Which phase a date belongs to where phase date ranges overlap
+PHASE_PRECEDENCE = ["PO", "PIN", "ASG", "REG", "PRE"]
+
+# Days without an ID-coded game are grouped into seasons by the gaps between
+# game dates; no in-season break outside the 2020 suspension comes close.
+OFFSEASON_GAP_DAYS = 90
+
+RAW_GAMES_SQL = f"""
+SELECT gameId::VARCHAR AS game_id, gameDateTimeEst::DATE AS game_date,
+       {PHASE_SQL.format(col="gameType")} AS phase
+FROM raw_games
+"""
+UNIFIED_GAMES_SQL = """
+SELECT game_id, game_date, season_type::VARCHAR AS phase FROM unified_games_all
+"""
+
+
+def assign_season_days(con, games_sql):
+    """
+    Fills the temp tables calendar_games (game days and phases) and
+    calendar_seasons (each season's first and last game day). A day's season
+    comes from the IDs of its games; days without NBA-style IDs take the
+    coded season of their gap-delimited cluster, or the year the cluster starts
+    in (the previous year if it starts before July).
+    """
+    con.execute(f"""
+    CREATE OR REPLACE TEMP TABLE calendar_games AS
+    SELECT game_date, phase,
+           mode({NBA_ID_SEASON_SQL.format(col="game_id")}) AS coded_season
+    FROM ({games_sql}) g
+    WHERE game_date IS NOT NULL
+    GROUP BY game_date, phase
+    """)
+    con.execute(f"""
+    CREATE OR REPLACE TEMP TABLE calendar_days AS
+    WITH days AS (
+        SELECT game_date, mode(coded_season) AS coded_season
+        FROM calendar_games
+        GROUP BY game_date
+    ),
+    breaks AS (
+        SELECT *,
+               COALESCE(
+                   game_date - LAG(game_date) OVER (ORDER BY game_date)
+                   > {OFFSEASON_GAP_DAYS},
+                   TRUE
+               )::INTEGER AS new_cluster
+        FROM days
+    ),
+    clusters AS (
+        SELECT *, SUM(new_cluster) OVER (ORDER BY game_date) AS cluster FROM breaks
+    )
+    SELECT
+        game_date,
+        COALESCE(
+            coded_season,
+            mode(coded_season) OVER (PARTITION BY cluster),
+            year(first_day) - CASE WHEN month(first_day) < 7 THEN 1 ELSE 0 END
+        ) AS season_year
+    FROM (
+        SELECT *, MIN(game_date) OVER (PARTITION BY cluster) AS first_day FROM clusters
+    )
+    """)
+    con.execute("""
+    CREATE OR REPLACE TEMP TABLE calendar_seasons AS
+    SELECT season_year, MIN(game_date) AS first_day, MAX(game_date) AS last_day
+    FROM calendar_days
+    GROUP BY season_year
+    """)
+
+
+def sync_seasons(con):
+    """Adds seasons found in the games and sets each season's start/end dates."""
+    added = con.execute(f"""
+    INSERT INTO unified_seasons (season_id, league_id, season_year)
+    SELECT
+        (SELECT COALESCE(MAX(season_id), 0) FROM unified_seasons)
+            + row_number() OVER (ORDER BY season_year),
+        CASE WHEN season_year <= {BAA_LAST_SEASON} THEN 2 ELSE 1 END,
+        season_year
+    FROM calendar_seasons
+    WHERE season_year NOT IN (SELECT season_year FROM unified_seasons)
+    """).fetchone()[0]
+    con.execute("""
+    UPDATE unified_seasons SET start_date = c.first_day, end_date = c.last_day
+    FROM calendar_seasons c
+    WHERE unified_seasons.season_year = c.season_year
+    """)
+    return added
+
+
+def build_calendar(con, games_sql=RAW_GAMES_SQL):
+    """
+    (Re)builds unified_calendar: one row per date from the first game to the
+    last, with its season, league, phase (the season_type whose game dates span
+    it; NULL in the off-season), day and week of the season. Games join it on
+    game_date = calendar_date. `games_sql` yields game_id, game_date and phase.
+    """
+    assign_season_days(con, games_sql)
+    added = sync_seasons(con)
+    precedence = ", ".join(f"'{phase}'" for phase in PHASE_PRECEDENCE)
+    con.execute("""
+    CREATE OR REPLACE TABLE unified_calendar (
+      calendar_date    DATE PRIMARY KEY,
+      season_id        INTEGER NOT NULL,
+      league_id        INTEGER NOT NULL,
+      season_year      INTEGER NOT NULL,
+      phase            season_type,
+      day_of_season    SMALLINT NOT NULL,
+      week_of_season   SMALLINT NOT NULL
+    )
+    """)
+    con.execute(f"""
+    INSERT INTO unified_calendar
+    WITH dates AS (
+        SELECT range::DATE AS calendar_date
+        FROM range(
+            (SELECT MIN(first_day) FROM calendar_seasons),
+            (SELECT MAX(last_day) FROM calendar_seasons) + 1,
+            INTERVAL 1 DAY
+        )
+    ),
+    phases AS (
+        SELECT d.season_year, g.phase,
+               MIN(g.game_date) AS first_day, MAX(g.game_date) AS last_day
+        FROM calendar_games g
+        JOIN calendar_days d ON g.game_date = d.game_date
+        GROUP BY d.season_year, g.phase
+    )
+    SELECT
+        d.calendar_date,
+        s.season_id,
+        s.league_id,
+        c.season_year,
+        p.phase,
+        d.calendar_date - c.first_day + 1,
+        (d.calendar_date - c.first_day) // 7 + 1
+    FROM dates d
+    -- Off-season days belong to the season that last started
+    ASOF JOIN calendar_seasons c ON d.calendar_date >= c.first_day
+    JOIN unified_seasons s ON s.season_year = c.season_year
+    LEFT JOIN phases p
+      ON p.season_year = c.season_year
+     AND d.calendar_date BETWEEN p.first_day AND p.last_day
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY d.calendar_date
+        ORDER BY list_position([{precedence}], p.phase)
+    ) = 1
+    ORDER BY d.calendar_date
+    """)
+    bump_table_version(con, "unified_calendar", "unified_seasons")
+    return added
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Rebuild unified_calendar from the games already migrated"
+    )
+    parser.parse_args()
+
+    con = get_db_connection()
+    start = time.perf_counter()
+    added = build_calendar(con, UNIFIED_GAMES_SQL)
+    days, seasons = con.execute(
+        "SELECT COUNT(*), COUNT(DISTINCT season_id) FROM unified_calendar"
+    ).fetchone()
+    con.close()
+    print(
+        f"Built unified_calendar: {days} days over {seasons} seasons "
+        f"({added} seasons added) in {time.perf_counter() - start:.2f}s"
+    )
@@ -0,0 +1,194 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from src.core.database import get_db_connection
+from src.core.frozen_seasons import ensure_history_views
+from src.core.table_versions import bump_table_version
+
+# Rows are rewritten in this order, so each row group covers a narrow player_id
+# range and min/max zone maps skip the rest on per-player scans.
+CLUSTER_ORDER = "b.player_id, g.game_date, b.game_key"
+
+# Game lookups go through this ART index instead of relying on row order
+GAME_INDEX = "idx_player_boxscores_game"
+
+PROFILING_METRICS = {
+    "CUMULATIVE_ROWS_SCANNED": "true",
+    "LATENCY": "true",
+}
+
+# name -> (query, which sample key it takes)
+PROBES = {
+    "player career": (
+        "SELECT COUNT(*), SUM(points) FROM unified_player_boxscores "
+        "WHERE player_id = ?",
+        "player_id",
+    ),
+    "player season": (
+        """
+        SELECT SUM(b.points) FROM unified_player_boxscores b
+        JOIN unified_games_all g ON b.game_key = g.game_key
+        WHERE b.player_id = ?
+          AND g.season_id = (SELECT MAX(season_id) FROM unified_games)
+        """,
+        "player_id",
+    ),
+    "game box score": (
+        "SELECT * FROM unified_player_boxscores WHERE game_id = ?",
+        "game_id",
+    ),
+}
+
+
+def sample_keys(con):
+    """The busiest player (worst case for a player scan) and the latest game."""
+    player_id = con.execute("""
+        SELECT player_id FROM unified_player_boxscores
+        GROUP BY player_id ORDER BY COUNT(*) DESC LIMIT 1
+    """).fetchone()[0]
+    game_id = con.execute("""
+        SELECT b.game_id FROM unified_player_boxscores b
+        JOIN unified_games_all g ON b.game_key = g.game_key
+        ORDER BY g.game_date DESC, b.game_id DESC LIMIT 1
+    """).fetchone()[0]
+    return {"player_id": player_id, "game_id": game_id}
+
+
+def profile(con, sql, params):
+    """Runs a query with DuckDB's JSON profiler; returns (rows scanned, ms)."""
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        con.execute("PRAGMA enable_profiling = 'json'")
+        con.execute(f"PRAGMA profiling_output = '{path}'")
+        con.execute(
+            f"PRAGMA custom_profiling_settings = '{json.dumps(PROFILING_METRICS)}'"
+        )
+        con.execute(sql, params).fetchall()
+        con.execute("PRAGMA disable_profiling")
+        with open(path) as f:
+            stats = json.load(f)
+    finally:
+        os.remove(path)
+    return stats.get("cumulative_rows_scanned", 0), stats.get("latency", 0.0) * 1000
+
+
+def bytes_per_row(con):
+    """Average on-disk bytes per box score row (storage blocks / rows)."""
+    blocks, rows = con.execute("""
+        SELECT
+            COUNT(DISTINCT block_id) FILTER (WHERE block_id >= 0),
+            (SELECT COUNT(*) FROM unified_player_boxscores)
+        FROM pragma_storage_info('unified_player_boxscores')
+    """).fetchone()
+    block_size = con.execute(
+        "SELECT block_size FROM pragma_database_size()"
+    ).fetchone()[0]
+    return blocks * block_size / rows if rows else 0.0
+
+
+def benchmark(keys):
+    """
+    Profiles every probe on a fresh connection. Returns {probe: (rows scanned,
+    estimated bytes scanned, ms)}; bytes are rows scanned x average row size,
+    since zone maps skip whole row groups.
+    """
+    con = get_db_connection()
+    row_bytes = bytes_per_row(con)
+    con.close()
+    results = {}
+    for name, (sql, key) in PROBES.items():
+        con = get_db_connection()
+        rows, ms = profile(con, sql, [keys[key]])
+        results[name] = (rows, int(rows * row_bytes), ms)
+        con.close()
+    return results
+
+
+def row_group_count(con):
+    return con.execute("""
+        SELECT COUNT(DISTINCT row_group_id)
+        FROM pragma_storage_info('unified_player_boxscores')
+    """).fetchone()[0]
+
+
+def cluster():
+    con = get_db_connection()
+    ensure_history_views(con)
+    keys = sample_keys(con)
+    row_groups = row_group_count(con)
+    con.close()
+    before = benchmark(keys)
+
+    print("Rewriting unified_player_boxscores clustered by (player_id, game_date)...")
+    start = time.perf_counter()
+    con = get_db_connection()
+    ddl = con.execute(
+        "SELECT sql FROM duckdb_tables() WHERE table_name = 'unified_player_boxscores'"
+    ).fetchone()[0]
+    indexes = con.execute(
+        "SELECT index_name, sql FROM duckdb_indexes() "
+        "WHERE table_name = 'unified_player_boxscores' AND sql IS NOT NULL"
+    ).fetchall()
+    # Filling a fresh copy and swapping it in is much faster than DELETE + INSERT,
+    # which has to maintain the primary key index row by row
+    con.begin()
+    try:
+        for name, _ in indexes:
+            con.execute(f"DROP INDEX {name}")
+        con.execute(
+            ddl.replace(
+                "TABLE unified_player_boxscores(",
+                "TABLE unified_player_boxscores_sorted(",
+                1,
+            )
+        )
+        con.execute(f"""
+        INSERT INTO unified_player_boxscores_sorted
+        SELECT b.*
+        FROM unified_player_boxscores b
+        LEFT JOIN unified_games_all g ON b.game_key = g.game_key
+        ORDER BY {CLUSTER_ORDER}
+        """)
+        con.execute("DROP TABLE unified_player_boxscores")
+        con.execute(
+            "ALTER TABLE unified_player_boxscores_sorted "
+            "RENAME TO unified_player_boxscores"
+        )
+        for name, sql in indexes:
+            if name != GAME_INDEX:
+                con.execute(sql)
+        con.execute(f"CREATE INDEX {GAME_INDEX} ON unified_player_boxscores (game_id)")
+        bump_table_version(con, "unified_player_boxscores")
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    con.execute("CHECKPOINT")
+    print(
+        f"Rewrote {row_groups} -> {row_group_count(con)} row groups "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    con.close()
+
+    after = benchmark(keys)
+    print(
+        f"\n{'probe':<16}{'rows scanned':>24}{'est. bytes scanned':>26}{'ms':>18}"
+        f"\n{'':<16}{'before':>12}{'after':>12}{'before':>13}{'after':>13}"
+        f"{'before':>9}{'after':>9}"
+    )
+    for name in PROBES:
+        (r0, b0, t0), (r1, b1, t1) = before[name], after[name]
+        print(f"{name:<16}{r0:>12}{r1:>12}{b0:>13}{b1:>13}{t0:>9.1f}{t1:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Rewrite unified_player_boxscores clustered by player and date"
+    )
+    parser.parse_args()
+
+    cluster()
@@ -0,0 +1,269 @@
+import argparse
+import time
+
+from src.core.database import get_db_connection
+from src.core.frozen_seasons import ensure_frozen_registry, ensure_history_views
+from src.core.game_xref import sync_game_xref
+from src.core.schema_types import (
+    create_team_abbreviation_type,
+    ensure_enum_types,
+    ensure_game_key_sequence,
+)
+from src.core.table_versions import bump_table_version
+from src.core.team_resolver import build_team_seasons
+
+BOX_STATS = [
+    "points",
+    "assists",
+    "rebounds_total",
+    "steals",
+    "blocks",
+    "fgm",
+    "fga",
+    "fg3m",
+    "fg3a",
+    "ftm",
+    "fta",
+    "pf",
+    "turnovers",
+]
+
+# Target types of migrate_unified_schema.py, for databases built before it
+# switched to them. Single-game counts fit UTINYINT (0-255); game_key is BIGINT
+# like every other ID it joins with.
+COLUMN_TYPES = {
+    "unified_player_boxscores": {
+        "game_key": "BIGINT",
+        "minutes": "DECIMAL(5, 2)",
+        **{col: "UTINYINT" for col in BOX_STATS},
+        "plus_minus": "SMALLINT",
+    },
+    "unified_games": {
+        "game_key": "BIGINT",
+        "season_type": "season_type",
+        "home_points": "SMALLINT",
+        "away_points": "SMALLINT",
+    },
+    "unified_team_history": {"abbreviation": "team_abbreviation"},
+    "unified_awards": {"award_code": "award_code"},
+    "unified_season_awards": {"season_type": "season_type"},
+    "unified_pbp_events": {"game_key": "BIGINT"},
+    "unified_game_xref": {"game_key": "BIGINT"},
+}
+GAME_KEY_INDEX = "idx_unified_games_game_key"
+
+# Tables that reference games and join to them on game_key
+FACT_TABLES = ["unified_player_boxscores", "unified_pbp_events"]
+
+
+def column_types(con, table):
+    return dict(
+        con.execute(
+            "SELECT column_name, data_type FROM duckdb_columns() WHERE table_name = ?",
+            [table],
+        ).fetchall()
+    )
+
+
+def key_columns(con, table):
+    """Columns in a PRIMARY KEY or UNIQUE constraint; DuckDB can't retype those."""
+    rows = con.execute(
+        "SELECT constraint_column_names FROM duckdb_constraints() "
+        "WHERE table_name = ? AND constraint_type IN ('PRIMARY KEY', 'UNIQUE')",
+        [table],
+    ).fetchall()
+    return {col for (cols,) in rows for col in cols}
+
+
+def table_sizes(con, tables):
+    """
+    CHECKPOINTs, then returns {table: bytes} for tables that exist, counting the
+    storage blocks holding each one, plus "(database)" for all used blocks.
+    """
+    con.execute("CHECKPOINT")
+    block_size, used_blocks = con.execute(
+        "SELECT block_size, used_blocks FROM pragma_database_size()"
+    ).fetchone()
+    existing = {
+        row[0]
+        for row in con.execute("SELECT table_name FROM duckdb_tables()").fetchall()
+    }
+    sizes = {}
+    for table in tables:
+        if table in existing:
+            blocks = con.execute(
+                "SELECT COUNT(DISTINCT block_id) FILTER (WHERE block_id >= 0) "
+                f"FROM pragma_storage_info('{table}')"
+            ).fetchone()[0]
+            sizes[table] = blocks * block_size
+    sizes["(database)"] = used_blocks * block_size
+    return sizes
+
+
+def print_size_report(before, after):
+    print(f"{'table':<32}{'before MB':>12}{'after MB':>12}{'change':>9}")
+    for table in after:
+        b, a = before.get(table), after[table]
+        change = f"{(a - b) / b:+.0%}" if b else ""
+        b = "" if b is None else f"{b / 1e6:.1f}"
+        print(f"{table:<32}{b:>12}{a / 1e6:>12.1f}{change:>9}")
+
+
+def secondary_indexes(con, table):
+    return con.execute(
+        "SELECT index_name, sql FROM duckdb_indexes() "
+        "WHERE table_name = ? AND sql IS NOT NULL",
+        [table],
+    ).fetchall()
+
+
+def retype_table(con, table, changes):
+    """
+    ALTER COLUMN TYPE for each of `changes` ({column: type}). Secondary indexes
+    block type changes, even when dropped in the same transaction, so they are
+    dropped first and recreated afterwards (also if the change fails).
+    """
+    indexes = secondary_indexes(con, table)
+    for name, _ in indexes:
+        con.execute(f"DROP INDEX {name}")
+    con.begin()
+    try:
+        for column, type_ in changes.items():
+            con.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {type_}")
+        bump_table_version(con, table)
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    finally:
+        for _, sql in indexes:
+            con.execute(sql)
+
+
+def add_game_key(con):
+    """
+    Adds unified_games.game_key numbered in date order. The full migration
+    declares it NOT NULL UNIQUE; here a unique index stands in, since DuckDB can't
+    add constraints to a table other tables reference.
+    """
+    con.begin()
+    try:
+        con.execute("ALTER TABLE unified_games ADD COLUMN game_key BIGINT")
+        con.execute("""
+        UPDATE unified_games SET game_key = k.game_key
+        FROM (
+            SELECT game_id, row_number() OVER (ORDER BY game_date, game_id) AS game_key
+            FROM unified_games
+        ) k
+        WHERE unified_games.game_id = k.game_id
+        """)
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    # DuckDB won't build an index over uncommitted updates
+    con.execute(f"CREATE UNIQUE INDEX {GAME_KEY_INDEX} ON unified_games (game_key)")
+    ensure_game_key_sequence(con)
+    bump_table_version(con, "unified_games")
+
+
+def add_fact_game_key(con, table):
+    """Adds game_key to a fact table keyed by game_id, copied from unified_games."""
+    indexes = secondary_indexes(con, table)
+    con.begin()
+    try:
+        for name, _ in indexes:
+            con.execute(f"DROP INDEX {name}")
+        con.execute(f"ALTER TABLE {table} ADD COLUMN game_key BIGINT")
+        con.execute(f"""
+        UPDATE {table} SET game_key = g.game_key
+        FROM unified_games g
+        WHERE {table}.game_id = g.game_id
+        """)
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    for _, sql in indexes:
+        con.execute(sql)
+    bump_table_version(con, table)
+
+
+def compact():
+    con = get_db_connection()
+    ensure_frozen_registry(con)
+    if con.execute("SELECT COUNT(*) FROM frozen_seasons").fetchone()[0]:
+        # Frozen Parquet files can't be retyped or given game keys in place
+        print("Frozen seasons exist; thaw them first (cli freeze --thaw SEASON_YEAR).")
+        con.close()
+        return
+
+    tables = [t for t in COLUMN_TYPES if column_types(con, t)]
+    before = table_sizes(con, [*tables, "unified_game_xref"])
+
+    ensure_enum_types(con)
+    start = time.perf_counter()
+    for table in tables:
+        current = column_types(con, table)
+        keys = key_columns(con, table)
+        if table == "unified_team_history" and not current["abbreviation"].startswith(
+            "ENUM"
+        ):
+            create_team_abbreviation_type(
+                con, "SELECT abbreviation FROM unified_team_history"
+            )
+        changes = {}
+        for column, type_ in COLUMN_TYPES[table].items():
+            if column not in current:
+                continue
+            target = con.execute(f"SELECT typeof(NULL::{type_})").fetchone()[0]
+            if current[column] == target:
+                continue
+            if column in keys:
+                print(
+                    f"  [{table}] {column} is part of a key; "
+                    f"it becomes {type_} when the table is next rebuilt."
+                )
+                continue
+            changes[column] = type_
+        if changes:
+            print(f"  [{table}] {', '.join(f'{c} -> {t}' for c, t in changes.items())}")
+            retype_table(con, table, changes)
+
+    if "unified_games" in tables and "game_key" not in column_types(
+        con, "unified_games"
+    ):
+        print("  [unified_games] adding game_key")
+        add_game_key(con)
+    for table in FACT_TABLES:
+        columns = column_types(con, table)
+        if columns and "game_key" not in columns:
+            print(f"  [{table}] adding game_key")
+            add_fact_game_key(con, table)
+    if "unified_team_history" in tables and not column_types(
+        con, "unified_team_seasons"
+    ):
+        # Eras keep their placeholder ranges until the next full migration
+        print("  [unified_team_seasons] building")
+        build_team_seasons(con)
+    # Views over retyped tables keep the old column types until recreated
+    ensure_history_views(con)
+    if "unified_games" in tables:
+        added = sync_game_xref(con)
+        if added:
+            print(f"  [unified_game_xref] registered {added} game IDs")
+
+    after = table_sizes(con, [*tables, "unified_game_xref"])
+    con.close()
+
+    print(f"Compacted in {time.perf_counter() - start:.2f}s\n")
+    print_size_report(before, after)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert unified_* columns to compact types and ENUMs in place"
+    )
+    parser.parse_args()
+
+    compact()
@@ -3,13 +3,16 @@ from datetime import datetime
 
 import requests
 
+from src.core.config import settings
 from src.core.database import get_db_connection
+from src.core.game_xref import sync_game_xref
+from src.core.team_registry import load_team_registry
 
 
 def fetch_octonion_games(year):
-    url = f"https://raw.githubusercontent.com/octonion/basketball/master/bbref/csv/games_BAA_{year}.csv"
+    url = f"{settings.urls.octonion_base_url}/games_BAA_{year}.csv"
     print(f"Fetching {url}...")
-    response = requests.get(url)
+    response = requests.get(url, timeout=settings.scraper.request_timeout)
     if response.status_code != 200:
         print(f"Failed to fetch {year} data.")
         return []
@@ -52,46 +55,13 @@ def update_db(games):
     if not games:
         return
     con = get_db_connection()
+    teams = load_team_registry()
 
     mapped_games = []
     for g in games:
-        # Try to map teams using nickname or city nickname
-        h_id_res = con.execute(
-            "SELECT team_id FROM unified_team_history WHERE nickname = ? OR (city || ' ' || nickname) = ? LIMIT 1",
-            (g["home_team_name"], g["home_team_name"]),
-        ).fetchone()
-        a_id_res = con.execute(
-            "SELECT team_id FROM unified_team_history WHERE nickname = ? OR (city || ' ' || nickname) = ? LIMIT 1",
-            (g["away_team_name"], g["away_team_name"]),
-        ).fetchone()
-
-        h_id = h_id_res[0] if h_id_res else None
-        a_id = a_id_res[0] if a_id_res else None
-
-        if not h_id or not a_id:
-            # Comprehensive Manual Mapping for early BAA/NBA teams
-            overrides = {
-                "Toronto Huskies": 9042,
-                "Chicago Stags": 9059,
-                "Detroit Falcons": 9020,
-                "Pittsburgh Ironmen": 9001,
-                "Providence Steam Rollers": 9056,
-                "Cleveland Rebels": 9017,
-                "Washington Capitols": 9015,
-                "St. Louis Bombers": 9012,
-                "Philadelphia Warriors": 1610612755,
-                "New York Knicks": 1610612752,
-                "Baltimore Bullets": 9071,
-                "Boston Celtics": 1610612738,
-                "Minneapolis Lakers": 1610612747,
-                "Rochester Royals": 1610612758,
-                "Fort Wayne Pistons": 1610612765,
-                "Indianapolis Jets": 9008,
-            }
-            if not h_id:
-                h_id = overrides.get(g["home_team_name"])
-            if not a_id:
-                a_id = overrides.get(g["away_team_name"])
+        # Map teams by full name or nickname as of the game date
+        h_id = teams.team_id(g["home_team_name"], g["game_date"])
+        a_id = teams.team_id(g["away_team_name"], g["game_date"])
 
         if not h_id or not a_id:
             print(
@@ -128,6 +98,7 @@ def update_db(games):
     """,
         mapped_games,
     )
+    sync_game_xref(con)
 
     con.close()
     print(f"Inserted {len(mapped_games)} games.")
@@ -137,3 +108,4 @@ if __name__ == "__main__":
     for year in [1947, 1948, 1949]:
         games = fetch_octonion_games(year)
         update_db(games)
+    load_team_registry().print_miss_report()
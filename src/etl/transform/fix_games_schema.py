@@ -1,8 +1,9 @@
+from src.core.config import GAMES_CSV
 from src.core.database import get_db_connection
 
 
 def fix_games_schema():
-    csv_path = "data/raw/Games.csv"
+    csv_path = GAMES_CSV
 
     print("Connecting to database...")
     con = get_db_connection()
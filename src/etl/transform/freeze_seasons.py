@@ -0,0 +1,217 @@
+import argparse
+import os
+import shutil
+import time
+from pathlib import Path
+
+from src.core.database import get_db_connection
+from src.core.frozen_seasons import (
+    FROZEN_DIR,
+    ensure_frozen_registry,
+    ensure_history_views,
+    frozen_parts,
+    frozen_tables,
+)
+from src.core.table_versions import bump_table_version
+from src.etl.derive.refresh_state import boxscore_fingerprints
+
+# Sort order inside each frozen file. Row-group min/max statistics (zone maps) on
+# these columns let game- and date-filtered scans skip most of a season.
+SORT_KEYS = {
+    "unified_player_boxscores": "game_key, player_id",
+    "unified_pbp_events": "game_key, event_num",
+    "unified_games": "game_date, game_id",
+}
+ROW_GROUP_SIZE = 16_384
+COPY_OPTIONS = f"FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE {ROW_GROUP_SIZE}"
+
+
+def season_filter(table):
+    """WHERE clause selecting one season (parameter: season_id) of `table`."""
+    if table == "unified_games":
+        return "season_id = ?"
+    return "game_key IN (SELECT game_key FROM unified_games_all WHERE season_id = ?)"
+
+
+def frozen_path(table, season_year):
+    return FROZEN_DIR / table / f"season_year={season_year}" / "data_0.parquet"
+
+
+def parquet(path):
+    # The season_year=YYYY directory must not come back as a column
+    escaped = str(path).replace("'", "''")
+    return f"read_parquet('{escaped}', hive_partitioning = false)"
+
+
+def seasons_to_freeze(con, keep_live):
+    """(season_id, season_year) of finished seasons: all but the latest `keep_live`."""
+    return con.execute(
+        """
+        SELECT s.season_id, s.season_year
+        FROM unified_seasons s
+        WHERE s.season_id IN (SELECT DISTINCT season_id FROM unified_games_all)
+        QUALIFY ROW_NUMBER() OVER (ORDER BY s.season_year DESC) > ?
+        ORDER BY s.season_year
+        """,
+        [keep_live],
+    ).fetchall()
+
+
+def freeze_table_season(con, table, season_id, season_year, fingerprint):
+    """
+    Copies one season of `table` to Parquet, then removes it from the heap table
+    and registers the file in one transaction. Returns rows frozen.
+    """
+    where = season_filter(table)
+    rows = con.execute(
+        f"SELECT COUNT(*) FROM {table} WHERE {where}", [season_id]
+    ).fetchone()[0]
+    if not rows:
+        return 0
+
+    path = frozen_path(table, season_year)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    escaped = str(tmp).replace("'", "''")
+    con.execute(
+        f"""
+        COPY (SELECT * FROM {table} WHERE {where} ORDER BY {SORT_KEYS[table]})
+        TO '{escaped}' ({COPY_OPTIONS})
+        """,
+        [season_id],
+    )
+    written = con.execute(f"SELECT COUNT(*) FROM {parquet(tmp)}").fetchone()[0]
+    if written != rows:
+        tmp.unlink()
+        raise RuntimeError(f"{table} {season_year}: wrote {written} of {rows} rows")
+    os.replace(tmp, path)
+
+    if fingerprint is None:
+        fingerprint = con.execute(
+            f"SELECT COUNT(*) || ':' || BIT_XOR(HASH(t)) FROM {table} t WHERE {where}",
+            [season_id],
+        ).fetchone()[0]
+
+    con.begin()
+    try:
+        con.execute(f"DELETE FROM {table} WHERE {where}", [season_id])
+        con.execute(
+            """
+            INSERT INTO frozen_seasons
+                (table_name, season_id, season_year, path, rows, fingerprint, frozen_at)
+            VALUES (?, ?, ?, ?, ?, ?, now())
+            """,
+            [table, season_id, season_year, str(path), rows, fingerprint],
+        )
+        ensure_history_views(con)
+        bump_table_version(con, table)
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    return rows
+
+
+def freeze(keep_live=1):
+    con = get_db_connection()
+    ensure_frozen_registry(con)
+    ensure_history_views(con)
+    tables = frozen_tables(con)
+    seasons = seasons_to_freeze(con, keep_live)
+    box_fingerprints = boxscore_fingerprints(con)
+
+    start = time.perf_counter()
+    total = 0
+    for season_id, season_year in seasons:
+        season_rows = 0
+        # Deletes of referenced games must see the children's deletes committed,
+        # so every table gets its own transaction, children first.
+        for table in tables:
+            fingerprint = (
+                box_fingerprints.get(season_id)
+                if table == "unified_player_boxscores"
+                else None
+            )
+            season_rows += freeze_table_season(
+                con, table, season_id, season_year, fingerprint
+            )
+        if season_rows:
+            print(f"  Froze {season_year}: {season_rows} rows")
+        total += season_rows
+
+    if total:
+        con.execute("CHECKPOINT")
+    con.close()
+    print(f"Froze {total} rows into {FROZEN_DIR} in {time.perf_counter() - start:.2f}s")
+
+
+def thaw(season_years):
+    """Moves frozen seasons back into the heap tables (parents first)."""
+    con = get_db_connection()
+    ensure_frozen_registry(con)
+    for table in reversed(frozen_tables(con)):
+        for season_id, season_year, path in frozen_parts(con, table):
+            if season_year not in season_years:
+                continue
+            con.begin()
+            try:
+                con.execute(
+                    f"INSERT INTO {table} BY NAME SELECT * FROM {parquet(path)}"
+                )
+                con.execute(
+                    "DELETE FROM frozen_seasons WHERE table_name = ? AND season_id = ?",
+                    [table, season_id],
+                )
+                ensure_history_views(con)
+                bump_table_version(con, table)
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+            shutil.rmtree(Path(path).parent, ignore_errors=True)
+            print(f"  Thawed {table} {season_year}")
+    con.close()
+
+
+def report():
+    con = get_db_connection()
+    ensure_frozen_registry(con)
+    rows = con.execute("""
+        SELECT table_name, COUNT(*), MIN(season_year), MAX(season_year), SUM(rows)
+        FROM frozen_seasons
+        GROUP BY table_name
+        ORDER BY table_name
+    """).fetchall()
+    con.close()
+    if not rows:
+        print("No frozen seasons.")
+    for table, seasons, first, last, count in rows:
+        print(f"  {table}: {seasons} seasons ({first}-{last}), {count} rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Freeze finished seasons into immutable Parquet files"
+    )
+    parser.add_argument(
+        "--keep-live",
+        type=int,
+        default=1,
+        help="Latest seasons to keep in the mutable tables (default: 1)",
+    )
+    parser.add_argument(
+        "--thaw",
+        type=int,
+        nargs="+",
+        metavar="SEASON_YEAR",
+        help="Move these seasons back into the mutable tables instead",
+    )
+    parser.add_argument("--report", action="store_true", help="List frozen seasons")
+    args = parser.parse_args()
+
+    if args.report:
+        report()
+    elif args.thaw:
+        thaw(set(args.thaw))
+    else:
+        freeze(keep_live=args.keep_live)
@@ -1,4 +1,10 @@
+from src.core.config import (
+    DRAFT_PICK_HISTORY_CSV,
+    PLAYER_AWARD_SHARES_CSV,
+    PLAYER_PLAY_BY_PLAY_CSV,
+)
 from src.core.database import get_db_connection
+from src.core.schema_types import ensure_enum_types
 
 
 def migrate_depth():
@@ -17,12 +23,13 @@ def migrate_depth():
     ]
     for t in tables:
         con.execute(f"DROP TABLE IF EXISTS {t} CASCADE")
+    ensure_enum_types(con)
 
     # 1. Awards Table Definition
     con.execute("""
     CREATE TABLE IF NOT EXISTS unified_awards (
       award_id           INTEGER PRIMARY KEY,
-      award_code         VARCHAR NOT NULL UNIQUE,
+      award_code         award_code NOT NULL UNIQUE,
       award_name         VARCHAR NOT NULL
     );
     """)
@@ -44,7 +51,7 @@ def migrate_depth():
       season_award_id    INTEGER PRIMARY KEY,
       season_id          INTEGER NOT NULL REFERENCES unified_seasons(season_id),
       award_id           INTEGER NOT NULL REFERENCES unified_awards(award_id),
-      season_type        VARCHAR NOT NULL,
+      season_type        season_type NOT NULL,
       UNIQUE (season_id, award_id, season_type)
     );
     """)
@@ -90,6 +97,7 @@ def migrate_depth():
     CREATE TABLE IF NOT EXISTS unified_pbp_events (
       pbp_event_id       BIGINT PRIMARY KEY,
       game_id            VARCHAR NOT NULL REFERENCES unified_games(game_id),
+      game_key           BIGINT NOT NULL,
       event_num          INTEGER NOT NULL,
       period             INTEGER NOT NULL,
       clock_seconds      INTEGER,
@@ -106,14 +114,14 @@ def migrate_depth():
     # MIGRATION
     # 1. Draft
     print("Migrating draft data...")
-    con.execute("""
+    con.execute(f"""
     INSERT OR IGNORE INTO unified_drafts (draft_id, season_id)
     SELECT DISTINCT season, s.season_id
-    FROM read_csv('data/raw/Draft Pick History.csv', nullstr='NA', auto_detect=true) d
+    FROM read_csv('{DRAFT_PICK_HISTORY_CSV}', nullstr='NA', auto_detect=true) d
     JOIN unified_seasons s ON d.season = s.season_year
     """)
 
-    con.execute("""
+    con.execute(f"""
     INSERT OR IGNORE INTO unified_draft_picks (draft_pick_id, draft_id, round_number, pick_in_round, overall_pick, selecting_team_id, player_name)
     SELECT
         row_number() over() as draft_pick_id,
@@ -123,19 +131,19 @@ def migrate_depth():
         overall_pick,
         (select team_id from unified_team_history where abbreviation = d.tm limit 1) as selecting_team_id,
         player
-    FROM read_csv('data/raw/Draft Pick History.csv', nullstr='NA', auto_detect=true) d
+    FROM read_csv('{DRAFT_PICK_HISTORY_CSV}', nullstr='NA', auto_detect=true) d
     """)
 
     # 2. Awards
     print("Migrating award data from CSV...")
-    con.execute("""
+    con.execute(f"""
     INSERT OR IGNORE INTO unified_season_awards (season_award_id, season_id, award_id, season_type)
     SELECT DISTINCT
         row_number() over() as season_award_id,
         s.season_id,
         a.award_id,
         'REG'
-    FROM read_csv('data/raw/Player Award Shares.csv', nullstr='NA', auto_detect=true) raw
+    FROM read_csv('{PLAYER_AWARD_SHARES_CSV}', nullstr='NA', auto_detect=true) raw
     JOIN unified_seasons s ON raw.season = s.season_year
     JOIN unified_awards a ON (
         CASE
@@ -149,7 +157,7 @@ def migrate_depth():
     ) = a.award_code
     """)
 
-    con.execute("""
+    con.execute(f"""
     INSERT OR IGNORE INTO unified_award_results (season_award_id, rank, is_winner, player_id, points_won, points_max, vote_share, first_place_votes)
     SELECT
         sa.season_award_id,
@@ -160,7 +168,7 @@ def migrate_depth():
         raw.pts_max,
         raw.share,
         raw.first
-    FROM read_csv('data/raw/Player Award Shares.csv', nullstr='NA', auto_detect=true) raw
+    FROM read_csv('{PLAYER_AWARD_SHARES_CSV}', nullstr='NA', auto_detect=true) raw
     JOIN unified_seasons s ON raw.season = s.season_year
     JOIN unified_awards a ON (
         CASE
@@ -191,7 +199,7 @@ def migrate_depth():
     );
     """)
 
-    con.execute("""
+    con.execute(f"""
     INSERT OR IGNORE INTO unified_player_season_pbp (season_id, player_id, team_id, bad_pass_tov, lost_ball_tov, shooting_foul_drawn, and1)
     SELECT
         s.season_id,
@@ -201,11 +209,12 @@ def migrate_depth():
         raw.lost_ball_turnover,
         raw.shooting_foul_drawn,
         raw.and1
-    FROM read_csv_auto('data/raw/Player Play By Play.csv') raw
+    FROM read_csv_auto('{PLAYER_PLAY_BY_PLAY_CSV}') raw
     JOIN unified_seasons s ON raw.season = s.season_year
     JOIN unified_players p ON raw.player_id = (SELECT cast(nba_api_person_id as varchar) from unified_players where player_id = p.player_id) -- Again, ID mapping
     OR p.display_name = raw.player
-    JOIN unified_team_history t ON raw.team = t.abbreviation
+    JOIN unified_team_seasons t
+      ON raw.team = t.abbreviation AND t.season_id = s.season_id
     """)
 
     con.close()
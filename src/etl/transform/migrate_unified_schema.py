@@ -1,7 +1,181 @@
+import argparse
+import time
+
+from src.core.cdc import Changelog
 from src.core.database import get_db_connection
+from src.core.frozen_seasons import (
+    ensure_history_views,
+    frozen_parts,
+    reset_frozen,
+)
+from src.core.game_xref import rebuild_game_xref
+from src.core.schema_types import (
+    create_team_abbreviation_type,
+    ensure_enum_types,
+    ensure_game_key_sequence,
+)
+from src.core.table_versions import bump_table_version
+from src.core.team_resolver import build_team_seasons
+from src.etl.transform.build_calendar import PHASE_SQL, build_calendar
+from src.etl.transform.bulk_load import (
+    ConstraintViolation,
+    peak_memory_mb,
+    swap_in_all,
+    unconstrained_ddl,
+)
+from src.etl.transform.compact_unified_schema import print_size_report, table_sizes
+
+# Tables with constraints, parents before the tables referencing them
+SCHEMA = {
+    "unified_leagues": """
+CREATE TABLE unified_leagues (
+  league_id        INTEGER PRIMARY KEY,
+  league_code      VARCHAR NOT NULL UNIQUE,
+  league_name      VARCHAR NOT NULL
+)
+""",
+    "unified_seasons": """
+CREATE TABLE unified_seasons (
+  season_id        INTEGER PRIMARY KEY,
+  league_id        INTEGER NOT NULL REFERENCES unified_leagues(league_id),
+  season_year      INTEGER NOT NULL,
+  start_date       DATE,
+  end_date         DATE,
+  UNIQUE (league_id, season_year)
+)
+""",
+    "unified_arenas": """
+CREATE TABLE unified_arenas (
+  arena_id         INTEGER PRIMARY KEY,
+  arena_name       VARCHAR NOT NULL,
+  city             VARCHAR
+)
+""",
+    "unified_teams": """
+CREATE TABLE unified_teams (
+  team_id          BIGINT PRIMARY KEY,
+  league_id        INTEGER NOT NULL REFERENCES unified_leagues(league_id),
+  franchise_code   VARCHAR,
+  nba_api_team_id  BIGINT UNIQUE
+)
+""",
+    "unified_team_history": """
+CREATE TABLE unified_team_history (
+  team_history_id  INTEGER PRIMARY KEY,
+  team_id          BIGINT NOT NULL REFERENCES unified_teams(team_id),
+  effective_start  DATE NOT NULL,
+  effective_end    DATE,
+  city             VARCHAR NOT NULL,
+  nickname         VARCHAR NOT NULL,
+  abbreviation     team_abbreviation,
+  is_active        BOOLEAN NOT NULL DEFAULT TRUE
+)
+""",
+    "unified_players": """
+CREATE TABLE unified_players (
+  player_id          BIGINT PRIMARY KEY,
+  nba_api_person_id  BIGINT UNIQUE,
+  first_name         VARCHAR,
+  last_name          VARCHAR,
+  display_name       VARCHAR,
+  birth_date         DATE,
+  from_year          INTEGER,
+  to_year            INTEGER
+)
+""",
+    "unified_coaches": """
+CREATE TABLE unified_coaches (
+  coach_id           VARCHAR PRIMARY KEY,
+  nba_api_coach_id   BIGINT UNIQUE,
+  display_name       VARCHAR NOT NULL
+)
+""",
+    "unified_referees": """
+CREATE TABLE unified_referees (
+  referee_id         VARCHAR PRIMARY KEY,
+  nba_api_ref_id     BIGINT UNIQUE,
+  display_name       VARCHAR NOT NULL
+)
+""",
+    "unified_games": """
+CREATE TABLE unified_games (
+  game_id            VARCHAR PRIMARY KEY,
+  game_key           BIGINT NOT NULL UNIQUE,
+  league_id          INTEGER NOT NULL REFERENCES unified_leagues(league_id),
+  season_id          INTEGER NOT NULL REFERENCES unified_seasons(season_id),
+  season_type        season_type NOT NULL,
+  game_date          DATE NOT NULL,
+  home_team_id       BIGINT NOT NULL REFERENCES unified_teams(team_id),
+  away_team_id       BIGINT NOT NULL REFERENCES unified_teams(team_id),
+  home_points        SMALLINT,
+  away_points        SMALLINT,
+  attendance         INTEGER,
+  arena_id           INTEGER REFERENCES unified_arenas(arena_id)
+)
+""",
+    "unified_player_boxscores": """
+CREATE TABLE unified_player_boxscores (
+  game_id            VARCHAR NOT NULL REFERENCES unified_games(game_id),
+  game_key           BIGINT NOT NULL,
+  player_id          BIGINT NOT NULL REFERENCES unified_players(player_id),
+  team_id            BIGINT NOT NULL REFERENCES unified_teams(team_id),
+  minutes            DECIMAL(5, 2),
+  points             UTINYINT,
+  assists            UTINYINT,
+  rebounds_total     UTINYINT,
+  steals             UTINYINT,
+  blocks             UTINYINT,
+  fgm                UTINYINT,
+  fga                UTINYINT,
+  fg3m               UTINYINT,
+  fg3a               UTINYINT,
+  ftm                UTINYINT,
+  fta                UTINYINT,
+  pf                 UTINYINT,
+  turnovers          UTINYINT,
+  plus_minus         SMALLINT,
+  PRIMARY KEY (game_id, player_id)
+)
+""",
+    "unified_drafts": """
+CREATE TABLE unified_drafts (
+    season_year      INTEGER NOT NULL,
+    pick_overall     INTEGER NOT NULL,
+    round_number     INTEGER,
+    pick_in_round    INTEGER,
+    team_id          BIGINT REFERENCES unified_teams(team_id),
+    player_id        BIGINT REFERENCES unified_players(player_id),
+    college          VARCHAR,
+    PRIMARY KEY (season_year, pick_overall)
+)
+""",
+}
+
+
+def frozen_games(con):
+    """
+    (season years, highest game_key) of the games frozen to Parquet. A rebuild
+    leaves those seasons in their files and keys the live games above them.
+    """
+    parts = frozen_parts(con, "unified_games")
+    if not parts:
+        return [], 0
+    files = ", ".join("'" + path.replace("'", "''") + "'" for _, _, path in parts)
+    max_key = con.execute(
+        f"SELECT MAX(game_key) FROM read_parquet([{files}], hive_partitioning = false)"
+    ).fetchone()[0]
+    return [year for _, year, _ in parts], max_key or 0
 
 
-def migrate():
+def migrate(bulk_load=False, full=False):
+    """
+    Rebuilds the unified_* tables from the raw tables. With `bulk_load`, the
+    SCHEMA tables are loaded without constraints and only swapped for their
+    constrained versions after every row was validated (see bulk_load.py).
+    Games and box scores of frozen seasons are skipped unless `full`, which
+    deletes the frozen files and reloads every season.
+    """
+    start = time.perf_counter()
     con = get_db_connection()
 
     print("Creating unified relational schema with prefix 'unified_'...")
@@ -18,154 +192,42 @@ def migrate():
         "unified_player_season_advanced",
         "unified_player_boxscores",
         "unified_games",
+        "unified_team_seasons",
         "unified_team_history",
         "unified_teams",
         "unified_players",
+        "unified_calendar",
         "unified_seasons",
         "unified_leagues",
         "unified_arenas",
         "unified_coaches",
         "unified_referees",
     ]
+    before = table_sizes(con, tables)
+    changelog = Changelog(con, "migrate_unified_schema")
+    changelog.begin([*tables, "unified_game_xref"])
+    if full:
+        reset_frozen(con)
+    frozen_years, frozen_max_key = frozen_games(con)
+    if frozen_years:
+        print(
+            f"Skipping {len(frozen_years)} frozen seasons ({min(frozen_years)}-"
+            f"{max(frozen_years)}); --full reloads them"
+        )
     for t in tables:
         con.execute(f"DROP TABLE IF EXISTS {t} CASCADE")
 
+    ensure_enum_types(con)
+    create_team_abbreviation_type(con, "SELECT abbreviation FROM raw_dim_teams")
+
     # 1. Core Dimensions
-    con.execute("""
-    CREATE TABLE unified_leagues (
-      league_id        INTEGER PRIMARY KEY,
-      league_code      VARCHAR NOT NULL UNIQUE,
-      league_name      VARCHAR NOT NULL
-    );
-    """)
+    for ddl in SCHEMA.values():
+        con.execute(unconstrained_ddl(ddl) if bulk_load else ddl)
 
     con.execute(
         "INSERT INTO unified_leagues (league_id, league_code, league_name) VALUES (1, 'NBA', 'National Basketball Association'), (2, 'BAA', 'Basketball Association of America'), (3, 'ABA', 'American Basketball Association')"
     )
 
-    con.execute("""
-    CREATE TABLE unified_seasons (
-      season_id        INTEGER PRIMARY KEY,
-      league_id        INTEGER NOT NULL REFERENCES unified_leagues(league_id),
-      season_year      INTEGER NOT NULL,
-      start_date       DATE,
-      end_date         DATE,
-      UNIQUE (league_id, season_year)
-    );
-    """)
-
-    con.execute("""
-    CREATE TABLE unified_arenas (
-      arena_id         INTEGER PRIMARY KEY,
-      arena_name       VARCHAR NOT NULL,
-      city             VARCHAR
-    );
-    """)
-
-    con.execute("""
-    CREATE TABLE unified_teams (
-      team_id          BIGINT PRIMARY KEY,
-      league_id        INTEGER NOT NULL REFERENCES unified_leagues(league_id),
-      franchise_code   VARCHAR,
-      nba_api_team_id  BIGINT UNIQUE
-    );
-    """)
-
-    con.execute("""
-    CREATE TABLE unified_team_history (
-      team_history_id  INTEGER PRIMARY KEY,
-      team_id          BIGINT NOT NULL REFERENCES unified_teams(team_id),
-      effective_start  DATE NOT NULL,
-      effective_end    DATE,
-      city             VARCHAR NOT NULL,
-      nickname         VARCHAR NOT NULL,
-      abbreviation     VARCHAR,
-      is_active        BOOLEAN NOT NULL DEFAULT TRUE
-    );
-    """)
-
-    con.execute("""
-    CREATE TABLE unified_players (
-      player_id          BIGINT PRIMARY KEY,
-      nba_api_person_id  BIGINT UNIQUE,
-      first_name         VARCHAR,
-      last_name          VARCHAR,
-      display_name       VARCHAR,
-      birth_date         DATE,
-      from_year          INTEGER,
-      to_year            INTEGER
-    );
-    """)
-
-    con.execute("""
-    CREATE TABLE unified_coaches (
-      coach_id           VARCHAR PRIMARY KEY,
-      nba_api_coach_id   BIGINT UNIQUE,
-      display_name       VARCHAR NOT NULL
-    );
-    """)
-
-    con.execute("""
-    CREATE TABLE unified_referees (
-      referee_id         VARCHAR PRIMARY KEY,
-      nba_api_ref_id     BIGINT UNIQUE,
-      display_name       VARCHAR NOT NULL
-    );
-    """)
-
-    con.execute("""
-    CREATE TABLE unified_games (
-      game_id            VARCHAR PRIMARY KEY,
-      league_id          INTEGER NOT NULL REFERENCES unified_leagues(league_id),
-      season_id          INTEGER NOT NULL REFERENCES unified_seasons(season_id),
-      season_type        VARCHAR NOT NULL,
-      game_date          DATE NOT NULL,
-      home_team_id       BIGINT NOT NULL REFERENCES unified_teams(team_id),
-      away_team_id       BIGINT NOT NULL REFERENCES unified_teams(team_id),
-      home_points        INTEGER,
-      away_points        INTEGER,
-      attendance         INTEGER,
-      arena_id           INTEGER REFERENCES unified_arenas(arena_id)
-    );
-    """)
-
-    con.execute("""
-    CREATE TABLE unified_player_boxscores (
-      game_id            VARCHAR NOT NULL REFERENCES unified_games(game_id),
-      player_id          BIGINT NOT NULL REFERENCES unified_players(player_id),
-      team_id            BIGINT NOT NULL REFERENCES unified_teams(team_id),
-      minutes            DOUBLE,
-      points             INTEGER,
-      assists            INTEGER,
-      rebounds_total     INTEGER,
-      steals             INTEGER,
-      blocks             INTEGER,
-      fgm                INTEGER,
-      fga                INTEGER,
-      fg3m               INTEGER,
-      fg3a               INTEGER,
-      ftm                INTEGER,
-      fta                INTEGER,
-      pf                 INTEGER,
-      turnovers          INTEGER,
-      plus_minus         INTEGER,
-      PRIMARY KEY (game_id, player_id)
-    );
-    """)
-
-    con.execute("""
-    CREATE TABLE unified_drafts (
-        season_year      INTEGER NOT NULL,
-        pick_overall     INTEGER NOT NULL,
-        round_number     INTEGER,
-        pick_in_round    INTEGER,
-        team_id          BIGINT REFERENCES unified_teams(team_id),
-        player_id        BIGINT REFERENCES unified_players(player_id),
-        college          VARCHAR,
-        PRIMARY KEY (season_year, pick_overall)
-    );
-    """)
-
     print("Schema created successfully.")
 
     # Data Migration logic
@@ -173,35 +235,53 @@ def migrate():
     print("Migrating seasons...")
     con.execute("""
     INSERT INTO unified_seasons (season_id, league_id, season_year)
-    SELECT row_number() over() as season_id, (case when league='BAA' then 2 else 1 end) as league_id, start_year
+    SELECT
+        -- In year order, so frozen games keep pointing at the same season_id
+        row_number() over (ORDER BY start_year, league) as season_id,
+        (case when league='BAA' then 2 else 1 end) as league_id,
+        start_year
     FROM raw_dim_seasons
     """)
+    # Seasons and phases of every game date, from the games themselves
+    build_calendar(con)
 
     # 2. Teams
     print("Migrating teams...")
     # First from dim_teams
     con.execute("""
-    INSERT OR IGNORE INTO unified_teams (team_id, league_id, nba_api_team_id)
+    INSERT INTO unified_teams (team_id, league_id, nba_api_team_id)
     SELECT CAST(team_id AS BIGINT), MAX(case when league='BAA' then 2 else 1 end), CAST(team_id AS BIGINT)
     FROM raw_dim_teams
     GROUP BY team_id
     """)
 
-    # Then fill missing from games
-    con.execute("""
-    INSERT OR IGNORE INTO unified_teams (team_id, league_id, nba_api_team_id)
-    SELECT DISTINCT CAST(hometeamId AS BIGINT), 1, CAST(hometeamId AS BIGINT) FROM raw_games WHERE hometeamId IS NOT NULL
-    """)
+    # Then fill missing from games. Set-based rather than INSERT OR IGNORE, which
+    # needs the primary key that bulk-load mode only adds at the end.
     con.execute("""
-    INSERT OR IGNORE INTO unified_teams (team_id, league_id, nba_api_team_id)
-    SELECT DISTINCT CAST(awayteamId AS BIGINT), 1, CAST(awayteamId AS BIGINT) FROM raw_games WHERE awayteamId IS NOT NULL
+    INSERT INTO unified_teams (team_id, league_id, nba_api_team_id)
+    SELECT DISTINCT team_id, 1, team_id
+    FROM raw_games,
+         UNNEST([CAST(hometeamId AS BIGINT), CAST(awayteamId AS BIGINT)]) t(team_id)
+    WHERE team_id IS NOT NULL
+      AND team_id NOT IN (SELECT team_id FROM unified_teams)
     """)
 
     con.execute("""
-    INSERT OR IGNORE INTO unified_team_history (team_history_id, team_id, effective_start, city, nickname, abbreviation, is_active)
-    SELECT row_number() over() as team_history_id, CAST(team_id AS BIGINT), '1946-01-01'::DATE, city, nickname, abbreviation, (year_active_till >= 2025)
+    INSERT INTO unified_team_history (
+        team_history_id, team_id, effective_start, effective_end, city,
+        nickname, abbreviation, is_active
+    )
+    SELECT
+        row_number() over (ORDER BY team_id, year_founded) as team_history_id,
+        CAST(team_id AS BIGINT),
+        make_date(COALESCE(year_founded, 1946), 7, 1),
+        -- Exclusive end (see team_resolver.py); open while the name is current
+        CASE WHEN year_active_till < 2025
+             THEN make_date(year_active_till + 1, 7, 1) END,
+        city, nickname, abbreviation, (year_active_till >= 2025)
     FROM raw_dim_teams
     """)
+    build_team_seasons(con)
 
     # 3. Players
     print("Migrating players...")
@@ -214,13 +294,20 @@ def migrate():
 
     # 4. Games
     print("Migrating games...")
-    con.execute("""
-    INSERT INTO unified_games (game_id, league_id, season_id, season_type, game_date, home_team_id, away_team_id, home_points, away_points, attendance)
+    # game_key is a dense surrogate in date order, above the frozen games' keys;
+    # game_id stays the primary key
+    con.execute(
+        f"""
+    INSERT INTO unified_games (
+        game_id, game_key, league_id, season_id, season_type, game_date,
+        home_team_id, away_team_id, home_points, away_points, attendance
+    )
     SELECT
         g.gameId,
-        s.league_id,
-        s.season_id,
-        'REG',
+        {frozen_max_key} + row_number() over (ORDER BY g.gameDateTimeEst, g.gameId),
+        c.league_id,
+        c.season_id,
+        {PHASE_SQL.format(col="g.gameType")},
         g.gameDateTimeEst::DATE,
         CAST(g.hometeamId AS BIGINT),
         CAST(g.awayteamId AS BIGINT),
@@ -228,17 +315,28 @@ def migrate():
         g.awayScore,
         CAST(g.attendance AS INTEGER)
     FROM raw_games g
-    JOIN unified_seasons s ON (CASE WHEN MONTH(g.gameDateTimeEst::TIMESTAMP) >= 10 THEN YEAR(g.gameDateTimeEst::TIMESTAMP) ELSE YEAR(g.gameDateTimeEst::TIMESTAMP) - 1 END) = s.season_year
-    """)
+    JOIN unified_calendar c ON c.calendar_date = g.gameDateTimeEst::DATE
+    -- Frozen seasons stay in their Parquet files
+    WHERE c.season_year NOT IN (SELECT UNNEST(?::INTEGER[]))
+    """,
+        [frozen_years],
+    )
+    ensure_game_key_sequence(con)
+    rebuild_game_xref(con)
 
     # 5. Boxscores
     print("Migrating boxscores...")
     con.execute("""
-    INSERT INTO unified_player_boxscores (game_id, player_id, team_id, minutes, points, assists, rebounds_total, steals, blocks, fgm, fga, fg3m, fg3a, ftm, fta, pf, turnovers, plus_minus)
+    INSERT INTO unified_player_boxscores (
+        game_id, game_key, player_id, team_id, minutes, points, assists,
+        rebounds_total, steals, blocks, fgm, fga, fg3m, fg3a, ftm, fta, pf,
+        turnovers, plus_minus
+    )
     SELECT
-        CAST(pb.gameId AS VARCHAR),
+        g.game_id,
+        g.game_key,
         pb.personId,
-        CAST((case when pb.home=1 then g.hometeamId else g.awayteamId end) AS BIGINT),
+        case when pb.home=1 then g.home_team_id else g.away_team_id end,
         numMinutes,
         points,
         assists,
@@ -255,16 +353,20 @@ def migrate():
         turnovers,
         plusMinusPoints
     FROM raw_player_box_scores pb
-    JOIN raw_games g ON CAST(pb.gameId AS VARCHAR) = CAST(g.gameId AS VARCHAR)
+    -- Resolved through the crosswalk, whatever ID style the box score source uses
+    JOIN unified_game_xref x ON x.external_id = pb.gameId::VARCHAR
+    JOIN unified_games g ON g.game_key = x.game_key
+    -- Clustered by player, like cluster_boxscores.py, so zone maps prune player scans
+    ORDER BY pb.personId, g.game_date, g.game_key
     """)
 
     print("Migrating coaches...")
     con.execute("""
     INSERT INTO unified_coaches (coach_id, display_name)
-    SELECT DISTINCT coach_id, coach_name
+    SELECT coach_id, ANY_VALUE(coach_name)
     FROM coach_season_summary
     WHERE coach_id IS NOT NULL
-    ON CONFLICT (coach_id) DO UPDATE SET display_name = EXCLUDED.display_name
+    GROUP BY coach_id
     """)
 
     # 7. Drafts
@@ -280,14 +382,55 @@ def migrate():
         p.player_id,
         dh.college
     FROM draft_history dh
-    LEFT JOIN unified_team_history t ON dh.team_id = t.abbreviation
+    -- The team as named at the June draft: the season that just ended, or the
+    -- coming one for expansion teams drafting before their first season
+    LEFT JOIN unified_team_seasons t
+      ON dh.team_id = t.abbreviation
+     AND t.season_year IN (dh.season_year - 1, dh.season_year)
     LEFT JOIN unified_players p ON LOWER(dh.player_name) = LOWER(p.display_name)
-    QUALIFY ROW_NUMBER() OVER (PARTITION BY dh.season_year, dh.pick_overall ORDER BY t.is_active DESC, t.effective_end DESC NULLS FIRST) = 1
+    -- Players sharing a display name still match more than once
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY dh.season_year, dh.pick_overall
+        ORDER BY t.season_year, p.player_id
+    ) = 1
     """)
 
+    if bulk_load:
+        swap_in_all(con, SCHEMA)
+        # The swapped-in games table was created without the key default
+        ensure_game_key_sequence(con)
+
+    ensure_history_views(con)
+    bump_table_version(con, *tables, "unified_game_xref")
+    changelog.commit()
+    after = table_sizes(con, tables)
     con.close()
-    print("Migration to unified_ schema complete.")
+    print("Migration to unified_ schema complete.\n")
+    print_size_report(before, after)
+    peak = peak_memory_mb()
+    print(
+        f"\n{'Bulk-load' if bulk_load else 'Standard'} migration took "
+        f"{time.perf_counter() - start:.1f}s, peak memory "
+        + ("n/a" if peak is None else f"{peak:.0f} MB")
+    )
 
 
 if __name__ == "__main__":
-    migrate()
+    parser = argparse.ArgumentParser(description="Rebuild the unified_* tables")
+    parser.add_argument(
+        "--bulk-load",
+        action="store_true",
+        help="Load without constraints, validate set-based, then add them.",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Also reload frozen seasons, deleting their Parquet files.",
+    )
+    args = parser.parse_args()
+
+    try:
+        migrate(bulk_load=args.bulk_load, full=args.full)
+    except ConstraintViolation as e:
+        print(f"Migration aborted: {e}")
+        raise SystemExit(1) from e
@@ -6,6 +6,10 @@ from src.frontend.queries import (
     get_player_search,
     get_player_profile,
     get_standings,
+    get_similar_players,
+    get_leaders,
+    get_leaderboard_stats,
+    get_player_percentiles,
 )
 
 
@@ -36,15 +40,34 @@ def player_page():
 
         profile_info = gr.Dataframe(label="Bio")
         season_stats = gr.Dataframe(label="Season Stats")
+        percentiles = gr.Dataframe(label="Percentile Ranks (latest season)")
 
         search_btn.click(get_player_search, inputs=name_input, outputs=results)
 
         def load_profile(pid):
             info, stats = get_player_profile(pid)
-            return info, stats
+            return info, stats, get_player_percentiles(pid)
 
         profile_btn.click(
-            load_profile, inputs=player_id_input, outputs=[profile_info, season_stats]
+            load_profile,
+            inputs=player_id_input,
+            outputs=[profile_info, season_stats, percentiles],
+        )
+
+        gr.Markdown("### Similar Players")
+        similar_season = gr.Number(label="Season (start year, blank for latest)")
+        similar_btn = gr.Button("Find Similar Players")
+        similar_results = gr.Dataframe(label="Most Similar Player-Seasons")
+
+        def load_similar(pid, season):
+            if not pid:
+                return None
+            return get_similar_players(int(pid), int(season) if season else None)
+
+        similar_btn.click(
+            load_similar,
+            inputs=[player_id_input, similar_season],
+            outputs=similar_results,
         )
     return player
 
@@ -57,6 +80,29 @@ def team_page():
     return team
 
 
+def leaders_page():
+    with gr.Blocks() as leaders:
+        gr.Markdown("## Season Leaders")
+        with gr.Row():
+            season_input = gr.Number(label="Season (start year)", value=2024)
+            stat_input = gr.Dropdown(
+                choices=get_leaderboard_stats(), value="pts_per_g", label="Stat"
+            )
+            top_n = gr.Number(label="Top N", value=10)
+        leaders_btn = gr.Button("Show Leaders")
+        leaders_table = gr.Dataframe(label="Leaders")
+
+        def load_leaders(season, stat, n):
+            return get_leaders(int(season), stat, int(n or 10))
+
+        leaders_btn.click(
+            load_leaders,
+            inputs=[season_input, stat_input, top_n],
+            outputs=leaders_table,
+        )
+    return leaders
+
+
 def draft_page():
     with gr.Blocks() as draft:
         gr.Markdown("## Draft History")
@@ -73,6 +119,8 @@ with gr.Blocks(title="NBA Hub") as app:
             player_page()
         with gr.Tab("Teams"):
             team_page()
+        with gr.Tab("Leaders"):
+            leaders_page()
         with gr.Tab("Draft"):
             draft_page()
 
@@ -1,6 +1,8 @@
 import duckdb
 import pandas as pd
+from src.analytics.player_similarity import similar_players
 from src.core.database import get_db_connection
+from src.etl.derive.leaderboards import STATS as LEADERBOARD_STATS
 
 
 def get_seasons():
@@ -14,16 +16,16 @@ def get_seasons():
 
 def get_teams(season_year=None):
     con = get_db_connection()
+    params = []
     if season_year:
-        # This requires joining with team history or standings to see active teams for that season
-        # For now, just return all teams
+        # Teams as they were named that season
         query = """
-            SELECT t.team_id, th.city, th.nickname, th.abbreviation 
-            FROM unified_teams t
-            JOIN unified_team_history th ON t.team_id = th.team_id
-            WHERE th.is_active = TRUE
-            ORDER BY th.city
+            SELECT team_id, city, nickname, abbreviation
+            FROM unified_team_seasons
+            WHERE season_year = ?
+            ORDER BY city
         """
+        params = [season_year]
     else:
         query = """
             SELECT t.team_id, th.city, th.nickname, th.abbreviation 
@@ -32,7 +34,7 @@ def get_teams(season_year=None):
             WHERE th.is_active = TRUE
             ORDER BY th.city
         """
-    df = con.execute(query).fetchdf()
+    df = con.execute(query, params).fetchdf()
     con.close()
     return df
 
@@ -65,7 +67,7 @@ def get_player_profile(player_id):
         SELECT 
             s.season_year,
             t.abbreviation as team,
-            COUNT(DISTINCT pb.game_id) as g,
+            COUNT(DISTINCT pb.game_key) as g,
             SUM(pb.minutes) as mp,
             SUM(pb.points) as pts,
             SUM(pb.rebounds_total) as trb,
@@ -75,10 +77,11 @@ def get_player_profile(player_id):
             SUM(pb.fgm) as fg,
             SUM(pb.fga) as fga,
             CASE WHEN SUM(pb.fga) > 0 THEN CAST(SUM(pb.fgm) AS DOUBLE) / SUM(pb.fga) ELSE 0 END as fg_pct
-        FROM unified_player_boxscores pb
-        JOIN unified_games g ON pb.game_id = g.game_id
+        FROM unified_player_boxscores_all pb
+        JOIN unified_games_all g ON pb.game_key = g.game_key
         JOIN unified_seasons s ON g.season_id = s.season_id
-        JOIN unified_team_history t ON pb.team_id = t.team_id
+        JOIN unified_team_seasons t
+          ON pb.team_id = t.team_id AND g.season_id = t.season_id
         WHERE pb.player_id = ?
         GROUP BY s.season_year, t.abbreviation
         ORDER BY s.season_year DESC
@@ -99,9 +102,10 @@ def get_standings(season_year):
         WITH team_games AS (
             SELECT 
                 home_team_id as team_id,
+                g.season_id,
                 CASE WHEN home_points > away_points THEN 1 ELSE 0 END as win,
                 1 as game
-            FROM unified_games g
+            FROM unified_games_all g
             JOIN unified_seasons s ON g.season_id = s.season_id
             WHERE s.season_year = ? AND g.season_type = 'REG'
             
@@ -109,9 +113,10 @@ def get_standings(season_year):
             
             SELECT 
                 away_team_id as team_id,
+                g.season_id,
                 CASE WHEN away_points > home_points THEN 1 ELSE 0 END as win,
                 1 as game
-            FROM unified_games g
+            FROM unified_games_all g
             JOIN unified_seasons s ON g.season_id = s.season_id
             WHERE s.season_year = ? AND g.season_type = 'REG'
         )
@@ -121,10 +126,124 @@ def get_standings(season_year):
             SUM(tg.game) - SUM(tg.win) as l,
             CAST(SUM(tg.win) AS DOUBLE) / SUM(tg.game) as pct
         FROM team_games tg
-        JOIN unified_team_history th ON tg.team_id = th.team_id
+        JOIN unified_team_seasons th
+          ON tg.team_id = th.team_id AND tg.season_id = th.season_id
         GROUP BY th.city, th.nickname
         ORDER BY pct DESC
     """
     df = con.execute(query, [season_year, season_year]).fetchdf()
     con.close()
     return df
+
+
+def get_similar_players(player_id, season_year=None, k=10, approximate=True):
+    # Nearest player-seasons from the precomputed similarity index (IVF if built)
+    columns = ["player_id", "season_year", "similarity"]
+    try:
+        matches = similar_players(player_id, season_year, k=k, approximate=approximate)
+    except FileNotFoundError:
+        matches = []
+    similar = pd.DataFrame(matches, columns=columns)
+    if similar.empty:
+        return pd.DataFrame(columns=["display_name", *columns])
+
+    con = get_db_connection()
+    con.register("similar_matches", similar)
+    df = con.execute("""
+        SELECT p.display_name, s.player_id, s.season_year,
+               ROUND(s.similarity, 4) as similarity
+        FROM similar_matches s
+        JOIN unified_players p ON s.player_id = p.player_id
+        ORDER BY s.similarity DESC
+    """).fetchdf()
+    con.close()
+    return df
+
+
+def get_leaders(season_year, stat="pts_per_g", n=10):
+    # Precomputed by src/etl/derive/leaderboards.py
+    con = get_db_connection()
+    query = """
+        SELECT l.rank, p.display_name, l.player_id, l.games, ROUND(l.value, 3) as value
+        FROM unified_season_leaderboards l
+        JOIN unified_seasons s ON l.season_id = s.season_id
+        JOIN unified_players p ON l.player_id = p.player_id
+        WHERE s.season_year = ? AND l.stat = ? AND l.rank <= ?
+        ORDER BY l.rank, p.display_name
+    """
+    df = con.execute(query, [season_year, stat, n]).fetchdf()
+    con.close()
+    return df
+
+
+def get_leaderboard_stats():
+    # Static, so the UI builds before the leaderboards have been derived
+    return sorted(LEADERBOARD_STATS)
+
+
+def get_player_percentiles(player_id, season_year=None):
+    # Percentile among qualified players; defaults to the player's latest season
+    con = get_db_connection()
+    query = """
+        SELECT s.season_year, l.stat, ROUND(l.value, 3) as value, l.rank,
+               ROUND(100 * l.percentile) as percentile
+        FROM unified_season_leaderboards l
+        JOIN unified_seasons s ON l.season_id = s.season_id
+        WHERE l.player_id = ? AND l.qualified
+          AND s.season_year = COALESCE(?, (
+              SELECT MAX(s2.season_year)
+              FROM unified_season_leaderboards l2
+              JOIN unified_seasons s2 ON l2.season_id = s2.season_id
+              WHERE l2.player_id = ?
+          ))
+        ORDER BY l.percentile DESC
+    """
+    df = con.execute(query, [player_id, season_year, player_id]).fetchdf()
+    con.close()
+    return df
+
+
+def get_games(season_year, team_id=None, limit=100):
+    # Most recent first; team_id matches either side
+    con = get_db_connection()
+    query = """
+        SELECT g.game_id, g.game_date, g.season_type,
+               g.home_team_id, h.abbreviation as home_team, g.home_points,
+               g.away_team_id, a.abbreviation as away_team, g.away_points
+        FROM unified_games_all g
+        JOIN unified_seasons s ON g.season_id = s.season_id
+        LEFT JOIN unified_team_seasons h
+          ON g.home_team_id = h.team_id AND g.season_id = h.season_id
+        LEFT JOIN unified_team_seasons a
+          ON g.away_team_id = a.team_id AND g.season_id = a.season_id
+        WHERE s.season_year = ?
+          AND (? IS NULL OR ? IN (g.home_team_id, g.away_team_id))
+        ORDER BY g.game_date DESC, g.game_id DESC
+        LIMIT ?
+    """
+    df = con.execute(query, [season_year, team_id, team_id, limit]).fetchdf()
+    con.close()
+    return df
+
+
+def get_boxscore(game_id):
+    # Any registered ID style (NBA, Basketball-Reference) resolves via the crosswalk
+    con = get_db_connection()
+    query = """
+        SELECT b.team_id, t.abbreviation as team, b.player_id, p.display_name,
+               b.minutes, b.points, b.rebounds_total, b.assists, b.steals, b.blocks,
+               b.turnovers, b.fgm, b.fga, b.fg3m, b.fg3a, b.ftm, b.fta, b.pf,
+               b.plus_minus
+        FROM unified_player_boxscores_all b
+        JOIN unified_games_all g ON b.game_key = g.game_key
+        LEFT JOIN unified_players p ON b.player_id = p.player_id
+        LEFT JOIN unified_team_seasons t
+          ON b.team_id = t.team_id AND g.season_id = t.season_id
+        WHERE b.game_key = (
+            SELECT game_key FROM unified_game_xref WHERE external_id = ?
+        )
+        ORDER BY b.team_id, b.minutes DESC NULLS LAST
+    """
+    df = con.execute(query, [game_id]).fetchdf()
+    con.close()
+    return df
@@ -0,0 +1,230 @@
+import argparse
+import re
+from datetime import date, timedelta
+
+import duckdb
+
+from src.core.config import BBREF_BASE_URL, RAW_DATA_DIR
+from src.core.database import get_db_connection
+from src.core.frozen_seasons import ensure_history_views
+from src.core.game_xref import ensure_game_xref
+from src.core.table_versions import bump_table_version
+from src.core.team_registry import ABBREVIATION_ALIASES
+
+# LeagueSchedule24_25.csv holds the 2024-25 season (season_year 2024)
+SCHEDULE_FILE_RE = re.compile(r"LeagueSchedule(\d{2})_(\d{2})\.csv$")
+
+# Game ID types Basketball-Reference has box scores for: regular season,
+# playoffs, play-in and the NBA Cup final (not preseason or All-Star games)
+SCHEDULED_GAME_TYPES = ("002", "004", "005", "006")
+
+# unified_team_history abbreviation -> Basketball-Reference's
+BBREF_ABBREVIATIONS = {nba: bbref for bbref, nba in ABBREVIATION_ALIASES.items()}
+
+
+def ensure_schedule(con):
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS league_schedule (
+        game_id       VARCHAR PRIMARY KEY,
+        season_year   INTEGER NOT NULL,
+        game_date     DATE NOT NULL,
+        tipoff_est    TIMESTAMP,
+        home_team_id  BIGINT NOT NULL,
+        away_team_id  BIGINT NOT NULL
+    )
+    """)
+
+
+def schedule_files():
+    """{season_year: path} of the LeagueSchedule CSVs in data/raw."""
+    files = {}
+    for path in sorted(RAW_DATA_DIR.glob("LeagueSchedule*.csv")):
+        match = SCHEDULE_FILE_RE.search(path.name)
+        if match:
+            files[2000 + int(match.group(1))] = path
+    return files
+
+
+def load_schedule(con, files=None):
+    """
+    Replaces each season of league_schedule with its CSV (schedules change as
+    games are postponed). Returns {season_year: games loaded}.
+    """
+    ensure_schedule(con)
+    types = ", ".join(f"'{t}'" for t in SCHEDULED_GAME_TYPES)
+    loaded = {}
+    for season_year, path in (files or schedule_files()).items():
+        con.begin()
+        try:
+            con.execute(
+                "DELETE FROM league_schedule WHERE season_year = ?", [season_year]
+            )
+            con.execute(
+                f"""
+                INSERT OR REPLACE INTO league_schedule
+                SELECT game_id, ?, tipoff::DATE, tipoff, home_team_id, away_team_id
+                FROM (
+                    -- Unpadded, as load_games keeps Games.csv's gameId
+                    SELECT LTRIM(CAST(gameId AS VARCHAR), '0') AS game_id,
+                           CAST(gameDateTimeEst AS TIMESTAMP) AS tipoff,
+                           CAST(hometeamId AS BIGINT) AS home_team_id,
+                           CAST(awayteamId AS BIGINT) AS away_team_id
+                    FROM read_csv_auto('{path}')
+                )
+                WHERE LEFT(LPAD(game_id, 10, '0'), 3) IN ({types})
+                """,
+                [season_year],
+            )
+            con.commit()
+        except duckdb.Error as e:
+            # e.g. a Git LFS pointer checked out instead of the file
+            con.rollback()
+            print(f"  Warning: could not load {path.name}: {str(e).splitlines()[0]}")
+            continue
+        loaded[season_year] = con.execute(
+            "SELECT COUNT(*) FROM league_schedule WHERE season_year = ?",
+            [season_year],
+        ).fetchone()[0]
+    if loaded:
+        bump_table_version(con, "league_schedule")
+    return loaded
+
+
+def schedule_coverage(con):
+    """(first, last) game date in league_schedule, or (None, None)."""
+    ensure_schedule(con)
+    return con.execute(
+        "SELECT MIN(game_date), MAX(game_date) FROM league_schedule"
+    ).fetchone()
+
+
+def scheduled_games(con, first, last, missing_only=True):
+    """
+    [(game_id, game_date, bbref_game_id, reason)] for the scheduled games played
+    from `first` to `last`. With `missing_only`, just those not yet ingested:
+    reason is "missing" (no game row) or "no_boxscore". A game counts as
+    ingested under any registered ID or as the same date, home and away team,
+    and game_id is then the ID it is stored under, else the schedule's.
+    bbref_game_id is None if the home team's abbreviation is unknown.
+    """
+    ensure_schedule(con)
+    ensure_game_xref(con)
+    ensure_history_views(con)
+    rows = con.execute(
+        f"""
+        WITH scheduled AS (
+            SELECT COALESCE(x.game_id, g.game_id, s.game_id) AS game_id,
+                   s.game_date, h.abbreviation::VARCHAR AS home_abbr,
+                   COALESCE(x.game_key, g.game_key) AS game_key
+            FROM league_schedule s
+            LEFT JOIN unified_game_xref x ON x.external_id = s.game_id
+            LEFT JOIN unified_games_all g
+              ON g.game_date = s.game_date
+             AND g.home_team_id = s.home_team_id
+             AND g.away_team_id = s.away_team_id
+            LEFT JOIN unified_team_history h
+              ON h.team_id = s.home_team_id
+             AND s.game_date >= h.effective_start
+             AND (h.effective_end IS NULL OR s.game_date < h.effective_end)
+            WHERE s.game_date BETWEEN ? AND ?
+            QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY s.game_id ORDER BY h.effective_start DESC
+            ) = 1
+        )
+        SELECT s.game_id, s.game_date, s.home_abbr,
+               CASE WHEN s.game_key IS NULL THEN 'missing'
+                    WHEN b.game_key IS NULL THEN 'no_boxscore' END AS reason
+        FROM scheduled s
+        LEFT JOIN (
+            SELECT DISTINCT game_key FROM unified_player_boxscores_all
+        ) b ON b.game_key = s.game_key
+        {"WHERE s.game_key IS NULL OR b.game_key IS NULL" if missing_only else ""}
+        ORDER BY s.game_date, s.game_id
+        """,
+        [first, last],
+    ).fetchall()
+    return [
+        (
+            game_id,
+            day,
+            f"{day:%Y%m%d}0{BBREF_ABBREVIATIONS.get(abbr, abbr)}" if abbr else None,
+            reason,
+        )
+        for game_id, day, abbr, reason in rows
+    ]
+
+
+def scoreboard_url(day):
+    return (
+        f"{BBREF_BASE_URL}/boxscores/?month={day.month}&day={day.day}&year={day.year}"
+    )
+
+
+def box_score_url(bbref_game_id):
+    return f"{BBREF_BASE_URL}/boxscores/{bbref_game_id}.html"
+
+
+def fetch_urls(games):
+    """
+    The minimal URL set for `games`: one box score page per game, plus the
+    scoreboard of any day with a game whose Basketball-Reference ID is unknown.
+    """
+    urls = [box_score_url(bbref_id) for _, _, bbref_id, _ in games if bbref_id]
+    unknown_days = sorted({day for _, day, bbref_id, _ in games if not bbref_id})
+    return urls + [scoreboard_url(day) for day in unknown_days]
+
+
+def plan(as_of=None, since=None):
+    """Loads the schedule and prints the games due but not ingested and their URLs."""
+    as_of = as_of or date.today()
+    con = get_db_connection()
+    loaded = load_schedule(con)
+    first, last = schedule_coverage(con)
+    if first is None:
+        print("No schedule loaded; scrapers fall back to daily scoreboards.")
+        con.close()
+        return []
+    # Games before today are final
+    last = min(last, as_of - timedelta(days=1))
+    first = max(first, since) if since else first
+    due = scheduled_games(con, first, last, missing_only=False)
+    con.close()
+
+    missing = [g for g in due if g[3]]
+    game_days = {g[1] for g in due}
+    span = (last - first).days + 1 if last >= first else 0
+    urls = fetch_urls(missing)
+    print(
+        f"Schedule: {sum(loaded.values())} games in seasons "
+        f"{', '.join(map(str, sorted(loaded))) or '-'}"
+    )
+    print(
+        f"{first} to {last}: {len(due)} games due on {len(game_days)} of {span} "
+        f"days, {len(due) - len(missing)} ingested"
+    )
+    for reason in ("missing", "no_boxscore"):
+        print(f"  {reason}: {sum(g[3] == reason for g in missing)}")
+    print(f"{len(urls)} URLs to fetch ({span - len(game_days)} off-days skipped)")
+    return urls
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="List the scheduled games that are final but not yet ingested"
+    )
+    parser.add_argument(
+        "--as-of",
+        type=date.fromisoformat,
+        help="Games before this date are final (default: today)",
+    )
+    parser.add_argument(
+        "--since", type=date.fromisoformat, help="Ignore games before this date"
+    )
+    parser.add_argument(
+        "--urls", action="store_true", help="Print the URLs to fetch, one per line"
+    )
+    args = parser.parse_args()
+
+    urls = plan(args.as_of, args.since)
+    if args.urls:
+        print("\n".join(urls))
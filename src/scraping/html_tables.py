@@ -0,0 +1,77 @@
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+# Basketball-Reference ships most secondary tables inside <!-- ... --> comments,
+# so a regex over the raw markup sees them the same way as visible tables.
+# The lookbehind keeps data-id= and similar attributes from matching.
+_TABLE_OPEN = re.compile(
+    r"<table\b[^>]*?(?<![-\w])id\s*=\s*[\"']([^\"']+)[\"'][^>]*>", re.I
+)
+_TABLE_CLOSE = re.compile(r"</table\s*>", re.I)
+
+
+class TableIndex:
+    """
+    Indexes every `<table id=...>` in a page with a single pass over the raw HTML,
+    including tables that are commented out, and parses tables only on request.
+
+    Args:
+        html (str | bytes): Page markup.
+        label: Printed by report() to identify the page (e.g. the season).
+    """
+
+    def __init__(self, html, label=None):
+        if isinstance(html, bytes):
+            html = html.decode("utf-8", errors="replace")
+        self.label = label
+        self.parse_seconds = 0.0
+        self._html = html
+        self._spans = {}
+        self._parsed = {}
+
+        start = time.perf_counter()
+        pos = 0
+        while True:
+            opening = _TABLE_OPEN.search(html, pos)
+            if not opening:
+                break
+            closing = _TABLE_CLOSE.search(html, opening.end())
+            end = closing.end() if closing else len(html)
+            # First occurrence wins, matching soup.find("table", {"id": ...})
+            self._spans.setdefault(opening.group(1), (opening.start(), end))
+            pos = end
+        self.index_seconds = time.perf_counter() - start
+
+    @property
+    def ids(self):
+        return list(self._spans)
+
+    def __contains__(self, table_id):
+        return table_id in self._spans
+
+    def get(self, table_id):
+        """Returns the parsed <table> Tag for table_id, or None if the page has none."""
+        if table_id in self._parsed:
+            return self._parsed[table_id]
+        span = self._spans.get(table_id)
+        if span is None:
+            return None
+
+        start = time.perf_counter()
+        snippet = self._html[span[0] : span[1]]
+        table = BeautifulSoup(snippet, "html.parser").find("table")
+        self.parse_seconds += time.perf_counter() - start
+
+        self._parsed[table_id] = table
+        return table
+
+    def report(self):
+        """Prints index and parse timings for this page."""
+        label = f" {self.label}" if self.label is not None else ""
+        print(
+            f"  [tables]{label}: indexed {len(self._spans)} tables in "
+            f"{self.index_seconds * 1000:.1f}ms, parsed {len(self._parsed)} in "
+            f"{self.parse_seconds * 1000:.1f}ms"
+        )
@@ -0,0 +1,171 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+
+from src.core.config import settings
+from src.core.utils import get_random_user_agent
+
+_WORKER_DONE = object()
+
+
+@dataclass
+class SeasonResult:
+    season: int
+    status: str = "skipped"  # ok, empty, failed or skipped (never fetched)
+    rows: int = 0
+    fetch_seconds: float = 0.0
+    write_seconds: float = 0.0
+    error: str | None = None
+
+
+@contextmanager
+def playwright_session():
+    """
+    Per-worker Playwright page. Playwright's sync API is bound to the thread that
+    started it, so each worker launches (and closes) its own browser.
+    """
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        try:
+            context = browser.new_context(
+                user_agent=settings.scraper.user_agent or get_random_user_agent()
+            )
+            yield context.new_page()
+        finally:
+            browser.close()
+
+
+def run_seasons(
+    seasons, fetch_season, write_season, con=None, session=None, workers=None
+):
+    """
+    Fetches and parses seasons concurrently, then writes each one through a single
+    writer (the calling thread) in its own transaction.
+
+    Args:
+        seasons (iterable[int]): Seasons to process.
+        fetch_season (callable): fetch_season(session, season) -> payload. Runs on a
+            worker thread; it should call scrape_rate_limiter.wait() before every
+            request so all workers share the global SCRAPE_REQUESTS_PER_MINUTE budget.
+        write_season (callable): write_season(con, season, payload) -> rows written
+            (or None to use len(payload)). Runs on the calling thread only, and
+            never for an empty payload: nothing parsed (a missing table, a
+            challenge page) leaves the season's existing rows in place.
+        con: DuckDB connection. Each season's write is wrapped in BEGIN/COMMIT and
+            rolled back on failure, so a failed season never leaves partial rows.
+            Pass None for writers that don't touch the database.
+        session (callable): Context-manager factory entered once per worker, e.g.
+            playwright_session. Its value is passed to fetch_season.
+        workers (int): Fetch threads. Defaults to SCRAPE_CONCURRENCY.
+
+    Returns:
+        list[SeasonResult] in season order.
+    """
+    seasons = list(seasons)
+    results = {season: SeasonResult(season) for season in seasons}
+    if not seasons:
+        return []
+
+    pending = queue.Queue()
+    for season in seasons:
+        pending.put(season)
+    fetched = queue.Queue()
+    n_workers = max(1, min(workers or settings.scraper.concurrency, len(seasons)))
+
+    def worker():
+        try:
+            with session() if session else nullcontext() as handle:
+                while True:
+                    try:
+                        season = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    result = results[season]
+                    start = time.perf_counter()
+                    try:
+                        payload = fetch_season(handle, season)
+                    except Exception as e:
+                        result.status = "failed"
+                        result.error = f"fetch: {e}"
+                        payload = None
+                    result.fetch_seconds = time.perf_counter() - start
+                    fetched.put((season, payload))
+        except Exception as e:
+            print(f"  [Error] Worker session failed: {e}")
+        finally:
+            fetched.put(_WORKER_DONE)
+
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=worker, name=f"season-worker-{i}", daemon=True)
+        for i in range(n_workers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    finished_workers = 0
+    while finished_workers < n_workers:
+        item = fetched.get()
+        if item is _WORKER_DONE:
+            finished_workers += 1
+            continue
+
+        season, payload = item
+        result = results[season]
+        if result.status == "failed":
+            continue
+        if not payload:
+            result.status = "empty"
+            continue
+
+        start = time.perf_counter()
+        try:
+            if con is not None:
+                con.begin()
+            written = write_season(con, season, payload)
+            if con is not None:
+                con.commit()
+            if written is None:
+                written = len(payload)
+            result.rows = written
+            result.status = "ok" if written else "empty"
+        except Exception as e:
+            if con is not None:
+                con.rollback()
+            result.status = "failed"
+            result.error = f"write: {e}"
+        result.write_seconds = time.perf_counter() - start
+
+    for thread in threads:
+        thread.join()
+
+    ordered = [results[season] for season in seasons]
+    print_summary(ordered, n_workers, time.perf_counter() - started)
+    return ordered
+
+
+def print_summary(results, workers, elapsed):
+    """Prints per-season status and timing for a run_seasons call."""
+    print(
+        f"\nSeason summary ({len(results)} seasons, {workers} workers, {elapsed:.1f}s):"
+    )
+    print(f"  {'Season':<8}{'Status':<9}{'Rows':>8}{'Fetch(s)':>10}{'Write(s)':>10}")
+    for r in results:
+        print(
+            f"  {r.season:<8}{r.status:<9}{r.rows:>8}"
+            f"{r.fetch_seconds:>10.2f}{r.write_seconds:>10.2f}"
+        )
+
+    counts = {}
+    for r in results:
+        counts[r.status] = counts.get(r.status, 0) + 1
+    status_line = " ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+    print(f"  Totals: {status_line}, rows={sum(r.rows for r in results)}")
+
+    for r in results:
+        if r.error:
+            print(f"  [{r.season}] {r.error}")
@@ -1,11 +1,12 @@
-import random
 import re
-import time
 
 import requests
-from bs4 import BeautifulSoup
 
+from src.core.bulk_writer import BulkWriter
+from src.core.config import BBREF_BASE_URL, settings
 from src.core.database import get_db_connection
+from src.core.utils import get_request_headers, polite_sleep
+from src.scraping.html_tables import TableIndex
 
 # Map award IDs in HTML to our DB award_type
 AWARD_MAPPING = {
@@ -33,14 +34,15 @@ def get_player_id(td):
 
 
 def scrape_year(year):
-    url = f"https://www.basketball-reference.com/awards/awards_{year}.html"
+    url = f"{BBREF_BASE_URL}/awards/awards_{year}.html"
     print(f"Scraping {url}...")
 
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers)
+        response = requests.get(
+            url,
+            headers=get_request_headers(),
+            timeout=settings.scraper.request_timeout,
+        )
         if response.status_code == 404:
             print(f"Page not found for {year}. Skipping.")
             return
@@ -49,12 +51,28 @@ def scrape_year(year):
         print(f"Error fetching {url}: {e}")
         return
 
-    soup = BeautifulSoup(response.content, "html.parser")
+    tables = TableIndex(response.content, label=year)
 
     con = get_db_connection()
+    writer = BulkWriter(
+        con,
+        "awards_voting",
+        [
+            "award_type",
+            "season",
+            "player_id",
+            "name",
+            "rank",
+            "first_place_votes",
+            "points_won",
+            "points_max",
+            "share",
+        ],
+        key_columns=["award_type", "season", "player_id"],
+    )
 
     for html_id, award_type in AWARD_MAPPING.items():
-        table = soup.find("table", {"id": html_id})
+        table = tables.get(html_id)
         if not table:
             continue
 
@@ -128,26 +146,17 @@ def scrape_year(year):
                 )
             )
 
-        # Insert into DB
+        # Queue for the year's bulk upsert
         if rows_to_insert:
-            print(f"Inserting {len(rows_to_insert)} rows for {award_type} {year}")
-            try:
-                con.executemany(
-                    """
-                    INSERT INTO awards_voting (award_type, season, player_id, name, rank, first_place_votes, points_won, points_max, share)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT (award_type, season, player_id) DO UPDATE SET
-                        name = excluded.name,
-                        rank = excluded.rank,
-                        first_place_votes = excluded.first_place_votes,
-                        points_won = excluded.points_won,
-                        points_max = excluded.points_max,
-                        share = excluded.share
-                """,
-                    rows_to_insert,
-                )
-            except Exception as e:
-                print(f"Error inserting data for {award_type} {year}: {e}")
+            print(f"Queueing {len(rows_to_insert)} rows for {award_type} {year}")
+            writer.extend(rows_to_insert)
+
+    tables.report()
+
+    try:
+        writer.close()
+    except Exception as e:
+        print(f"Error inserting data for {year}: {e}")
 
     con.close()
 
@@ -186,7 +195,7 @@ def main():
 
     for year in years:
         scrape_year(year)
-        time.sleep(random.uniform(5, 10))  # Increased sleep to avoid 403
+        polite_sleep(5, 10)  # Longer than the default to avoid 403s
 
     verify_data()
 
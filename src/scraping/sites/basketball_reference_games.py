@@ -1,64 +1,98 @@
 import argparse
-import csv
-import os
 import re
-import time
+from datetime import date, datetime
 
 import requests
 from bs4 import BeautifulSoup
 
-from src.core.config import TEAM_HISTORIES_CSV
+from src.core.bulk_writer import BulkWriter
+from src.core.config import BBREF_BASE_URL, settings
 from src.core.database import get_db_connection
-
-
-def load_team_map():
+from src.core.frozen_seasons import ensure_history_views
+from src.core.game_xref import register_game_id, resolve_game
+from src.core.team_registry import load_team_registry
+from src.core.utils import get_request_headers, polite_sleep
+from src.scraping.fetch_planner import (
+    load_schedule,
+    schedule_coverage,
+    scheduled_games,
+)
+
+
+def get_nba_game_id(con, br_game_id, teams):
     """
-    Loads a mapping of Team Abbreviation -> Team ID from TeamHistories.csv.
+    Finds the NBA Game ID for a Basketball-Reference game ID (YYYYMMDD0TEAM).
+    Known IDs are one primary-key probe on unified_game_xref; new ones are
+    matched on date and home team once and registered there.
     """
-    team_map = {}
-    if not os.path.exists(TEAM_HISTORIES_CSV):
-        print(f"Warning: {TEAM_HISTORIES_CSV} not found. Team mapping will be limited.")
-        return team_map
-
-    with open(TEAM_HISTORIES_CSV, encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            abbrev = row["teamAbbrev"].strip()
-            team_id = row["teamId"]
-            if abbrev:
-                team_map[abbrev] = team_id
+    match = resolve_game(con, br_game_id)
+    if match:
+        return match[1]
 
-    # Manual overrides for common mismatches if any
-    team_map["PHO"] = "1610612756"  # Phoenix Suns (PHX in some, PHO in BR)
-    team_map["BRK"] = "1610612751"  # Brooklyn Nets (BKN in some)
-    team_map["CHO"] = "1610612766"  # Charlotte Hornets (CHA in some)
-
-    return team_map
+    game_date = datetime.strptime(br_game_id[:8], "%Y%m%d").date()
+    home_team_id = teams.team_id(br_game_id[9:], game_date)
+    if not home_team_id:
+        return None
+    ensure_history_views(con)
+    match = con.execute(
+        """
+        SELECT game_key, game_id
+        FROM unified_games_all
+        WHERE game_date = ? AND home_team_id = ?
+        """,
+        (game_date, home_team_id),
+    ).fetchone()
+    if not match:
+        return None
+    register_game_id(con, br_game_id, *match)
+    return match[1]
 
 
-def get_nba_game_id(con, date_str, home_team_abbr, team_map):
+def final_game_ids(date_str):
     """
-    Finds the NBA Game ID for a given date and home team.
+    Basketball-Reference IDs (YYYYMMDD0TEAM) of the games on a date's scoreboard
+    that are final. date_str: YYYYMMDD. Raises on a failed request.
     """
-    # Convert date YYYYMMDD -> YYYY-MM-DD
-    date_formatted = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
-
-    home_team_id = team_map.get(home_team_abbr)
-    if not home_team_id:
-        return None
+    year = int(date_str[:4])
+    month = int(date_str[4:6])
+    day = int(date_str[6:8])
 
-    # Query DB
-    query = """
-        SELECT gameId
-        FROM unified_games
-        WHERE strftime(game_date, '%Y-%m-%d') = ?
-        AND home_team_id = ?
+    url = f"{BBREF_BASE_URL}/boxscores/?month={month}&day={day}&year={year}"
+    print(f"Fetching games for {date_str} from {url}...")
+    response = requests.get(
+        url,
+        headers=get_request_headers(),
+        timeout=settings.scraper.request_timeout,
+    )
+    response.raise_for_status()
+
+    soup = BeautifulSoup(response.content, "html.parser")
+    game_ids = []
+    for summary in soup.find_all("div", class_="game_summary"):
+        for link in summary.find_all("a", href=True):
+            if "boxscores" in link["href"] and link.text.strip() == "Final":
+                # /boxscores/202310240DEN.html -> 202310240DEN
+                game_ids.append(link["href"].split("/")[-1].replace(".html", ""))
+                break
+    return game_ids
+
+
+def game_ids_on(con, date_str):
     """
-    result = con.execute(query, (date_formatted, home_team_id)).fetchone()
-
-    if result:
-        return result[0]
-    return None
+    Basketball-Reference IDs of a past day's games: from the official schedule
+    when it covers the day (so an off-day costs no request), else from the
+    day's scoreboard.
+    """
+    day = datetime.strptime(date_str, "%Y%m%d").date()
+    load_schedule(con)
+    first, last = schedule_coverage(con)
+    if first is not None and first <= day <= last and day < date.today():
+        games = scheduled_games(con, day, day, missing_only=False)
+        if all(br_game_id for _, _, br_game_id, _ in games):
+            if not games:
+                print(f"No games scheduled on {date_str}.")
+            return [br_game_id for _, _, br_game_id, _ in games]
+    return final_game_ids(date_str)
 
 
 def scrape_game_meta(date_str, dry_run=False):
@@ -66,56 +100,22 @@ def scrape_game_meta(date_str, dry_run=False):
     Scrapes metadata (Referees, Coaches) for games on a specific date.
     date_str: YYYYMMDD
     """
-    team_map = load_team_map()
+    teams = load_team_registry()
     con = get_db_connection()
-
-    # Construct URL for the date's games
-    year = int(date_str[:4])
-    month = int(date_str[4:6])
-    day = int(date_str[6:8])
-
-    url = f"https://www.basketball-reference.com/boxscores/?month={month}&day={day}&year={year}"
-    print(f"Fetching games for {date_str} from {url}...")
+    sinks = open_sinks(con)
 
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            print(f"Failed to fetch {url}: {response.status_code}")
-            return
-
-        soup = BeautifulSoup(response.content, "html.parser")
-
-        # Find all game summaries
-        game_summaries = soup.find_all("div", class_="game_summary")
-
-        for summary in game_summaries:
-            # Extract Game Link
-            links = summary.find_all("a", href=True)
-            box_score_link = None
-            for link in links:
-                if "boxscores" in link["href"] and link.text.strip() == "Final":
-                    box_score_link = link["href"]
-                    break
-
-            if not box_score_link:
-                continue
-
-            game_url = f"https://www.basketball-reference.com{box_score_link}"
+        for br_game_id in game_ids_on(con, date_str):
+            game_url = f"{BBREF_BASE_URL}/boxscores/{br_game_id}.html"
             print(f"  Processing game: {game_url}")
 
-            # Extract BR Game ID from URL (e.g., /boxscores/202310240DEN.html -> 202310240DEN)
-            br_game_id = box_score_link.split("/")[-1].replace(".html", "")
-
             # Parse BR ID to get Home Team Abbr
             # Format: YYYYMMDD0TEAM
             # e.g. 202310240DEN -> DEN
             home_team_abbr = br_game_id[9:]
 
             # Find NBA Game ID
-            nba_game_id = get_nba_game_id(con, date_str, home_team_abbr, team_map)
+            nba_game_id = get_nba_game_id(con, br_game_id, teams)
 
             if not nba_game_id:
                 print(
@@ -129,23 +129,42 @@ def scrape_game_meta(date_str, dry_run=False):
                 game_id_to_use = nba_game_id
 
             # Fetch Box Score
-            process_box_score(con, game_url, game_id_to_use, dry_run)
+            process_box_score(sinks, game_url, game_id_to_use, dry_run)
 
             # Sleep to respect rate limits
-            time.sleep(3)
+            polite_sleep()
 
     except Exception as e:
         print(f"Error scraping {date_str}: {e}")
     finally:
+        for writer in sinks.values():
+            writer.close()
         con.close()
 
 
-def process_box_score(con, url, game_id, dry_run):
+def open_sinks(con):
+    """Bulk writers for everything a date's box scores produce, flushed once per run."""
+    return {
+        "referees": BulkWriter(
+            con, "referees", ["referee_id", "name"], ["referee_id"], mode="ignore"
+        ),
+        "game_referees": BulkWriter(
+            con,
+            "game_referees",
+            ["game_id", "referee_id", "role"],
+            ["game_id", "referee_id"],
+            mode="ignore",
+        ),
+    }
+
+
+def process_box_score(sinks, url, game_id, dry_run):
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers)
+        response = requests.get(
+            url,
+            headers=get_request_headers(),
+            timeout=settings.scraper.request_timeout,
+        )
         if response.status_code != 200:
             print(f"    Failed to fetch box score: {response.status_code}")
             return
@@ -216,7 +235,7 @@ def process_box_score(con, url, game_id, dry_run):
         # If I can't find it, I'll skip for now.
 
         if not dry_run:
-            save_to_db(con, game_id, referees, coaches)
+            save_to_db(sinks, game_id, referees, coaches)
         else:
             print(f"    Referees: {referees}")
             print(f"    Coaches: {coaches}")
@@ -225,26 +244,15 @@ def process_box_score(con, url, game_id, dry_run):
         print(f"    Error processing box score {game_id}: {e}")
 
 
-def save_to_db(con, game_id, referees, coaches):
-    # Insert Referees
+def save_to_db(sinks, game_id, referees, coaches):
+    # Queue Referees; the writers flush in bulk when the caller closes them
     for ref_id, ref_name in referees:
-        # Insert into referees table
-        con.execute(
-            "INSERT OR IGNORE INTO referees (referee_id, name) VALUES (?, ?)",
-            (ref_id, ref_name),
-        )
-
-        # Insert into game_referees
-        con.execute(
-            "INSERT OR IGNORE INTO game_referees (game_id, referee_id, role) VALUES (?, ?, ?)",
-            (game_id, ref_id, "Official"),
-        )
+        sinks["referees"].add((ref_id, ref_name))
+        sinks["game_referees"].add((game_id, ref_id, "Official"))
 
     # Insert Coaches
     # ...
 
-    # con.close() # Do not close here, passed from caller
-
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -254,5 +262,6 @@ if __name__ == "__main__":
 
     if args.date:
         scrape_game_meta(args.date, args.dry_run)
+        load_team_registry().print_miss_report()
     else:
         print("Please provide a date with --date YYYYMMDD")
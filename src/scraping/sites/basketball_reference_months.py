@@ -2,8 +2,10 @@ import os
 
 from bs4 import BeautifulSoup
 
-base_url = "https://www.basketball-reference.com"
-html_dir = "data/raw/html"
+from src.core.config import BBREF_BASE_URL, DATA_DIR, SCRAPER_DATA_DIR
+
+base_url = BBREF_BASE_URL
+html_dir = SCRAPER_DATA_DIR
 files = [f for f in os.listdir(html_dir) if f.endswith("_games.html")]
 
 urls = []
@@ -17,7 +19,7 @@ for f in files:
                 if "_games-" in a["href"]:
                     urls.append(base_url + a["href"])
 
-with open("month_urls.txt", "w") as out_file:
+with open(DATA_DIR / "month_urls.txt", "w") as out_file:
     for url in urls:
         out_file.write(url + "\n")
 
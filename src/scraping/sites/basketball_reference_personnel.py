@@ -1,29 +1,28 @@
-import random
-import time
-
 from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
 
+from src.core.bulk_writer import BulkWriter
+from src.core.config import BBREF_BASE_URL, settings
 from src.core.database import get_db_connection
+from src.core.utils import polite_sleep
+from src.scraping.html_tables import TableIndex
 
 
 def scrape_coaches():
-    url = "https://www.basketball-reference.com/coaches/NBA_stats.html"
+    url = f"{BBREF_BASE_URL}/coaches/NBA_stats.html"
     print(f"Scraping coaches from {url}...")
 
     try:
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=True)
             page = browser.new_page()
-            page.goto(url, timeout=60000)
+            page.goto(url, timeout=settings.scraper.page_timeout_ms)
             content = page.content()
             browser.close()
     except Exception as e:
         print(f"Error fetching coaches: {e}")
         return
 
-    soup = BeautifulSoup(content, "html.parser")
-    table = soup.find("table", {"id": "coaches"})
+    table = TableIndex(content).get("coaches")
     if not table:
         print("Could not find coaches table.")
         return
@@ -61,32 +60,31 @@ def scrape_coaches():
     )
 
     print(f"Inserting {len(rows)} coaches...")
-    con.executemany(
-        "INSERT OR IGNORE INTO coaches (coach_id, name) VALUES (?, ?)",
-        [(r[0], r[3]) for r in rows],
-    )
+    with BulkWriter(
+        con, "coaches", ["coach_id", "name"], ["coach_id"], mode="ignore"
+    ) as writer:
+        writer.extend((r[0], r[3]) for r in rows)
     con.close()
     print("Coaches ingestion complete.")
 
 
 def scrape_referees():
-    url = "https://www.basketball-reference.com/referees/"
+    url = f"{BBREF_BASE_URL}/referees/"
     print(f"Scraping referees from {url}...")
 
     try:
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=True)
             page = browser.new_page()
-            page.goto(url, timeout=60000)
+            page.goto(url, timeout=settings.scraper.page_timeout_ms)
             content = page.content()
             browser.close()
     except Exception as e:
         print(f"Error fetching referees: {e}")
         return
 
-    soup = BeautifulSoup(content, "html.parser")
     # Referees are in a table with id "referees"
-    table = soup.find("table", {"id": "referees"})
+    table = TableIndex(content).get("referees")
     if not table:
         print("Could not find referees table.")
         return
@@ -119,15 +117,15 @@ def scrape_referees():
     )
 
     print(f"Inserting {len(rows)} referees...")
-    if rows:
-        con.executemany(
-            "INSERT OR IGNORE INTO referees (referee_id, name) VALUES (?, ?)", rows
-        )
+    with BulkWriter(
+        con, "referees", ["referee_id", "name"], ["referee_id"], mode="ignore"
+    ) as writer:
+        writer.extend(rows)
     con.close()
     print("Referees ingestion complete.")
 
 
 if __name__ == "__main__":
     scrape_coaches()
-    time.sleep(random.uniform(3, 5))
+    polite_sleep()
     scrape_referees()